@@ -2,7 +2,8 @@
 export enum EventNameEnum {
     MODIFY = "MODIFY",
     INSERT = "INSERT",
-    REMOVE = "REMOVE"
+    REMOVE = "REMOVE",
+    REMINDER = "REMINDER"
 }
 
 export enum EventTypeEnum {
@@ -11,7 +12,8 @@ export enum EventTypeEnum {
     ENTERPRISE_UPDATED = "ENTERPRISE_UPDATED",
     LICENSE_CREATED = "LICENSE_CREATED",
     LICENSE_DELETED = "LICENSE_DELETED",
-    LICENSE_UPDATED = "LICENSE_UPDATED"
+    LICENSE_UPDATED = "LICENSE_UPDATED",
+    CONTRACT_RENEWAL_REMINDER = "CONTRACT_RENEWAL_REMINDER"
 }
 
 export enum EntityTypeEnum {
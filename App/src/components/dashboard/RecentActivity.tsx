@@ -67,6 +67,7 @@ export default function RecentActivity({ activities }: RecentActivityProps) {
     license_created: 'New License Assigned',
     license_updated: 'License Updated',
     license_deleted: 'License Revoked',
+    contract_renewal_reminder: 'Contract Renewal Due',
   };
 
   const handleActivityTitle = (eventType: EventTypeEnum) => {
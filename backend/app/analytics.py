@@ -0,0 +1,250 @@
+import threading
+from datetime import date
+from typing import Optional
+
+import numpy as np
+
+from app.repositories.common import enum_value
+from app.routes.schemas.entreprise_schema import (
+    CompanySizeEnum,
+    EnterpriseStatusEnum,
+    IndustryEnum,
+    SubscriptionTierEnum,
+)
+
+# Categorical columns are stored as int8 codes. The last code of each category is `none`.
+CATEGORIES = {
+    "status": [e.value for e in EnterpriseStatusEnum] + ["none"],
+    "subscription_tier": [e.value for e in SubscriptionTierEnum] + ["none"],
+    "industry": [e.value for e in IndustryEnum] + ["none"],
+    "size": [e.value for e in CompanySizeEnum] + ["none"],
+}
+_CODES = {
+    column: {value: code for code, value in enumerate(values)}
+    for column, values in CATEGORIES.items()
+}
+NUMERIC_COLUMNS = {
+    "monthly_revenue": np.float64,
+    "max_licenses": np.int64,
+    "used_licenses": np.int64,
+}
+INITIAL_CAPACITY = 1024
+# `contract_end_month` is the number of months since 1970-01, this value when there is no end date
+NO_MONTH = np.iinfo(np.int32).max
+
+
+def encode(column: str, value) -> int:
+    codes = _CODES[column]
+    return codes.get(enum_value(value), codes["none"])
+
+
+def encode_date(value: Optional[str]) -> np.datetime64:
+    """`YYYY-MM-DD...` -> datetime64[D], NaT if missing or invalid."""
+    try:
+        return np.datetime64(value[:10], "D") if value else np.datetime64("NaT", "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def month_index(dates: np.ndarray) -> np.ndarray:
+    """datetime64[D] -> months since 1970-01 (int32), `NO_MONTH` for NaT."""
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    months[np.isnat(dates)] = NO_MONTH
+    return months.astype(np.int32)
+
+
+class EnterpriseColumns:
+    """Enterprise attributes stored as columnar NumPy arrays, for vectorized aggregates.
+    Rows are packed in `[0, len)`: removing a row moves the last row in its place.
+    Writes are serialized by a lock, aggregates work on a consistent snapshot of the rows.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._lock = threading.Lock()
+        self._ids: list[str] = []
+        self._row_by_id: dict[str, int] = {}
+        self._columns: dict[str, np.ndarray] = {
+            **{column: np.empty(capacity, dtype=np.int8) for column in CATEGORIES},
+            **{column: np.empty(capacity, dtype=dtype) for column, dtype in NUMERIC_COLUMNS.items()},
+            "contract_end_date": np.empty(capacity, dtype="datetime64[D]"),
+            # Derived from contract_end_date at write time: month binning is integer arithmetic
+            "contract_end_month": np.empty(capacity, dtype=np.int32),
+        }
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @classmethod
+    def from_items(cls, items) -> "EnterpriseColumns":
+        """Build from enterprise dicts with snake_case keys (`id`, `status`, ...)."""
+        columns = cls()
+        for item in items:
+            columns._upsert(item)
+        return columns
+
+    @classmethod
+    def from_arrays(cls, ids: list[str], **arrays: np.ndarray) -> "EnterpriseColumns":
+        """Build from already encoded columns (one array per column, see `CATEGORIES`)."""
+        columns = cls(capacity=max(len(ids), INITIAL_CAPACITY))
+        columns._ids = list(ids)
+        columns._row_by_id = {enterprise_id: row for row, enterprise_id in enumerate(ids)}
+        for name, values in arrays.items():
+            columns._columns[name][: len(ids)] = values
+        if "contract_end_date" in arrays and "contract_end_month" not in arrays:
+            columns._columns["contract_end_month"][: len(ids)] = month_index(
+                columns._columns["contract_end_date"][: len(ids)]
+            )
+        return columns
+
+    def upsert(self, item: dict):
+        with self._lock:
+            self._upsert(item)
+
+    def remove(self, enterprise_id: str):
+        with self._lock:
+            row = self._row_by_id.pop(enterprise_id, None)
+            if row is None:
+                return
+            last = len(self._ids) - 1
+            last_id = self._ids.pop()
+            if row != last:
+                for values in self._columns.values():
+                    values[row] = values[last]
+                self._ids[row] = last_id
+                self._row_by_id[last_id] = row
+
+    def snapshot(self, names: list[str]) -> dict[str, np.ndarray]:
+        """Copy of the `names` columns of the current rows."""
+        with self._lock:
+            size = len(self._ids)
+            return {name: self._columns[name][:size].copy() for name in names}
+
+    def _upsert(self, item: dict):
+        row = self._row_by_id.get(item["id"])
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._columns["status"]):
+                self._grow()
+            self._ids.append(item["id"])
+            self._row_by_id[item["id"]] = row
+
+        columns = self._columns
+        for column in CATEGORIES:
+            columns[column][row] = encode(column, item.get(column))
+        for column in NUMERIC_COLUMNS:
+            columns[column][row] = item.get(column) or 0
+        end_date = encode_date(item.get("contract_end_date"))
+        columns["contract_end_date"][row] = end_date
+        columns["contract_end_month"][row] = month_index(np.array([end_date]))[0]
+
+    def _grow(self):
+        for name, values in self._columns.items():
+            grown = np.empty(len(values) * 2, dtype=values.dtype)
+            grown[: len(values)] = values
+            self._columns[name] = grown
+
+
+def revenue_by(columns: dict[str, np.ndarray], group_by: str) -> list[dict]:
+    """Number of enterprises and MRR grouped by a categorical column."""
+    codes = columns[group_by]
+    categories = CATEGORIES[group_by]
+    counts = np.bincount(codes, minlength=len(categories))
+    revenues = np.bincount(codes, weights=columns["monthly_revenue"], minlength=len(categories))
+    return [
+        {
+            "key": key,
+            "enterprises": int(count),
+            "monthly_revenue": float(revenue),
+            "average_monthly_revenue": float(revenue / count) if count else 0.0,
+        }
+        for key, count, revenue in zip(categories, counts, revenues)
+        if count
+    ]
+
+
+def license_utilization(
+    columns: dict[str, np.ndarray],
+    percentiles: list[float],
+    group_by: Optional[str] = None,
+) -> list[dict]:
+    """Percentiles of `used_licenses / max_licenses`, overall or grouped by a categorical column.
+    Enterprises without license (max_licenses = 0) are ignored.
+    """
+    max_licenses = columns["max_licenses"]
+    used_licenses = columns["used_licenses"]
+    with_licenses = max_licenses > 0
+    utilization = np.zeros(len(max_licenses), dtype=np.float64)
+    np.divide(used_licenses, max_licenses, out=utilization, where=with_licenses)
+
+    if group_by is None:
+        groups = [("all", with_licenses)]
+    else:
+        codes = columns[group_by]
+        groups = [
+            (key, with_licenses & (codes == code))
+            for code, key in enumerate(CATEGORIES[group_by])
+        ]
+
+    output = []
+    for key, mask in groups:
+        values = utilization[mask]
+        if not len(values) and group_by is not None:
+            continue
+        output.append(
+            {
+                "key": key,
+                "enterprises": int(len(values)),
+                "used_licenses": int(used_licenses[mask].sum()),
+                "max_licenses": int(max_licenses[mask].sum()),
+                "mean": float(values.mean()) if len(values) else 0.0,
+                "percentiles": {
+                    f"p{p:g}": value for p, value in zip(percentiles, _percentiles(values, percentiles))
+                },
+            }
+        )
+    return output
+
+
+def _percentiles(values: np.ndarray, percentiles: list[float]) -> list[float]:
+    """Same result as `np.percentile` (linear method) with a single partial sort."""
+    if not len(values):
+        return [0.0] * len(percentiles)
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (len(values) - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, len(values) - 1)
+    partitioned = np.partition(values, np.unique(np.concatenate([lower, upper])))
+    return (partitioned[lower] + (partitioned[upper] - partitioned[lower]) * (positions - lower)).tolist()
+
+
+def contract_expiry_histogram(
+    columns: dict[str, np.ndarray], today: date, months: int
+) -> dict:
+    """Number of enterprises and MRR by month of contract end, for the next `months` months.
+    Contracts already ended, ending later, or without end date are counted apart.
+    """
+    end_months = columns["contract_end_month"]
+    current_month = np.datetime64(today, "M")
+    has_end = end_months != NO_MONTH
+
+    # Bins: 0 = already ended, 1..months = upcoming months, months + 1 = later, months + 2 = no end date
+    bins = end_months.astype(np.int64) - current_month.astype(np.int64) + 1
+    np.clip(bins, 0, months + 1, out=bins)
+    bins[~has_end] = months + 2
+    # Contracts ending earlier this month are already ended (NaT comparisons are False)
+    bins[columns["contract_end_date"] < np.datetime64(today, "D")] = 0
+
+    counts = np.bincount(bins, minlength=months + 3)
+    revenues = np.bincount(bins, weights=columns["monthly_revenue"], minlength=months + 3)
+    return {
+        "ended": {"enterprises": int(counts[0]), "monthly_revenue": float(revenues[0])},
+        "months": [
+            {
+                "month": str(current_month + np.timedelta64(i, "M")),
+                "enterprises": int(counts[i + 1]),
+                "monthly_revenue": float(revenues[i + 1]),
+            }
+            for i in range(months)
+        ],
+        "later": {"enterprises": int(counts[months + 1]), "monthly_revenue": float(revenues[months + 1])},
+        "no_end_date": {"enterprises": int(counts[months + 2]), "monthly_revenue": float(revenues[months + 2])},
+    }
@@ -0,0 +1,19 @@
+"""Helpers of the pure ASGI middlewares (`app.middlewares`, `app.metrics`)."""
+from starlette.types import Message, Send
+
+
+class StatusCapturingSend:
+    """`send` wrapper keeping the status of the response: 500 until the response is started
+    (the app raised before sending it).
+    """
+
+    __slots__ = ("send", "status_code")
+
+    def __init__(self, send: Send):
+        self.send = send
+        self.status_code = 500
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+        await self.send(message)
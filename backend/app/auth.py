@@ -3,6 +3,10 @@ import requests
 from jose import jwt
 import logging
 
+from app.logging_config import log_payload
+from app.metrics import JWKS_FETCH_DURATION
+from app.timing import span
+
 logger = logging.getLogger(__name__)
 
 REGION = os.environ.get("REGION", "eu-west-3")
@@ -11,20 +15,21 @@ CLIENT_ID = os.environ.get("CLIENT_ID", "")
 
 
 def verify_token(token: str) -> dict:
-    logger.info("verify_token()")
+    logger.debug("verify_token()")
     # Verify JWT token
     url = f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}/.well-known/jwks.json"
-    response = requests.get(url)
-    logger.info(f"response verify_token: {response}")
+    with JWKS_FETCH_DURATION.time(), span("jwks"):
+        response = requests.get(url)
+    logger.debug("response verify_token: %s", response)
     
     keys = response.json()["keys"]
-    logger.info(f"keys verify_token: {keys}")
+    log_payload(logger, "keys verify_token: %s", keys)
     
     header = jwt.get_unverified_header(token)
-    logger.info(f"header verify_token: {header}")
+    logger.debug("header verify_token: %s", header)
 
     key = [k for k in keys if k["kid"] == header["kid"]][0]
-    logger.info(f"key verify_token: {key}")
+    logger.debug("key verify_token: %s", key)
     # The JWT returned from the Identity Provider may contain an at_hash
     # jose jwt.decode verifies id_token with access_token by default if it contains at_hash
     # See : https://github.com/mpdavis/python-jose/blob/4b0701b46a8d00988afcc5168c2b3a1fd60d15d8/jose/jwt.py#L59
@@ -37,5 +42,4 @@ def verify_token(token: str) -> dict:
         options={"verify_at_hash": False},
         audience=CLIENT_ID,
     )
-    print(decoded)
     return decoded
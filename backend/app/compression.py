@@ -0,0 +1,260 @@
+"""Response compression: pure ASGI middleware negotiating `zstd`, `br` and `gzip`.
+
+- Only compressible types (JSON, NDJSON, text) are compressed, and bodies under
+  COMPRESSION_MIN_SIZE bytes are sent as is.
+- The level depends on the size of the body: small bodies get a higher level (cheap in absolute
+  terms), large ones a faster level. Large bodies are compressed off the event loop.
+- Streamed bodies (`StreamingResponse`) are compressed chunk by chunk, each chunk flushed so the
+  client receives the lines as they are produced.
+- The compression ratio and CPU time are added to the request log record and summed per
+  encoding (`compression_stats`).
+
+`br` and `zstd` need the optional `brotli` and `zstandard` packages: without them, only `gzip`
+is negotiated. Configuration: COMPRESSION_ENCODINGS (`zstd,br,gzip`, by preference),
+COMPRESSION_MIN_SIZE (1024).
+"""
+import gzip
+import os
+import threading
+import time
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.concurrency import run_blocking
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+# Bodies above this size are compressed in the I/O thread pool
+COMPRESSION_OFFLOAD_SIZE = 256 * 1024
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Level by body size: (max size in bytes, level), the last entry is also used for streamed bodies
+LEVELS = {
+    "zstd": [(64 * 1024, 6), (1024 * 1024, 3), (float("inf"), 1)],
+    "br": [(64 * 1024, 5), (1024 * 1024, 4), (float("inf"), 1)],
+    "gzip": [(64 * 1024, 6), (1024 * 1024, 4), (float("inf"), 1)],
+}
+AVAILABLE_ENCODINGS = [
+    encoding
+    for encoding in os.environ.get("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if encoding == "gzip" or (encoding == "br" and brotli) or (encoding == "zstd" and zstandard)
+]
+
+_stats_lock = threading.Lock()
+_stats = {encoding: {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0} for encoding in LEVELS}
+
+
+def compression_stats() -> dict[str, dict]:
+    """Totals per encoding since the start of the process, with the overall ratio (in / out)."""
+    with _stats_lock:
+        return {
+            encoding: {**totals, "ratio": totals["bytes_in"] / totals["bytes_out"] if totals["bytes_out"] else None}
+            for encoding, totals in _stats.items()
+        }
+
+
+def select_encoding(accept_encoding: str | None) -> str | None:
+    """Encoding to use for an `Accept-Encoding` header: highest q-value, then our preference."""
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    default = qualities.get("*", 0.0)
+    candidates = [
+        (qualities.get(encoding, default), -preference, encoding)
+        for preference, encoding in enumerate(AVAILABLE_ENCODINGS)
+    ]
+    quality, _, encoding = max(candidates, default=(0.0, 0, None))
+    return encoding if quality > 0 else None
+
+
+def compression_level(encoding: str, size: int | None) -> int:
+    """Level of `encoding` for a body of `size` bytes (None: streamed)."""
+    if size is None:
+        return LEVELS[encoding][-1][1]
+    return next(level for max_size, level in LEVELS[encoding] if size <= max_size)
+
+
+def compress(encoding: str, data: bytes, level: int) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compression: each `compress` call returns the data flushed so far."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.flush()
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, min_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(scope, send, encoding, self.min_size).run(self.app, receive)
+
+
+class _CompressedResponse:
+    """Compression state of one response. The start message is held until the first body
+    message: whether and how to compress depends on the body.
+    """
+
+    def __init__(self, scope: Scope, send: Send, encoding: str, min_size: int):
+        self.scope = scope
+        self.send = send
+        self.encoding = encoding
+        self.min_size = min_size
+        self.start_message: Message | None = None
+        # None until decided, then False (pass through) or the StreamCompressor of a streamed body
+        self.compressor: StreamCompressor | bool | None = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    async def run(self, app: ASGIApp, receive: Receive):
+        await app(self.scope, receive, self.send_compressed)
+        if self.bytes_in:
+            self._record()
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            # e.g. `http.response.pathsend` of a file: not compressed
+            if self.compressor is None:
+                self.compressor = False
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not self._is_compressible(body, more_body):
+                self.compressor = False
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            if not more_body:
+                await self._send_whole(body)
+                return
+            self.compressor = StreamCompressor(self.encoding, compression_level(self.encoding, None))
+            headers = self._compressed_headers()
+            del headers["content-length"]
+            await self.send(self.start_message)
+
+        if self.compressor is False:
+            await self.send(message)
+            return
+        started_at = time.thread_time()
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        self._count(len(body), len(data), time.thread_time() - started_at)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _is_compressible(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.start_message["headers"])
+        if "content-encoding" in headers or self.start_message["status"] in (204, 304):
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        size = len(body) if not more_body else int(headers.get("content-length", self.min_size))
+        return size >= self.min_size
+
+    async def _send_whole(self, body: bytes):
+        level = compression_level(self.encoding, len(body))
+        if len(body) > COMPRESSION_OFFLOAD_SIZE:
+            data, cpu_seconds = await run_blocking(_timed_compress, self.encoding, body, level)
+        else:
+            data, cpu_seconds = _timed_compress(self.encoding, body, level)
+        self._count(len(body), len(data), cpu_seconds)
+
+        headers = self._compressed_headers()
+        headers["content-length"] = str(len(data))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": data})
+
+    def _compressed_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=list(self.start_message["headers"]))
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        self.start_message["headers"] = headers.raw
+        return headers
+
+    def _count(self, bytes_in: int, bytes_out: int, cpu_seconds: float):
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.cpu_seconds += cpu_seconds
+
+    def _record(self):
+        with _stats_lock:
+            totals = _stats[self.encoding]
+            totals["responses"] += 1
+            totals["bytes_in"] += self.bytes_in
+            totals["bytes_out"] += self.bytes_out
+            totals["cpu_seconds"] += self.cpu_seconds
+        # Added to the request log record, see `RequestLoggingMiddleware`
+        self.scope.setdefault("state", {})["compression"] = {
+            "encoding": self.encoding,
+            "ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            "cpu_ms": round(self.cpu_seconds * 1000, 2),
+        }
+
+
+def _timed_compress(encoding: str, data: bytes, level: int) -> tuple[bytes, float]:
+    started_at = time.thread_time()
+    compressed = compress(encoding, data, level)
+    return compressed, time.thread_time() - started_at
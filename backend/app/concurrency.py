@@ -0,0 +1,26 @@
+"""Run the blocking calls (boto3, token verification) of async routes without blocking the event loop.
+
+The calls go to a dedicated thread pool sized for I/O waits (IO_MAX_WORKERS), instead of the
+default threadpool of sync routes and dependencies (40 threads). The context variables of the
+caller are copied to the thread.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+IO_MAX_WORKERS = int(os.environ.get("IO_MAX_WORKERS", "256"))
+
+_executor = ThreadPoolExecutor(max_workers=IO_MAX_WORKERS, thread_name_prefix="io")
+
+T = TypeVar("T")
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """Await `func(*args, **kwargs)` run in the I/O thread pool."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, functools.partial(context.run, func, *args, **kwargs)
+    )
@@ -1,21 +1,26 @@
 from app.auth import verify_token
+from app.concurrency import run_blocking
+from app.rate_limit import bucket_store, dynamodb_throttling, route_limit
+from app.timing import span
 from app.user import User
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 import logging
+import math
+
+from app.logging_config import log_payload
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
-def get_current_user(token: HTTPAuthorizationCredentials = Depends(security)):
-    decoded = verify_token(token.credentials)
-    logger.info(f"decoded: {decoded}")
+def authenticate(token: HTTPAuthorizationCredentials) -> User:
+    """Verify the token (blocking: fetches the signing keys) and return its user."""
     try:
         decoded = verify_token(token.credentials)
-        logger.info(f"decoded: {decoded}")
+        log_payload(logger, "decoded: %s", decoded)
         # Return user information
         return User(
             id=decoded["sub"],
@@ -31,7 +36,16 @@ def get_current_user(token: HTTPAuthorizationCredentials = Depends(security)):
         )
 
 
-def check_admin(user: User = Depends(get_current_user)):
+async def get_current_user(request: Request, token: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    # Already verified by the middleware for requests with a token
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user
+    with span("auth"):
+        return await run_blocking(authenticate, token)
+
+
+async def check_admin(user: User = Depends(get_current_user)):
     if not user.is_admin():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -39,16 +53,37 @@ def check_admin(user: User = Depends(get_current_user)):
         )
 
 
-def check_creating_license_enterprise_allowed(user: User = Depends(get_current_user)):
+async def check_creating_license_enterprise_allowed(user: User = Depends(get_current_user)):
     if not user.is_creating_licenses_and_enterprise_allowed():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not allowed to create a new Enterprise or License.",
         )
     
-def check_deleting_license_enterprise_allowed(user: User = Depends(get_current_user)):
+async def check_deleting_license_enterprise_allowed(user: User = Depends(get_current_user)):
     if not user.is_deleting_licenses_and_enterprise_allowed():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not allowed to delete an existing Enterprise or License.",
         )
+
+
+async def check_rate_limit(request: Request):
+    """Admission control, for all the routes: one token bucket per user and route
+    (see `app.rate_limit`). Rejected requests get a 429 with `Retry-After`.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return
+    user: User = request.state.current_user
+    name, rate, capacity = route_limit(f"{request.method} {route.path}")
+    # Above the capacity, a request could never be admitted
+    tokens = min(capacity, dynamodb_throttling.admission_cost())
+    wait = await bucket_store.take(f"{user.id}:{name}", rate, capacity, tokens)
+    if wait > 0:
+        logger.info("Rate limited", extra={"user_id": user.id, "route": name, "retry_after": wait})
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
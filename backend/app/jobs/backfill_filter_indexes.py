@@ -0,0 +1,19 @@
+"""Write the filter GSI keys (GSI2 to GSI5) on enterprises stored before the filter indexes existed.
+
+Usage: python -m app.jobs.backfill_filter_indexes
+"""
+import logging
+
+from app.repositories.enterprise_repository import backfill_filter_index_keys
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    updated = backfill_filter_index_keys()
+    logger.info(f"Filter index keys written on {updated} enterprises")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s - %(message)s")
+    main()
@@ -0,0 +1,92 @@
+"""Emit a renewal reminder event for each enterprise whose contract ends in the given range.
+
+Only the enterprises of the range are read: the range is a key condition on the status GSI.
+Only active and trial enterprises are reminded, once per contract end date: the job can run daily
+with the same window. The reminded contract end date is recorded on the enterprise item
+(conditional update) before the event is emitted.
+
+Usage: python -m app.jobs.renewal_reminders [--within 30d | --between 2026-01-01,2026-01-31]
+"""
+import argparse
+import logging
+from datetime import date
+from typing import Optional
+
+from app.repositories.common import decompose_enterprise_id
+from app.repositories.enterprise_repository import (
+    iter_enterprises_by_contract_end_range,
+    mark_renewal_reminder_sent,
+)
+from app.repositories.models.event_model import EntityTypeEnum, EventNameEnum, EventTypeEnum
+from app.routes.schemas.entreprise_schema import EnterpriseStatusEnum
+from app.services.enterprise_service import parse_contract_end_range
+from app.services.event_service import create_new_event
+from app.utils import get_current_time
+
+logger = logging.getLogger(__name__)
+
+# Author of the reminder events
+JOB_USER_ID = "renewal-reminders-job"
+# Suspended and inactive enterprises are not reminded
+REMINDED_STATUSES = (EnterpriseStatusEnum.ACTIVE, EnterpriseStatusEnum.TRIAL)
+
+
+def send_renewal_reminders(
+    within: Optional[str] = None,
+    between: Optional[str] = None,
+    today: Optional[date] = None,
+) -> int:
+    """Returns the number of reminders emitted."""
+    today = today or date.today()
+    start, end = parse_contract_end_range(within=within, between=between, today=today)
+    logger.info(f"Sending renewal reminders for contracts ending between {start} and {end}")
+
+    sent = 0
+    for status in REMINDED_STATUSES:
+        for item in iter_enterprises_by_contract_end_range(
+            start.isoformat(),
+            end.isoformat(),
+            attributes=["PK", "SK", "Name", "ContractEndDate", "RenewalReminderSentFor"],
+            status=status,
+        ):
+            contract_end_date = item["ContractEndDate"]
+            # Already reminded by a previous run: skipped without a write
+            if item.get("RenewalReminderSentFor") == contract_end_date:
+                continue
+            # Claimed first: concurrent runs do not both remind. A failed event is not retried.
+            if not mark_renewal_reminder_sent(item["PK"], contract_end_date):
+                continue
+            if create_new_event(
+                user_id=JOB_USER_ID,
+                event_date=get_current_time(),
+                event_name=EventNameEnum.REMINDER,
+                event_type=EventTypeEnum.CONTRACT_RENEWAL_REMINDER,
+                entity_id=decompose_enterprise_id(item["SK"]),
+                entity_type=EntityTypeEnum.ENTERPRISE,
+                metadata={
+                    "name": item["Name"],
+                    "contract_end_date": contract_end_date,
+                    "days_left": (date.fromisoformat(contract_end_date[:10]) - today).days,
+                },
+            ):
+                sent += 1
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    range_group = parser.add_mutually_exclusive_group()
+    range_group.add_argument("--within", help="Contracts ending from today within this window, like 30d or 6w")
+    range_group.add_argument("--between", help="Contracts ending between two dates, like 2026-01-01,2026-01-31")
+    args = parser.parse_args()
+
+    sent = send_renewal_reminders(
+        within=args.within if args.within or args.between else "30d",
+        between=args.between,
+    )
+    logger.info(f"{sent} renewal reminders sent")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s - %(message)s")
+    main()
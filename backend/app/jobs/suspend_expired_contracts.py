@@ -0,0 +1,201 @@
+"""Suspend the active enterprises whose contract has ended.
+
+- Reads only the candidates: range on the contract end date of the `STATUS#active` partition of the status GSI.
+- Conditional updates (`active` -> `suspended`), run concurrently with bounded parallelism.
+  Throttled updates are retried with exponential backoff.
+- One audit event per suspended enterprise, written in batches (one batch per page).
+- Resumable: the position is checkpointed to a file after each page. The file is removed once done.
+
+Locally, point it to a DynamoDB stand-in (e.g. DynamoDB Local) with `AWS_ENDPOINT_URL_DYNAMODB`.
+
+Usage: python -m app.jobs.suspend_expired_contracts [--before 2026-01-01] [--checkpoint path] [--max-workers 8]
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from app.repositories.common import (
+    BATCH_RETRY_MAX_ATTEMPTS,
+    _get_table_admin_client,
+    compute_backoff_delay,
+    is_throttling_error,
+)
+from app.repositories.enterprise_repository import (
+    get_enterprises_by_contract_end_range,
+    transition_enterprise_status,
+)
+from app.repositories.models.event_model import EntityTypeEnum, EventNameEnum, EventTypeEnum
+from app.routes.schemas.entreprise_schema import EnterpriseStatusEnum
+from app.services.event_service import create_new_events
+from app.utils import get_current_time
+
+logger = logging.getLogger(__name__)
+
+# Author of the updates and of the audit events
+JOB_USER_ID = "suspend-expired-contracts-job"
+DEFAULT_CHECKPOINT_PATH = ".suspend_expired_contracts.checkpoint.json"
+SUSPEND_MAX_WORKERS = int(os.environ.get("SUSPEND_MAX_WORKERS", "8"))
+SUSPEND_PAGE_SIZE = 100
+# Lower bound of the contract end dates
+MIN_CONTRACT_END_DATE = "0001-01-01"
+
+_thread_local = threading.local()
+
+
+def suspend_expired_contracts(
+    before: Optional[date] = None,
+    checkpoint_path: Optional[str] = DEFAULT_CHECKPOINT_PATH,
+    max_workers: int = SUSPEND_MAX_WORKERS,
+    page_size: int = SUSPEND_PAGE_SIZE,
+) -> dict:
+    """Suspend the active enterprises whose contract ended before `before` (default: today).
+    Returns the report: counters, duration and throughput.
+    """
+    end = ((before or date.today()) - timedelta(days=1)).isoformat()
+    checkpoint = _load_checkpoint(checkpoint_path, end)
+    counters = checkpoint["counters"]
+    exclusive_start_key = checkpoint["exclusive_start_key"]
+    if exclusive_start_key:
+        logger.info(f"Resuming from checkpoint {checkpoint_path}: {counters}")
+
+    started_at = time.monotonic()
+    processed_at_start = counters["read"]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            response = get_enterprises_by_contract_end_range(
+                MIN_CONTRACT_END_DATE,
+                end,
+                limit=page_size,
+                exclusive_start_key=exclusive_start_key,
+                attributes=["PK", "ContractEndDate"],
+                status=EnterpriseStatusEnum.ACTIVE,
+            )
+            items = response["Items"]
+            updated_date = get_current_time()
+            results = list(executor.map(lambda item: _suspend(item["PK"], updated_date), items))
+
+            suspended = [item for item, result in zip(items, results) if result is True]
+            create_new_events(
+                user_id=JOB_USER_ID,
+                event_date=updated_date,
+                event_name=EventNameEnum.MODIFY,
+                event_type=EventTypeEnum.ENTERPRISE_UPDATED,
+                entity_type=EntityTypeEnum.ENTERPRISE,
+                entities=[
+                    (
+                        item["PK"],
+                        {
+                            "status": {
+                                "from": EnterpriseStatusEnum.ACTIVE.value,
+                                "to": EnterpriseStatusEnum.SUSPENDED.value,
+                            },
+                            "reason": "contract_ended",
+                            "contract_end_date": item["ContractEndDate"],
+                        },
+                    )
+                    for item in suspended
+                ],
+            )
+
+            counters["read"] += len(items)
+            counters["suspended"] += len(suspended)
+            counters["skipped"] += results.count(False)
+            counters["failed"] += results.count(None)
+            exclusive_start_key = response.get("LastEvaluatedKey")
+            _save_checkpoint(checkpoint_path, end, exclusive_start_key, counters)
+            logger.info(
+                f"Page done: {counters}, "
+                f"{_throughput(counters['read'] - processed_at_start, started_at):.1f} enterprises/s"
+            )
+            if not exclusive_start_key:
+                break
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    duration = time.monotonic() - started_at
+    return {
+        **counters,
+        "duration_seconds": round(duration, 3),
+        "enterprises_per_second": round(_throughput(counters["read"] - processed_at_start, started_at), 1),
+    }
+
+
+def _suspend(enterprise_id: str, updated_date: str) -> Optional[bool]:
+    """True if suspended, False if no longer active, None if failed."""
+    if not hasattr(_thread_local, "table"):
+        # Resources are not thread safe: one per worker thread
+        _thread_local.table = _get_table_admin_client()
+
+    for attempt in range(BATCH_RETRY_MAX_ATTEMPTS):
+        try:
+            return transition_enterprise_status(
+                enterprise_id,
+                from_status=EnterpriseStatusEnum.ACTIVE,
+                to_status=EnterpriseStatusEnum.SUSPENDED,
+                updated_date=updated_date,
+                updated_by=JOB_USER_ID,
+                table=_thread_local.table,
+            )
+        except ClientError as err:
+            if not is_throttling_error(err) or attempt == BATCH_RETRY_MAX_ATTEMPTS - 1:
+                logger.error(f"Failed to suspend enterprise {enterprise_id}: {err}")
+                return None
+            time.sleep(compute_backoff_delay(attempt))
+    return None
+
+
+def _throughput(count: int, started_at: float) -> float:
+    elapsed = time.monotonic() - started_at
+    return count / elapsed if elapsed > 0 else 0.0
+
+
+def _load_checkpoint(path: Optional[str], end: str) -> dict:
+    empty = {
+        "exclusive_start_key": None,
+        "counters": {"read": 0, "suspended": 0, "skipped": 0, "failed": 0},
+    }
+    if not path or not os.path.exists(path):
+        return empty
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("end") != end:
+        logger.info(f"Ignoring checkpoint {path}: it was written for contracts ending up to {checkpoint.get('end')}")
+        return empty
+    return checkpoint
+
+
+def _save_checkpoint(path: Optional[str], end: str, exclusive_start_key: Optional[dict], counters: dict):
+    if not path:
+        return
+    # Write then rename: an interrupted write never leaves a truncated checkpoint
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"end": end, "exclusive_start_key": exclusive_start_key, "counters": counters}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--before", type=date.fromisoformat, help="Suspend contracts ended before this date (default: today)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="Checkpoint file")
+    parser.add_argument("--max-workers", type=int, default=SUSPEND_MAX_WORKERS, help="Concurrent updates")
+    args = parser.parse_args()
+
+    report = suspend_expired_contracts(
+        before=args.before,
+        checkpoint_path=args.checkpoint,
+        max_workers=args.max_workers,
+    )
+    logger.info(f"Done: {report}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s - %(message)s")
+    main()
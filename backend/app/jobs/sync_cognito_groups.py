@@ -0,0 +1,22 @@
+"""Apply the pending Cognito group operations of the outbox (create, rename, delete).
+
+The API applies them in a background worker; this entry point drains the outbox when the API
+instances are not running (e.g. scheduled, or after an outage).
+
+Usage: python -m app.jobs.sync_cognito_groups
+"""
+import logging
+
+from app.services.cognito_sync_service import sync_cognito_groups
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    counters = sync_cognito_groups()
+    logger.info(f"Cognito group sync: {counters}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s - %(message)s")
+    main()
@@ -0,0 +1,129 @@
+"""Logging of the API.
+
+- Records are put on a queue by the request threads. Formatting to JSON, redaction and I/O
+  happen in a listener thread.
+- On Lambda (AWS_LAMBDA_FUNCTION_NAME set), records are written by the calling thread: the
+  execution environment is frozen once the response is returned, with the listener thread and
+  the records still queued. atexit handlers do not run either.
+- Tokens (bearer tokens, JWTs) are redacted from the messages.
+- Large payloads (responses, items, claims) are logged with `log_payload`: DEBUG level, for a
+  sample of the calls only. Nothing is formatted for the calls left out.
+
+Configuration: LOG_LEVEL (INFO), LOG_FORMAT (`json` or `text`), LOG_PAYLOAD_SAMPLE_RATE (0.01).
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+# Too verbose at DEBUG level
+QUIET_LOGGERS = ["botocore", "boto3", "urllib3", "s3transfer"]
+
+REDACTED = "[REDACTED]"
+_SECRETS_PATTERN = re.compile(
+    r"(?P<scheme>Bearer\s+)[^\s'\",]+"
+    # JWTs: base64url JSON header, payload and signature
+    r"|eyJ[\w-]+\.[\w-]+\.[\w-]*",
+    re.IGNORECASE,
+)
+# Attributes of every LogRecord: the others come from `extra` and are output as fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_configured = False
+_listener = None
+
+
+def redact(text: str) -> str:
+    return _SECRETS_PATTERN.sub(lambda m: f"{m.group('scheme') or ''}{REDACTED}", text)
+
+
+def log_payload(logger: logging.Logger, msg: str, *args):
+    """Log a large payload at DEBUG level, for a sample of the calls (LOG_PAYLOAD_SAMPLE_RATE).
+    Pass the payload as an argument: it is only formatted if the record is kept.
+    """
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_PAYLOAD_SAMPLE_RATE:
+        logger.debug(msg, *args)
+
+
+class RedactingFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the `extra` fields of the record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        output = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        output.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            output["exception"] = record.exc_text
+        return json.dumps(output, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Only what cannot wait: the arguments and the traceback may change once the call returns.
+        The listener formats the record.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _is_running_on_lambda() -> bool:
+    return "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+
+
+def configure_logging():
+    """Route the records of the process through a queue to a listener thread, or straight to the
+    handler on Lambda. Idempotent.
+    """
+    global _configured, _listener
+    if _configured:
+        return
+    _configured = True
+
+    handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s - %(message)s"))
+    handler.addFilter(RedactingFilter())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(root.level, logging.INFO))
+    if _is_running_on_lambda():
+        root.handlers = [handler]
+        return
+
+    log_queue = queue.SimpleQueue()
+    root.handlers = [_QueueHandler(log_queue)]
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    # Flush the queue on exit
+    atexit.register(_listener.stop)
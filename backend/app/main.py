@@ -1,32 +1,42 @@
 import logging
 import os
-import traceback
+import threading
+from contextlib import asynccontextmanager
 from typing import Callable
 
-from app.dependencies import get_current_user
-# from app.repositories.common import (
-#     RecordAccessNotAllowedError,
-#     RecordNotFoundError,
-#     ResourceConflictError,
-# )
+from app.compression import CompressionMiddleware
+from app.dependencies import check_rate_limit
+from app.logging_config import configure_logging
+from app.metrics import MetricsMiddleware
+from app.middlewares import CurrentUserMiddleware, RequestLoggingMiddleware
+from app.repositories.common import (
+    # RecordAccessNotAllowedError,
+    RecordNotFoundError,
+    ResourceConflictError,
+)
+from app.routes.analytics import router as analytics_router
 from app.routes.enterprise import router as enterprise_router
 from app.routes.event import router as event_router
+from app.routes.license import router as license_router
+from app.routes.metrics import router as metrics_router
+from app.repositories.cognito_repository import USER_POOL_ID
+from app.services.analytics_service import warm_up_analytics
+from app.services.cognito_sync_service import start_cognito_sync_worker
+from app.services.enterprise_search_service import warm_up_search_index
+from app.timing import SPANS_HEADER, ServerTimingMiddleware
 # from app.routes.published_api import router as published_api_router
-from app.user import User
 # from app.utils import is_running_on_lambda
-from fastapi import Depends, FastAPI, Request
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import ValidationError
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp, Message
 
 CORS_ALLOW_ORIGINS = os.environ.get("CORS_ALLOW_ORIGINS", "*")
 
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s - %(message)s")
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -38,13 +48,29 @@ logger = logging.getLogger(__name__)
 # ]
 title = "IQ Admin Panel API"
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Build the in-memory search index and analytics without delaying the startup
+    threading.Thread(target=warm_up_search_index, daemon=True).start()
+    threading.Thread(target=warm_up_analytics, daemon=True).start()
+    if USER_POOL_ID:
+        start_cognito_sync_worker()
+    yield
+
+
 app = FastAPI(
     # openapi_tags=openapi_tags,
     title=title,
+    lifespan=lifespan,
+    dependencies=[Depends(check_rate_limit)],
 )
 
 app.include_router(enterprise_router)
 app.include_router(event_router)
+app.include_router(analytics_router)
+app.include_router(license_router)
+app.include_router(metrics_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -52,20 +78,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by the frontend, served from another origin
+    expose_headers=["Server-Timing", SPANS_HEADER],
 )
+# The last added middleware is the outermost
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(CurrentUserMiddleware)
+# Outside `CurrentUserMiddleware`, to time the auth
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 def error_handler_factory(status_code: int) -> Callable[[Request, Exception], Response]:
     def error_handler(_: Request, exc: Exception) -> JSONResponse:
-        logger.error("Middleware Error handler:")
-        logger.error(exc)
-        logger.error("".join(traceback.format_tb(exc.__traceback__)))
+        logger.error("Middleware Error handler: %s", exc, exc_info=exc)
         return JSONResponse({"errors": [str(exc)]}, status_code=status_code)
 
     return error_handler  # type: ignore
 
 
-# app.add_exception_handler(RecordNotFoundError, error_handler_factory(404))
+app.add_exception_handler(RecordNotFoundError, error_handler_factory(404))
 app.add_exception_handler(FileNotFoundError, error_handler_factory(404))
 # app.add_exception_handler(RecordAccessNotAllowedError, error_handler_factory(403))
 app.add_exception_handler(ValueError, error_handler_factory(400))
@@ -73,45 +106,5 @@ app.add_exception_handler(TypeError, error_handler_factory(400))
 app.add_exception_handler(AssertionError, error_handler_factory(400))
 app.add_exception_handler(PermissionError, error_handler_factory(403))
 app.add_exception_handler(ValidationError, error_handler_factory(422))
-# app.add_exception_handler(ResourceConflictError, error_handler_factory(409))
+app.add_exception_handler(ResourceConflictError, error_handler_factory(409))
 app.add_exception_handler(Exception, error_handler_factory(500))
-
-
-@app.middleware("http")
-def add_current_user_to_request(request: Request, call_next: ASGIApp):
-    authorization = request.headers.get("Authorization")
-    logger.info("add_current_user_to_request()")
-    if authorization:
-        logger.info("authorization TRUE")
-        token_str = authorization.split(" ")[1]
-        logger.info(f"token: {token_str}")
-        token = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token_str)
-        logger.info(f"token HTTP: {token_str}")
-        logger.info(f"User: {get_current_user(token)}")
-
-        request.state.current_user = get_current_user(token)
-    else:
-        logger.info("authorization FALSE")
-        request.state.current_user = User(
-            id="test_user", name="test_user", groups=[], role="admin"
-        )
-        logger.info(request.state)
-
-    response = call_next(request)  # type: ignore
-    logger.info(f"response: {response}")
-    return response
-
-
-
-@app.middleware("http")
-async def add_log_requests(request: Request, call_next: ASGIApp):
-    logger.info(f"Request path: {request.url.path}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Request headers: {request.headers}")
-
-    body = await request.body()
-    logger.info(f"Request body: {body.decode('utf-8')[:100]}...")
-
-    response = await call_next(request)  # type: ignore
-
-    return response
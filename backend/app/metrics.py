@@ -0,0 +1,134 @@
+"""Prometheus metrics, exposed on GET /metrics.
+
+- Requests: latency by method, route template and status, requests in flight (`MetricsMiddleware`).
+- DynamoDB: latency by operation, errors by operation and code. Collected by botocore event
+  handlers on the resources of the repositories (see `_get_aws_resource`), which also add the
+  span of the call to the `Server-Timing` of the request (`app.timing`).
+- JWKS: latency of the fetches of the Cognito signing keys.
+- Coalesced reads and compression: collected from `singleflight_stats` and
+  `compression_stats` at each scrape, hit ratio = (shared + cached) / calls.
+"""
+import time
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.asgi import StatusCapturingSend
+from app.compression import compression_stats
+from app.singleflight import singleflight_stats
+from app.timing import record_dynamodb_call
+
+# Requests are slower than the DynamoDB calls: their buckets go further
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AWS_CALL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+DYNAMODB_DURATION = Histogram(
+    "dynamodb_operation_duration_seconds",
+    "Duration of the DynamoDB calls, retries included",
+    ["operation"],
+    buckets=AWS_CALL_BUCKETS,
+)
+DYNAMODB_ERRORS = Counter(
+    "dynamodb_operation_errors_total",
+    "DynamoDB calls which failed",
+    ["operation", "code"],
+)
+JWKS_FETCH_DURATION = Histogram(
+    "jwks_fetch_duration_seconds",
+    "Duration of the fetches of the Cognito signing keys (JWKS)",
+    buckets=AWS_CALL_BUCKETS,
+)
+
+# Requests not matching a route: one label value, whatever the path
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing the requests. The route is the template (`/enterprise/{enterprise_id}`),
+    set in the scope by the router: the cardinality is bounded by the routes.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        send_with_status = StatusCapturingSend(send)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = route.path if route is not None else UNMATCHED_ROUTE
+            histogram = _child(REQUEST_DURATION, scope["method"], route_path, send_with_status.status_code)
+            histogram.observe(time.perf_counter() - started_at)
+
+
+# Children of the labelled metrics by label values: `labels()` validates the values on each call
+_children = {}
+
+
+def _child(metric, *label_values):
+    key = (metric._name, label_values)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*label_values)
+    return child
+
+
+def before_dynamodb_call(context: dict, **kwargs):
+    """botocore `before-call` handler: `context` is kept until `after-call`."""
+    context["call_started_at"] = time.perf_counter()
+
+
+def after_dynamodb_call(context: dict, model, parsed: dict, **kwargs):
+    """botocore `after-call` handler, also called for the error responses."""
+    started_at = context.get("call_started_at")
+    if started_at is not None:
+        ended_at = time.perf_counter()
+        _child(DYNAMODB_DURATION, model.name).observe(ended_at - started_at)
+        record_dynamodb_call(model.name, started_at, ended_at)
+    if "Error" in parsed:
+        DYNAMODB_ERRORS.labels(model.name, parsed["Error"].get("Code", "Unknown")).inc()
+
+
+class _StatsCollector:
+    """Counters kept by the other modules, read at each scrape."""
+
+    def collect(self):
+        calls = CounterMetricFamily(
+            "singleflight_calls", "Calls of the coalesced reads, by outcome", labels=["function", "outcome"]
+        )
+        for function, stats in singleflight_stats().items():
+            calls.add_metric([function, "executed"], stats["executions"])
+            calls.add_metric([function, "shared"], stats["shared"])
+            calls.add_metric([function, "cached"], stats["cached"])
+        yield calls
+
+        responses = CounterMetricFamily("compression_responses", "Compressed responses", labels=["encoding"])
+        bytes_in = CounterMetricFamily("compression_input_bytes", "Bytes before compression", labels=["encoding"])
+        bytes_out = CounterMetricFamily("compression_output_bytes", "Bytes after compression", labels=["encoding"])
+        cpu = CounterMetricFamily("compression_cpu_seconds", "CPU time of the compression", labels=["encoding"])
+        for encoding, stats in compression_stats().items():
+            responses.add_metric([encoding], stats["responses"])
+            bytes_in.add_metric([encoding], stats["bytes_in"])
+            bytes_out.add_metric([encoding], stats["bytes_out"])
+            cpu.add_metric([encoding], stats["cpu_seconds"])
+        yield from (responses, bytes_in, bytes_out, cpu)
+
+
+REGISTRY.register(_StatsCollector())
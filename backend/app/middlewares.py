@@ -0,0 +1,110 @@
+"""Pure ASGI middlewares: they call the next app directly with the same `receive` and `send`,
+so the body is never buffered and no task or memory stream is added per request
+(unlike `@app.middleware("http")`, built on `BaseHTTPMiddleware`).
+"""
+import json
+import logging
+import time
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import JWTError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.asgi import StatusCapturingSend
+from app.concurrency import run_blocking
+from app.dependencies import authenticate
+from app.timing import span
+from app.user import User
+
+logger = logging.getLogger(__name__)
+
+# Used when the request has no Authorization header
+ANONYMOUS_USER = User(id="test_user", name="test_user", groups=[], role="admin")
+
+
+def get_header(scope: Scope, name: bytes) -> str | None:
+    """Value of a header of the ASGI scope. `name` is lowercase, as in the scope."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class CurrentUserMiddleware:
+    """Set `request.state.current_user` from the bearer token of the request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        authorization = get_header(scope, b"authorization")
+        if authorization:
+            scheme, _, token_str = authorization.partition(" ")
+            token = HTTPAuthorizationCredentials(scheme=scheme, credentials=token_str)
+            try:
+                # Token verification fetches the signing keys: blocking I/O, kept off the event loop
+                with span("auth"):
+                    current_user = await run_blocking(authenticate, token)
+            except HTTPException as exc:
+                await _send_json(send, exc.status_code, {"detail": exc.detail}, exc.headers)
+                return
+            except (JWTError, IndexError, KeyError) as e:
+                logger.info("Invalid token: %s", e)
+                await _send_json(send, 403, {"detail": "Could not validate credentials"})
+                return
+        else:
+            current_user = ANONYMOUS_USER
+
+        # `request.state` is backed by `scope["state"]`
+        scope.setdefault("state", {})["current_user"] = current_user
+        await self.app(scope, receive, send)
+
+
+class RequestLoggingMiddleware:
+    """Log one structured record per request: method, path, status and duration.
+    Neither the headers (tokens) nor the body are logged.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        send_with_status = StatusCapturingSend(send)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            status_code = send_with_status.status_code
+            extra = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration_ms, 1),
+            }
+            # Set by `CompressionMiddleware` when the response was compressed
+            compression = scope.get("state", {}).get("compression")
+            if compression:
+                extra["compression"] = compression
+            logger.info("%s %s %d %.1fms", scope["method"], scope["path"], status_code, duration_ms, extra=extra)
+
+
+async def _send_json(send: Send, status_code: int, content: dict, headers: dict | None = None):
+    body = json.dumps(content).encode()
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        *((key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in (headers or {}).items()),
+    ]
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
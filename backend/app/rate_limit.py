@@ -0,0 +1,215 @@
+"""Token buckets.
+
+- `TokenBucket`: in-process bucket, used to pace our calls to AWS (Cognito).
+- Admission control of the API requests (`check_rate_limit` in `app.dependencies`): one bucket
+  per user and route, in memory (`MemoryBucketStore`) or in Redis (`RedisBucketStore`), shared
+  by the workers and instances. While DynamoDB throttles our requests (`dynamodb_throttling`),
+  each request costs more tokens: the load is shed before it reaches the table.
+
+Configuration:
+- RATE_LIMITS: JSON of the limits by route, `{"METHOD /path": [rate per second, burst]}`,
+  merged into DEFAULT_RATE_LIMITS. `*` is the limit of the other routes, shared by them.
+- RATE_LIMIT_REDIS_URL: Redis of the buckets (e.g. redis://localhost:6379/0), in memory if not set.
+  While Redis is unreachable, the buckets of the process are used.
+- RATE_LIMIT_REDIS_TIMEOUT (0.1): seconds before a Redis call (or connection) fails.
+- LOAD_SHEDDING_THRESHOLD (0.05): share of throttled DynamoDB requests above which the load is shed.
+"""
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` tokens."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Take `tokens`, waiting until they are available."""
+        while True:
+            with self._lock:
+                wait = self._take(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take `tokens` if available now."""
+        return self.take(tokens) <= 0
+
+    def take(self, tokens: float = 1.0) -> float:
+        """Take `tokens` if available now and return 0, or return the seconds to wait for them."""
+        with self._lock:
+            return self._take(tokens)
+
+    def _take(self, tokens: float) -> float:
+        """Take the tokens and return 0, or return the seconds to wait for them."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+
+DEFAULT_RATE_LIMITS = {
+    "*": (10.0, 40),
+    "POST /enterprise:batchGet": (2.0, 5),
+    "POST /enterprise/{enterprise_id}/users:provision": (0.1, 2),
+}
+RATE_LIMITS = {
+    **DEFAULT_RATE_LIMITS,
+    **{route: tuple(limit) for route, limit in json.loads(os.environ.get("RATE_LIMITS", "{}")).items()},
+}
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_REDIS_TIMEOUT = float(os.environ.get("RATE_LIMIT_REDIS_TIMEOUT", "0.1"))
+# Buckets kept by the memory store: the least recently used are dropped (full again when recreated)
+RATE_LIMIT_MAX_BUCKETS = 10_000
+LOAD_SHEDDING_THRESHOLD = float(os.environ.get("LOAD_SHEDDING_THRESHOLD", "0.05"))
+LOAD_SHEDDING_MAX_COST = 10.0
+
+
+def route_limit(route: str) -> tuple[str, float, float]:
+    """Bucket name, rate and capacity of a route (`METHOD /path`)."""
+    name = route if route in RATE_LIMITS else "*"
+    rate, capacity = RATE_LIMITS[name]
+    return name, rate, capacity
+
+
+class MemoryBucketStore:
+    """Buckets of this process."""
+
+    def __init__(self, max_buckets: int = RATE_LIMIT_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: collections.OrderedDict[str, TokenBucket] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float = 1.0) -> float:
+        """Take `tokens` from the bucket `key` and return 0, or return the seconds to wait for them."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate=rate, capacity=capacity)
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.take(tokens)
+
+
+class RedisBucketStore:
+    """Buckets in Redis, shared by the workers: refilled and taken atomically by a Lua script,
+    on the clock of the Redis server. Idle buckets expire once full again.
+    While Redis fails (down, timeouts), the buckets of the process are used: the requests are
+    still limited, per worker, rather than failed.
+    """
+
+    _SCRIPT = """
+    local rate, capacity, tokens = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local available = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    available = math.min(capacity, available + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if available >= tokens then
+        available = available - tokens
+    else
+        wait = (tokens - available) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', available, 'updated_at', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    def __init__(self, client, prefix: str = "rate-limit:"):
+        """`client`: a `redis.asyncio.Redis`."""
+        from redis.exceptions import RedisError
+
+        self.prefix = prefix
+        self._script = client.register_script(self._SCRIPT)
+        self._errors = RedisError
+        self._fallback = MemoryBucketStore()
+        self._failing = False
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketStore":
+        import redis.asyncio
+
+        return cls(
+            redis.asyncio.Redis.from_url(
+                url, socket_timeout=RATE_LIMIT_REDIS_TIMEOUT, socket_connect_timeout=RATE_LIMIT_REDIS_TIMEOUT
+            )
+        )
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float = 1.0) -> float:
+        try:
+            # Numbers are returned as strings: Redis truncates the Lua numbers to integers
+            wait = await self._script(keys=[self.prefix + key], args=[rate, capacity, tokens])
+        except self._errors as e:
+            if not self._failing:
+                logger.warning(f"Rate limit: Redis failed ({e!r}), using the buckets of the process")
+                self._failing = True
+            return await self._fallback.take(key, rate, capacity, tokens)
+        if self._failing:
+            logger.info("Rate limit: Redis is back")
+            self._failing = False
+        return float(wait)
+
+
+class ThrottleMonitor:
+    """Share of the DynamoDB requests throttled over the last `window` seconds, fed with each
+    attempt of the requests (see `_get_aws_resource`).
+    """
+
+    def __init__(self, window: int = 10, min_attempts: int = 20):
+        self.window = window
+        self.min_attempts = min_attempts
+        # [second, attempts, throttled attempts], oldest first
+        self._counts: collections.deque[list[int]] = collections.deque()
+        self._lock = threading.Lock()
+
+    def record(self, throttled: bool, now: float | None = None):
+        second = int(time.monotonic() if now is None else now)
+        with self._lock:
+            if not self._counts or self._counts[-1][0] != second:
+                self._counts.append([second, 0, 0])
+                self._expire(second)
+            self._counts[-1][1] += 1
+            self._counts[-1][2] += throttled
+
+    def throttled_ratio(self, now: float | None = None) -> float:
+        with self._lock:
+            self._expire(int(time.monotonic() if now is None else now))
+            attempts = sum(count[1] for count in self._counts)
+            throttled = sum(count[2] for count in self._counts)
+        return throttled / attempts if attempts >= self.min_attempts else 0.0
+
+    def admission_cost(self) -> float:
+        """Tokens taken per request: 1, up to LOAD_SHEDDING_MAX_COST while the throttled
+        share exceeds LOAD_SHEDDING_THRESHOLD (2x the threshold: 2 tokens, ...).
+        """
+        ratio = self.throttled_ratio()
+        if ratio <= LOAD_SHEDDING_THRESHOLD:
+            return 1.0
+        return min(LOAD_SHEDDING_MAX_COST, ratio / LOAD_SHEDDING_THRESHOLD)
+
+    def _expire(self, second: int):
+        while self._counts and self._counts[0][0] <= second - self.window:
+            self._counts.popleft()
+
+
+bucket_store = RedisBucketStore.from_url(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBucketStore()
+dynamodb_throttling = ThrottleMonitor()
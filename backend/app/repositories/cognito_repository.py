@@ -0,0 +1,83 @@
+import logging
+import os
+from functools import cache
+
+import boto3
+from botocore.exceptions import ClientError
+
+from app.repositories.common import REGION
+
+logger = logging.getLogger(__name__)
+
+USER_POOL_ID = os.environ.get("USER_POOL_ID", "")
+
+
+@cache
+def _get_cognito_client():
+    """Clients are thread safe: a single one is shared.
+    Locally, `AWS_ENDPOINT_URL_COGNITO_IDP` points the client to a Cognito stand-in."""
+    return boto3.client("cognito-idp", region_name=REGION)
+
+
+def create_group(group_name: str, description: str = ""):
+    """Create a group of the user pool. Already existing groups are left as is."""
+    try:
+        _get_cognito_client().create_group(UserPoolId=USER_POOL_ID, GroupName=group_name, Description=description)
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "GroupExistsException":
+            raise err
+        logger.info(f"Cognito group {group_name} already exists")
+
+
+def delete_group(group_name: str):
+    """Delete a group of the user pool (memberships included). Missing groups are ignored."""
+    try:
+        _get_cognito_client().delete_group(UserPoolId=USER_POOL_ID, GroupName=group_name)
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "ResourceNotFoundException":
+            raise err
+        logger.info(f"Cognito group {group_name} already deleted")
+
+
+def iter_group_usernames(group_name: str):
+    """Iterate over the usernames of a group, page by page. Nothing if the group does not exist."""
+    params = {"UserPoolId": USER_POOL_ID, "GroupName": group_name}
+    while True:
+        try:
+            response = _get_cognito_client().list_users_in_group(**params)
+        except ClientError as err:
+            if err.response["Error"]["Code"] == "ResourceNotFoundException":
+                return
+            raise err
+        for user in response["Users"]:
+            yield user["Username"]
+        if not response.get("NextToken"):
+            return
+        params["NextToken"] = response["NextToken"]
+
+
+def add_user_to_group(username: str, group_name: str):
+    _get_cognito_client().admin_add_user_to_group(UserPoolId=USER_POOL_ID, Username=username, GroupName=group_name)
+
+
+def admin_create_user(email: str, name: str) -> bool:
+    """Create a user of the user pool, identified by its email, and send it the invitation.
+    Returns False if the user already exists.
+    """
+    try:
+        _get_cognito_client().admin_create_user(
+            UserPoolId=USER_POOL_ID,
+            Username=email,
+            UserAttributes=[
+                {"Name": "email", "Value": email},
+                {"Name": "email_verified", "Value": "true"},
+                {"Name": "name", "Value": name},
+            ],
+            DesiredDeliveryMediums=["EMAIL"],
+        )
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "UsernameExistsException":
+            raise err
+        logger.info(f"Cognito user {email} already exists")
+        return False
+    return True
@@ -0,0 +1,100 @@
+import logging
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from app.repositories.common import _get_table_admin_client
+
+logger = logging.getLogger(__name__)
+
+# Outbox of the Cognito group operations, in the admin table: PK = `COGNITO_SYNC`, SK = enterprise id.
+# One item per enterprise holds the desired group (`TargetGroupName`) and the group known to exist
+# in Cognito (`AppliedGroupName`), "" for no group. New operations only move the target:
+# redundant operations coalesce (create + rename = create, rename + delete = delete, ...).
+OUTBOX_PK = "COGNITO_SYNC"
+
+
+def enqueue_group_sync(enterprise_id: str, target_group_name: str, applied_group_name: str, updated_date: str):
+    """Set the desired group of an enterprise ("" to delete it).
+    `applied_group_name` is only used if nothing is pending: otherwise the pending item knows better.
+    """
+    table = _get_table_admin_client()
+    logger.info(f"Enqueue Cognito group sync of enterprise {enterprise_id}: {target_group_name!r}")
+
+    table.update_item(
+        Key={"PK": OUTBOX_PK, "SK": enterprise_id},
+        UpdateExpression=(
+            "SET TargetGroupName = :target, "
+            "AppliedGroupName = if_not_exists(AppliedGroupName, :applied), "
+            "Version = if_not_exists(Version, :zero) + :one, "
+            "Attempts = :zero, NextAttemptAt = :zero, UpdatedDate = :updated_date"
+        ),
+        ExpressionAttributeValues={
+            ":target": target_group_name,
+            ":applied": applied_group_name,
+            ":zero": 0,
+            ":one": 1,
+            ":updated_date": updated_date,
+        },
+    )
+
+
+def find_pending_group_syncs(now: int) -> list[dict]:
+    """Outbox items due at `now` (epoch seconds)."""
+    table = _get_table_admin_client()
+    query_params = {
+        "KeyConditionExpression": Key("PK").eq(OUTBOX_PK),
+        "FilterExpression": Attr("NextAttemptAt").lte(now),
+    }
+    items = []
+    while True:
+        response = table.query(**query_params)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return items
+        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def complete_group_sync(enterprise_id: str, version: int, applied_group_name: str) -> bool:
+    """Remove the outbox item once applied, unless a newer operation was enqueued meanwhile:
+    then only record the applied group and return False.
+    """
+    table = _get_table_admin_client()
+    try:
+        table.delete_item(
+            Key={"PK": OUTBOX_PK, "SK": enterprise_id},
+            ConditionExpression="Version = :version",
+            ExpressionAttributeValues={":version": version},
+        )
+        return True
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise err
+
+    table.update_item(
+        Key={"PK": OUTBOX_PK, "SK": enterprise_id},
+        UpdateExpression="SET AppliedGroupName = :applied",
+        ConditionExpression="attribute_exists(PK)",
+        ExpressionAttributeValues={":applied": applied_group_name},
+    )
+    return False
+
+
+def record_group_sync_failure(enterprise_id: str, version: int, next_attempt_at: int, error: str):
+    """Postpone the next attempt. Ignored if a newer operation was enqueued meanwhile."""
+    table = _get_table_admin_client()
+    try:
+        table.update_item(
+            Key={"PK": OUTBOX_PK, "SK": enterprise_id},
+            UpdateExpression="SET Attempts = Attempts + :one, NextAttemptAt = :next_attempt_at, LastError = :error",
+            ConditionExpression="Version = :version",
+            ExpressionAttributeValues={
+                ":one": 1,
+                ":next_attempt_at": next_attempt_at,
+                ":error": error[:1000],
+                ":version": version,
+            },
+        )
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise err
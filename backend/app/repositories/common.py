@@ -1,7 +1,16 @@
+import base64
 import json
 import os
+import random
+from enum import Enum
+from typing import Any, Optional
+
 import boto3
 
+from app import timing
+from app.metrics import after_dynamodb_call, before_dynamodb_call
+from app.rate_limit import dynamodb_throttling
+
 
 ACCOUNT = os.environ.get("ACCOUNT", "")
 REGION = os.environ.get("REGION", "eu-west-3")
@@ -10,6 +19,18 @@ ADMIN_TABLE_NAME = os.environ.get("ADMIN_TABLE_NAME", "")
 EVENTS_TABLE_NAME = os.environ.get("EVENTS_TABLE_NAME", "")
 ADMIN_TABLE_ACCESS_ROLE_ARN = os.environ.get("ADMIN_TABLE_ACCESS_ROLE_ARN", "")
 # TRANSACTION_BATCH_SIZE = 25
+BATCH_GET_ITEM_SIZE = 100
+BATCH_RETRY_MAX_ATTEMPTS = 8
+BATCH_RETRY_BASE_DELAY = 0.05  # seconds
+BATCH_RETRY_MAX_DELAY = 2.0  # seconds
+# Error codes of requests rejected by DynamoDB throttling: they feed the load shedding
+DYNAMODB_THROTTLING_ERROR_CODES = {
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+}
+# Error codes of the throttled DynamoDB and Cognito requests: retry them with backoff
+THROTTLING_ERROR_CODES = DYNAMODB_THROTTLING_ERROR_CODES | {"TooManyRequestsException"}
 
 
 class RecordNotFoundError(Exception):
@@ -33,6 +54,18 @@ def decompose_enterprise_id(composed_enterprise_id: str):
     return composed_enterprise_id.split("#")[-1]
 
 
+def compose_cognito_group_name(enterprise_name: str):
+    return enterprise_name.replace(" ", "").upper()
+
+
+def compose_license_id(license_id: str):
+    return f"LICENSE#{license_id}"
+
+
+def decompose_license_id(composed_license_id: str):
+    return composed_license_id.split("#")[-1]
+
+
 def compose_event_id(event_id: str):
     return f"EVENT#{event_id}"
 
@@ -41,6 +74,72 @@ def decompose_event_id(composed_event_id: str):
     return composed_event_id.split("#")[-1]
 
 
+def encode_pagination_token(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    """Encode a DynamoDB `LastEvaluatedKey` into an opaque pagination token."""
+    if not last_evaluated_key:
+        return None
+    return base64.urlsafe_b64encode(
+        json.dumps(last_evaluated_key, separators=(",", ":")).encode("utf-8")
+    ).decode("ascii")
+
+
+def decode_pagination_token(token: Optional[str]) -> Optional[dict]:
+    """Decode a pagination token into a DynamoDB `ExclusiveStartKey`."""
+    if not token:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid pagination token")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid pagination token")
+    return key
+
+
+def enum_value(value: Any) -> Any:
+    """Return the raw value of an Enum member, or the value unchanged."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def optional_enum(enum_class: type[Enum], value: Any) -> Optional[Enum]:
+    """Enum member of a raw value read from DynamoDB, or None."""
+    return None if value is None else enum_class(value)
+
+
+def optional_int(value: Any) -> Optional[int]:
+    """int of a number read from DynamoDB (a Decimal), or None."""
+    return None if value is None else int(value)
+
+
+def compute_backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter.
+    Ref: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    """
+    return random.uniform(
+        0, min(BATCH_RETRY_MAX_DELAY, BATCH_RETRY_BASE_DELAY * (2**attempt))
+    )
+
+
+def is_throttling_error(err: Exception) -> bool:
+    response = getattr(err, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def _record_dynamodb_attempt(response=None, **kwargs):
+    """botocore `needs-retry` handler, called after each attempt: feeds the load shedding.
+    Returns None, the retry decision is left to botocore.
+    """
+    if response is not None:
+        dynamodb_throttling.record(response[1].get("Error", {}).get("Code") in DYNAMODB_THROTTLING_ERROR_CODES)
+
+
+def _instrument(resource):
+    events = resource.meta.client.meta.events
+    events.register("needs-retry.dynamodb", _record_dynamodb_attempt)
+    events.register("before-call.dynamodb", before_dynamodb_call)
+    events.register("after-call.dynamodb", after_dynamodb_call)
+    return resource
+
 
 def _get_aws_resource(service_name, user_id=None):
     """Get AWS resource with optional row-level access control for DynamoDB.
@@ -48,15 +147,15 @@ def _get_aws_resource(service_name, user_id=None):
     """
     if "AWS_EXECUTION_ENV" not in os.environ:
         if DDB_ENDPOINT_URL:
-            return boto3.resource(
+            return _instrument(boto3.resource(
                 service_name,
                 endpoint_url=DDB_ENDPOINT_URL,
                 aws_access_key_id="key",
                 aws_secret_access_key="key",
                 region_name=REGION,
-            )
+            ))
         else:
-            return boto3.resource(service_name, region_name=REGION)
+            return _instrument(boto3.resource(service_name, region_name=REGION))
 
     policy_document = {
         "Statement": [
@@ -89,18 +188,19 @@ def _get_aws_resource(service_name, user_id=None):
         }
 
     sts_client = boto3.client("sts")
-    assumed_role_object = sts_client.assume_role(
-        RoleArn=ADMIN_TABLE_ACCESS_ROLE_ARN,
-        RoleSessionName="DynamoDBSession",
-        Policy=json.dumps(policy_document),
-    )
+    with timing.span("sts"):
+        assumed_role_object = sts_client.assume_role(
+            RoleArn=ADMIN_TABLE_ACCESS_ROLE_ARN,
+            RoleSessionName="DynamoDBSession",
+            Policy=json.dumps(policy_document),
+        )
     credentials = assumed_role_object["Credentials"]
     session = boto3.Session(
         aws_access_key_id=credentials["AccessKeyId"],
         aws_secret_access_key=credentials["SecretAccessKey"],
         aws_session_token=credentials["SessionToken"],
     )
-    return session.resource(service_name, region_name=REGION)
+    return _instrument(session.resource(service_name, region_name=REGION))
 
 
 
@@ -113,4 +213,4 @@ def _get_table_admin_client():
 
 def _get_table_event_client():
     """Get a DynamoDB table client."""
-    return boto3.resource("dynamodb").Table(EVENTS_TABLE_NAME)
+    return _instrument(boto3.resource("dynamodb")).Table(EVENTS_TABLE_NAME)
@@ -1,22 +1,35 @@
 
 import asyncio
 import base64
+import contextvars
 import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal as decimal
 from functools import partial
 from typing import Optional, Dict, Any
 
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
 
 from app.repositories.common import (
+    ADMIN_TABLE_NAME,
+    BATCH_GET_ITEM_SIZE,
+    BATCH_RETRY_MAX_ATTEMPTS,
     RecordNotFoundError,
+    ResourceConflictError,
+    _get_aws_resource,
     _get_table_admin_client,
     _get_table_event_client,
+    compute_backoff_delay,
+    compose_cognito_group_name,
     compose_enterprise_id,
-
+    enum_value,
+    optional_enum,
+    optional_int,
 )
 from app.routes.schemas.entreprise_schema import (
     IndustryEnum,
@@ -27,11 +40,53 @@ from app.routes.schemas.entreprise_schema import (
 from app.repositories.models.enterprise_model import (
     EnterpriseModel,
 )
-
+from app.logging_config import log_payload
 
 
 logger = logging.getLogger(__name__)
 
+BATCH_GET_MAX_WORKERS = int(os.environ.get("BATCH_GET_MAX_WORKERS", "8"))
+
+# Sparse GSIs used for filtered listings: one index per filterable attribute.
+# Partition key is `<PREFIX>#<value>`, sort key is the `contract_end_date` (same as GSI1SK).
+# Items without a value for the attribute (e.g. no industry) are not projected in the index.
+# The order is the priority used to pick the index when several filters are given,
+# most selective first. Remaining filters are applied server-side with a FilterExpression.
+FILTER_INDEXES = [
+    {"filter": "industry", "index": "GSI3", "pk": "GSI3PK", "sk": "GSI3SK", "prefix": "INDUSTRY", "attribute": "Industry"},
+    {"filter": "size", "index": "GSI5", "pk": "GSI5PK", "sk": "GSI5SK", "prefix": "SIZE", "attribute": "Size"},
+    {"filter": "subscription_tier", "index": "GSI4", "pk": "GSI4PK", "sk": "GSI4SK", "prefix": "TIER", "attribute": "SubscriptionTier"},
+    {"filter": "status", "index": "GSI2", "pk": "GSI2PK", "sk": "GSI2SK", "prefix": "STATUS", "attribute": "Status"},
+]
+
+
+def compose_filter_index_keys(
+    contract_end_date: Optional[str],
+    status: Optional[EnterpriseStatusEnum] = None,
+    industry: Optional[IndustryEnum] = None,
+    size: Optional[CompanySizeEnum] = None,
+    subscription_tier: Optional[SubscriptionTierEnum] = None,
+) -> Dict[str, Optional[str]]:
+    """Compose the key attributes of the filter GSIs.
+    A `None` value means the attribute must be absent (item not projected in the index).
+    """
+    values = {
+        "status": status,
+        "industry": industry,
+        "size": size,
+        "subscription_tier": subscription_tier,
+    }
+    keys = {}
+    for filter_index in FILTER_INDEXES:
+        value = enum_value(values[filter_index["filter"]])
+        if value is None or contract_end_date is None:
+            keys[filter_index["pk"]] = None
+            keys[filter_index["sk"]] = None
+        else:
+            keys[filter_index["pk"]] = f"{filter_index['prefix']}#{value}"
+            keys[filter_index["sk"]] = contract_end_date
+    return keys
+
 
 def get_enterprises_by_contract_end_date(limit: int = 20, ascending: bool = True):
     table = _get_table_admin_client()
@@ -53,11 +108,204 @@ def get_enterprises_by_contract_end_date(limit: int = 20, ascending: bool = True
     return response
 
 
+def get_enterprises_by_filters(
+    limit: int = 20,
+    exclusive_start_key: Optional[dict] = None,
+    ascending: bool = True,
+    status: Optional[EnterpriseStatusEnum] = None,
+    industry: Optional[IndustryEnum] = None,
+    size: Optional[CompanySizeEnum] = None,
+    subscription_tier: Optional[SubscriptionTierEnum] = None,
+):
+    """Query one page of enterprises sorted by contract_end_date, optionally filtered.
+    Each filter is backed by a dedicated sparse GSI (see `FILTER_INDEXES`).
+    Without filter, the full GSI1 listing is used.
+    With several filters, the first one is the key condition and the others a FilterExpression,
+    applied after `Limit`: the index is queried until `limit` items match or it is exhausted.
+    `LastEvaluatedKey` is then the key of the last returned item.
+    """
+    table = _get_table_admin_client()
+    filters = {
+        name: enum_value(value)
+        for name, value in (
+            ("status", status),
+            ("industry", industry),
+            ("size", size),
+            ("subscription_tier", subscription_tier),
+        )
+        if value is not None
+    }
+    logger.info(f"Get enterprises by filters: {filters}")
+
+    query_params = {
+        "ScanIndexForward": ascending,
+        "Limit": limit,
+    }
+    index_keys = ("GSI1PK", "GSI1SK")
+    if not filters:
+        query_params["IndexName"] = "GSI1"
+        query_params["KeyConditionExpression"] = Key("GSI1PK").eq("TYPE#ENTERPRISE")
+    else:
+        filter_indexes = [f for f in FILTER_INDEXES if f["filter"] in filters]
+        key_index, other_indexes = filter_indexes[0], filter_indexes[1:]
+
+        query_params["IndexName"] = key_index["index"]
+        index_keys = (key_index["pk"], key_index["sk"])
+        query_params["KeyConditionExpression"] = Key(key_index["pk"]).eq(
+            f"{key_index['prefix']}#{filters[key_index['filter']]}"
+        )
+        if other_indexes:
+            filter_expression = Attr(other_indexes[0]["attribute"]).eq(
+                filters[other_indexes[0]["filter"]]
+            )
+            for filter_index in other_indexes[1:]:
+                filter_expression &= Attr(filter_index["attribute"]).eq(
+                    filters[filter_index["filter"]]
+                )
+            query_params["FilterExpression"] = filter_expression
+
+    items = []
+    while True:
+        if exclusive_start_key:
+            query_params["ExclusiveStartKey"] = exclusive_start_key
+        response = table.query(**query_params)
+        items.extend(response["Items"])
+        exclusive_start_key = response.get("LastEvaluatedKey")
+        if len(items) >= limit or not exclusive_start_key:
+            break
+
+    if len(items) > limit:
+        items = items[:limit]
+        exclusive_start_key = {key: items[-1][key] for key in ("PK", "SK", *index_keys)}
+    return {"Items": items, "LastEvaluatedKey": exclusive_start_key} if exclusive_start_key else {"Items": items}
+
+
+def get_enterprises_by_contract_end_range(
+    start: str,
+    end: str,
+    limit: int = 20,
+    exclusive_start_key: Optional[dict] = None,
+    attributes: Optional[list[str]] = None,
+    status: Optional[EnterpriseStatusEnum] = None,
+):
+    """Query one page of enterprises whose contract ends between `start` and `end`
+    (YYYY-MM-DD, both inclusive), ascending by contract_end_date.
+    The range is a key condition on GSI1SK (on the status GSI when `status` is specified):
+    only the matching items are read.
+    """
+    table = _get_table_admin_client()
+    logger.info(f"Get enterprises with a contract ending between {start} and {end} (status: {status})")
+
+    if status is None:
+        index, pk, sk, pk_value = "GSI1", "GSI1PK", "GSI1SK", "TYPE#ENTERPRISE"
+    else:
+        status_index = next(f for f in FILTER_INDEXES if f["filter"] == "status")
+        index, pk, sk = status_index["index"], status_index["pk"], status_index["sk"]
+        pk_value = f"{status_index['prefix']}#{enum_value(status)}"
+    query_params = {
+        "IndexName": index,
+        "KeyConditionExpression": Key(pk).eq(pk_value) & Key(sk).between(start, end),
+        "ScanIndexForward": True,
+        "Limit": limit,
+    }
+    if attributes:
+        query_params["ProjectionExpression"] = ", ".join(f"#{a}" for a in attributes)
+        query_params["ExpressionAttributeNames"] = {f"#{a}": a for a in attributes}
+    if exclusive_start_key:
+        query_params["ExclusiveStartKey"] = exclusive_start_key
+
+    response = table.query(**query_params)
+    return response
+
+
+def iter_enterprises_by_contract_end_range(
+    start: str,
+    end: str,
+    page_size: int = 100,
+    attributes: Optional[list[str]] = None,
+    status: Optional[EnterpriseStatusEnum] = None,
+):
+    """Iterate over the enterprises whose contract ends between `start` and `end`, page by page."""
+    exclusive_start_key = None
+    while True:
+        response = get_enterprises_by_contract_end_range(
+            start,
+            end,
+            limit=page_size,
+            exclusive_start_key=exclusive_start_key,
+            attributes=attributes,
+            status=status,
+        )
+        yield from response["Items"]
+        exclusive_start_key = response.get("LastEvaluatedKey")
+        if not exclusive_start_key:
+            return
+
+
+def iter_all_enterprises(attributes: Optional[list[str]] = None):
+    """Iterate over all enterprise items of GSI1, page by page.
+    - If `attributes` is specified, only these attributes are fetched.
+    """
+    table = _get_table_admin_client()
+    logger.info("Iterate over all enterprises")
+
+    query_params = {
+        "IndexName": "GSI1",
+        "KeyConditionExpression": Key("GSI1PK").eq("TYPE#ENTERPRISE"),
+    }
+    if attributes:
+        query_params["ProjectionExpression"] = ", ".join(f"#{a}" for a in attributes)
+        query_params["ExpressionAttributeNames"] = {f"#{a}": a for a in attributes}
+
+    while True:
+        response = table.query(**query_params)
+        yield from response["Items"]
+        if "LastEvaluatedKey" not in response:
+            return
+        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def backfill_filter_index_keys() -> int:
+    """Write the filter GSI keys on enterprises stored before the filter indexes existed.
+    Returns the number of updated items.
+    """
+    table = _get_table_admin_client()
+    updated = 0
+    query_params = {
+        "IndexName": "GSI1",
+        "KeyConditionExpression": Key("GSI1PK").eq("TYPE#ENTERPRISE"),
+    }
+    while True:
+        response = table.query(**query_params)
+        for item in response["Items"]:
+            keys = compose_filter_index_keys(
+                contract_end_date=item.get("ContractEndDate"),
+                status=item.get("Status"),
+                industry=item.get("Industry"),
+                size=item.get("Size"),
+                subscription_tier=item.get("SubscriptionTier"),
+            )
+            keys = {name: value for name, value in keys.items() if value is not None}
+            if not keys or all(item.get(name) == value for name, value in keys.items()):
+                continue
+            table.update_item(
+                Key={"PK": item["PK"], "SK": item["SK"]},
+                UpdateExpression="SET " + ", ".join(f"{name} = :{name}" for name in keys),
+                ExpressionAttributeValues={f":{name}": value for name, value in keys.items()},
+                ConditionExpression="attribute_exists(PK) AND attribute_exists(SK)",
+            )
+            updated += 1
+
+        if "LastEvaluatedKey" not in response:
+            return updated
+        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
 
 def store_enterprise(user_id: str, custom_enterprise: EnterpriseModel):
     table = _get_table_admin_client()
     logger.info(f"store_enterprise() function")
-    logger.info(f"Storing enterprise: {custom_enterprise}")
+    log_payload(logger, "Storing enterprise: %s", custom_enterprise)
 
     item = {
         "PK": custom_enterprise.id,
@@ -75,6 +323,8 @@ def store_enterprise(user_id: str, custom_enterprise: EnterpriseModel):
         "SubscriptionTier": custom_enterprise.subscription_tier,
         "MaxLicenses": custom_enterprise.max_licenses,
         "UsedLicenses": custom_enterprise.used_licenses,
+        # Capacity guard of the atomic license allocations, see `allocate_enterprise_licenses`
+        "AvailableLicenses": custom_enterprise.max_licenses - custom_enterprise.used_licenses,
         "MonthlyRevenue": custom_enterprise.monthly_revenue,
         "ContractStartDate": custom_enterprise.contract_start_date,
         "ContractEndDate": custom_enterprise.contract_end_date,
@@ -84,6 +334,14 @@ def store_enterprise(user_id: str, custom_enterprise: EnterpriseModel):
         "CreatedBy": custom_enterprise.created_by,
         "UpdatedBy": custom_enterprise.updated_by,
     }
+    filter_index_keys = compose_filter_index_keys(
+        contract_end_date=custom_enterprise.contract_end_date,
+        status=custom_enterprise.status,
+        industry=custom_enterprise.industry,
+        size=custom_enterprise.size,
+        subscription_tier=custom_enterprise.subscription_tier,
+    )
+    item.update({name: value for name, value in filter_index_keys.items() if value is not None})
     response = table.put_item(Item=item)
     return response
 
@@ -105,12 +363,13 @@ def update_enterprise(
     used_licenses: Optional[int] = None,
     monthly_revenue: Optional[float] = None,
     contract_end_date: Optional[str] = None,
+    name: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Update enterprise fields.
     Only non-None values will be updated in DynamoDB.
     Returns:
-        DynamoDB response from update_item
+        DynamoDB response from update_item, with the attributes before the update (`ALL_OLD`)
     """
     table = _get_table_admin_client()
     logger.info(f"Updating bot: {enterprise_id}")
@@ -161,16 +420,46 @@ def update_enterprise(
         ":updated_by": updated_by,
     }
 
+    if name is not None:
+        # The Cognito group follows the name (see `cognito_sync_service`)
+        update_expression += ", #name = :name, CognitoGroupName = :cognito_group_name"
+        expression_attribute_names["#name"] = "Name"
+        expression_attribute_values[":name"] = name
+        expression_attribute_values[":cognito_group_name"] = compose_cognito_group_name(name)
+
+    if max_licenses is not None and used_licenses is not None:
+        # Capacity guard of the atomic license allocations
+        update_expression += ", AvailableLicenses = :available_licenses"
+        expression_attribute_values[":available_licenses"] = max_licenses - used_licenses
+
+    # PART 4: Keys of the filter GSIs. Absent values are removed so the item leaves the sparse index.
+    filter_index_keys = compose_filter_index_keys(
+        contract_end_date=contract_end_date,
+        status=status,
+        industry=industry,
+        size=size,
+        subscription_tier=subscription_tier,
+    )
+    removed_keys = []
+    for name, value in filter_index_keys.items():
+        if value is None:
+            removed_keys.append(name)
+        else:
+            update_expression += f", {name} = :{name.lower()}"
+            expression_attribute_values[f":{name.lower()}"] = value
+    if removed_keys:
+        update_expression += " REMOVE " + ", ".join(removed_keys)
+
     try:
         response = table.update_item(
             Key={"PK": enterprise_id, "SK": compose_enterprise_id(enterprise_id)},
             UpdateExpression=update_expression,
             ExpressionAttributeNames=expression_attribute_names,  # ← Required for reserved keywords
             ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="ALL_NEW",
+            ReturnValues="ALL_OLD",
             ConditionExpression="attribute_exists(PK) AND attribute_exists(SK)",
         )
-        logger.info(f"Updating repsonse: {response}")
+        log_payload(logger, "Update response: %s", response)
 
     except ClientError as err:
         if err.response["Error"]["Code"] == "ConditionalCheckFailedException":
@@ -183,8 +472,165 @@ def update_enterprise(
 
 
 
+def transition_enterprise_status(
+    enterprise_id: str,
+    from_status: EnterpriseStatusEnum,
+    to_status: EnterpriseStatusEnum,
+    updated_date: str,
+    updated_by: str,
+    table=None,
+) -> bool:
+    """Change the status of an enterprise, only if it is still `from_status`.
+    Returns False if the enterprise does not exist or has another status.
+    - `table`: table resource to reuse (resources are not thread safe: one per thread).
+    """
+    table = table or _get_table_admin_client()
+    status_index = next(f for f in FILTER_INDEXES if f["filter"] == "status")
+    try:
+        table.update_item(
+            Key={"PK": enterprise_id, "SK": compose_enterprise_id(enterprise_id)},
+            # The status GSI key follows the status. Its sort key is unchanged: if the item has
+            # no contract end date, it stays out of the sparse index.
+            UpdateExpression=(
+                f"SET #status = :to_status, {status_index['pk']} = :status_pk, "
+                "UpdatedDate = :updated_date, UpdatedBy = :updated_by"
+            ),
+            ConditionExpression="attribute_exists(PK) AND #status = :from_status",
+            ExpressionAttributeNames={"#status": "Status"},
+            ExpressionAttributeValues={
+                ":from_status": enum_value(from_status),
+                ":to_status": enum_value(to_status),
+                ":status_pk": f"{status_index['prefix']}#{enum_value(to_status)}",
+                ":updated_date": updated_date,
+                ":updated_by": updated_by,
+            },
+        )
+    except ClientError as err:
+        if err.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise err
+    return True
+
+
+def mark_renewal_reminder_sent(enterprise_id: str, contract_end_date: str, table=None) -> bool:
+    """Record that the renewal of the contract ending on `contract_end_date` was reminded.
+    Returns False if it already was (or the enterprise does not exist): a new contract end date
+    is reminded again.
+    """
+    table = table or _get_table_admin_client()
+    try:
+        table.update_item(
+            Key={"PK": enterprise_id, "SK": compose_enterprise_id(enterprise_id)},
+            UpdateExpression="SET RenewalReminderSentFor = :contract_end_date",
+            ConditionExpression=(
+                "attribute_exists(PK) AND (attribute_not_exists(RenewalReminderSentFor) "
+                "OR RenewalReminderSentFor <> :contract_end_date)"
+            ),
+            ExpressionAttributeValues={":contract_end_date": contract_end_date},
+        )
+    except ClientError as err:
+        if err.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise err
+    return True
+
+
+def allocate_enterprise_licenses(
+    enterprise_id: str, count: int, updated_date: str, updated_by: str
+) -> EnterpriseModel:
+    """Atomically add `count` used licenses, without exceeding the max licenses.
+    Single conditional `ADD`, no prior read: concurrent allocations cannot oversubscribe.
+    Condition expressions have no arithmetic (`UsedLicenses + :n <= MaxLicenses`), so the items
+    carry `AvailableLicenses` (MaxLicenses - UsedLicenses), updated in the same `ADD`.
+    Raises RecordNotFoundError, or ResourceConflictError if not enough licenses are available.
+    """
+    return _add_enterprise_licenses(enterprise_id, count, updated_date, updated_by)
+
+
+def release_enterprise_licenses(
+    enterprise_id: str, count: int, updated_date: str, updated_by: str
+) -> EnterpriseModel:
+    """Atomically remove `count` used licenses, without going below 0. See `allocate_enterprise_licenses`."""
+    return _add_enterprise_licenses(enterprise_id, -count, updated_date, updated_by)
+
+
+def _add_enterprise_licenses(
+    enterprise_id: str, delta: int, updated_date: str, updated_by: str
+) -> EnterpriseModel:
+    table = _get_table_admin_client()
+    logger.info(f"Adding {delta} used licenses to enterprise {enterprise_id}")
+
+    if delta > 0:
+        condition = "AvailableLicenses >= :count"
+    else:
+        condition = "UsedLicenses >= :count AND attribute_exists(AvailableLicenses)"
+    update_params = {
+        "Key": {"PK": enterprise_id, "SK": compose_enterprise_id(enterprise_id)},
+        "UpdateExpression": (
+            "ADD UsedLicenses :delta, AvailableLicenses :minus_delta "
+            "SET UpdatedDate = :updated_date, UpdatedBy = :updated_by"
+        ),
+        "ConditionExpression": f"attribute_exists(PK) AND {condition}",
+        "ExpressionAttributeValues": {
+            ":delta": delta,
+            ":minus_delta": -delta,
+            ":count": abs(delta),
+            ":updated_date": updated_date,
+            ":updated_by": updated_by,
+        },
+        "ReturnValues": "ALL_NEW",
+        # On failure, the current item tells why: no extra read
+        "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+    }
+    # Second attempt only after the backfill of `AvailableLicenses` on items stored before it existed
+    for _ in range(2):
+        try:
+            response = table.update_item(**update_params)
+            return _compose_enterprise_model(response["Attributes"])
+        except ClientError as err:
+            if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise err
+            if "Item" not in err.response:
+                raise RecordNotFoundError(f"Enterprise with id {enterprise_id} not found")
+            deserializer = TypeDeserializer()
+            item = {k: deserializer.deserialize(v) for k, v in err.response["Item"].items()}
+            if "AvailableLicenses" in item:
+                raise ResourceConflictError(
+                    f"Cannot {'allocate' if delta > 0 else 'release'} {abs(delta)} licenses: "
+                    f"{item['UsedLicenses']} used out of {item['MaxLicenses']}"
+                )
+            _backfill_available_licenses(table, item)
+
+    raise ResourceConflictError(f"Concurrent license updates on enterprise {enterprise_id}, retry")
+
+
+def _backfill_available_licenses(table, item: dict):
+    try:
+        table.update_item(
+            Key={"PK": item["PK"], "SK": item["SK"]},
+            UpdateExpression="SET AvailableLicenses = :available",
+            # Only if the counters did not change since they were read
+            ConditionExpression=(
+                "attribute_not_exists(AvailableLicenses) AND UsedLicenses = :used AND MaxLicenses = :max"
+            ),
+            ExpressionAttributeValues={
+                ":available": item["MaxLicenses"] - item["UsedLicenses"],
+                ":used": item["UsedLicenses"],
+                ":max": item["MaxLicenses"],
+            },
+        )
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise err
+
+
 def find_enterprise_by_id(enterprise_id: str) -> EnterpriseModel:
     """Find enterprise."""
+    return _compose_enterprise_model(find_enterprise_item(enterprise_id))
+
+
+def find_enterprise_item(enterprise_id: str) -> dict:
+    """Find the DynamoDB item of an enterprise."""
     table = _get_table_admin_client()
     logger.info(f"Finding enterprise with id: {enterprise_id}")
 
@@ -194,27 +640,104 @@ def find_enterprise_by_id(enterprise_id: str) -> EnterpriseModel:
             "SK": f"ENTERPRISE#{enterprise_id}"
         }
     )
-    logger.info(f"Finding enterprise with id - existing_item: {response}")
+    log_payload(logger, "Finding enterprise with id - existing_item: %s", response)
     if "Item" not in response or len(response["Item"]) == 0:
         raise RecordNotFoundError(f"Enterprise {enterprise_id} not found")
-    
-    existing_item = response["Item"]
-    return EnterpriseModel(
+
+    return response["Item"]
+
+
+def find_enterprises_by_ids(enterprise_ids: list[str]) -> list[EnterpriseModel]:
+    """Find several enterprises with BatchGetItem.
+    Keys are split in chunks of `BATCH_GET_ITEM_SIZE` which are fetched concurrently.
+    `UnprocessedKeys` are retried with exponential backoff.
+    The result preserves the order of `enterprise_ids`; unknown ids are skipped.
+    """
+    logger.info(f"Finding {len(enterprise_ids)} enterprises by ids")
+
+    # Duplicated keys are rejected by BatchGetItem
+    unique_ids = list(dict.fromkeys(enterprise_ids))
+    if not unique_ids:
+        return []
+
+    chunks = [
+        unique_ids[i : i + BATCH_GET_ITEM_SIZE]
+        for i in range(0, len(unique_ids), BATCH_GET_ITEM_SIZE)
+    ]
+    if len(chunks) == 1:
+        results = [_batch_get_enterprise_items(chunks[0])]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(BATCH_GET_MAX_WORKERS, len(chunks))
+        ) as executor:
+            # One copy of the context per chunk: the calls are recorded in the timing of the request
+            contexts = [contextvars.copy_context() for _ in chunks]
+            results = list(
+                executor.map(
+                    lambda context, chunk: context.run(_batch_get_enterprise_items, chunk),
+                    contexts,
+                    chunks,
+                )
+            )
+
+    items_by_id = {item["PK"]: item for items in results for item in items}
+    return [
+        _compose_enterprise_model(items_by_id[enterprise_id])
+        for enterprise_id in enterprise_ids
+        if enterprise_id in items_by_id
+    ]
+
+
+def _batch_get_enterprise_items(enterprise_ids: list[str]) -> list[dict]:
+    # boto3 resources are not thread safe: one resource per chunk
+    dynamodb = _get_aws_resource("dynamodb")
+    request_items = {
+        ADMIN_TABLE_NAME: {
+            "Keys": [
+                {"PK": enterprise_id, "SK": compose_enterprise_id(enterprise_id)}
+                for enterprise_id in enterprise_ids
+            ]
+        }
+    }
+    items = []
+    for attempt in range(BATCH_RETRY_MAX_ATTEMPTS):
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        items.extend(response.get("Responses", {}).get(ADMIN_TABLE_NAME, []))
+
+        request_items = response.get("UnprocessedKeys")
+        if not request_items:
+            return items
+        logger.info(
+            f"BatchGetItem: {len(request_items[ADMIN_TABLE_NAME]['Keys'])} unprocessed keys, retrying"
+        )
+        time.sleep(compute_backoff_delay(attempt))
+
+    raise RuntimeError(
+        f"BatchGetItem: keys still unprocessed after {BATCH_RETRY_MAX_ATTEMPTS} attempts"
+    )
+
+
+def _compose_enterprise_model(existing_item: dict) -> EnterpriseModel:
+    """Trusted read: the model of an item of our own table, built without validation.
+    The enterprises are validated when written (`EnterpriseInput`, `EnterpriseModel`);
+    only the types DynamoDB returns (raw enum values, Decimals) are converted.
+    """
+    return EnterpriseModel.model_construct(
         id=existing_item["PK"],
         name=existing_item["Name"],
-        industry=existing_item["Industry"],
-        size=existing_item["Size"],
+        industry=optional_enum(IndustryEnum, existing_item["Industry"]),
+        size=optional_enum(CompanySizeEnum, existing_item["Size"]),
         contact_email=existing_item["ContactEmail"],
         contact_phone=existing_item["ContactPhone"],
         address=existing_item["Address"],
         website=existing_item["Website"],
-        status=existing_item["Status"],
-        subscription_tier=existing_item["SubscriptionTier"],
-        max_licenses=existing_item["MaxLicenses"],
-        used_licenses=existing_item["UsedLicenses"],
+        status=EnterpriseStatusEnum(existing_item["Status"]),
+        subscription_tier=SubscriptionTierEnum(existing_item["SubscriptionTier"]),
+        max_licenses=int(existing_item["MaxLicenses"]),
+        used_licenses=int(existing_item["UsedLicenses"]),
         contract_start_date=existing_item["ContractStartDate"],
         contract_end_date=existing_item["ContractEndDate"],
-        monthly_revenue=existing_item["MonthlyRevenue"],
+        monthly_revenue=optional_int(existing_item["MonthlyRevenue"]),
         created_date=existing_item["CreatedDate"],
         updated_date=existing_item["UpdatedDate"],
         cognito_group_name=existing_item["CognitoGroupName"],
@@ -223,6 +746,18 @@ def find_enterprise_by_id(enterprise_id: str) -> EnterpriseModel:
     )
 
 
+def find_enterprise_stats() -> dict:
+    """Find the aggregated enterprise statistics maintained by the stream processor.
+    Returns the counters (attribute name -> number), empty if nothing was counted yet.
+    """
+    table = _get_table_admin_client()
+    logger.info("Finding enterprise stats")
+
+    response = table.get_item(Key={"PK": "STATS", "SK": "ENTERPRISE"})
+    item = response.get("Item", {})
+    return {name: value for name, value in item.items() if name not in ("PK", "SK")}
+
+
 def is_enterprise_exists(enterprise_id: str) -> bool:
     """Find enterprise."""
     table = _get_table_admin_client()
@@ -246,6 +781,7 @@ def delete_enterprise_by_id(enterprise_id: str):
         response = table.delete_item(
             Key={"PK": enterprise_id, "SK": compose_enterprise_id(enterprise_id)},
             ConditionExpression="attribute_exists(PK) AND attribute_exists(SK)",
+            ReturnValues="ALL_OLD",
         )
     except ClientError as e:
         if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
@@ -20,12 +20,16 @@ from app.repositories.common import (
 from app.repositories.models.event_model import (
     EventModel,
 )
+from app.logging_config import log_payload
 
 logger = logging.getLogger(__name__)
 
 
 
-def get_events_by_date(limit: int = 5, ascending: bool = False):
+def get_events_by_date(limit: int = 5, ascending: bool = False, attributes: Optional[list[str]] = None):
+    """Query the events sorted by `event_date`.
+    - If `attributes` is specified, only these attributes are fetched.
+    """
     table = _get_table_event_client()
     logger.info(f"Get events sorted by event_date")
 
@@ -40,6 +44,9 @@ def get_events_by_date(limit: int = 5, ascending: bool = False):
     }
     if limit:
         query_params["Limit"] = limit
+    if attributes:
+        query_params["ProjectionExpression"] = ", ".join(f"#{a}" for a in attributes)
+        query_params["ExpressionAttributeNames"] = {f"#{a}": a for a in attributes}
 
     response = table.query(**query_params)
     return response
@@ -48,10 +55,26 @@ def get_events_by_date(limit: int = 5, ascending: bool = False):
 def store_event(custom_event: EventModel):
     table = _get_table_event_client()
     logger.info(f"store_event() function")
-    logger.info(f"Storing event: {custom_event}")
-    logger.info(f"Storing event: {table}")
+    log_payload(logger, "Storing event: %s", custom_event)
 
-    item = {
+    response = table.put_item(Item=_compose_event_item(custom_event))
+    return response
+
+
+def store_events(custom_events: list[EventModel]):
+    """Store events with BatchWriteItem (25 items per request).
+    The batch writer resends the unprocessed items.
+    """
+    table = _get_table_event_client()
+    logger.info(f"Storing {len(custom_events)} events")
+
+    with table.batch_writer() as batch:
+        for custom_event in custom_events:
+            batch.put_item(Item=_compose_event_item(custom_event))
+
+
+def _compose_event_item(custom_event: EventModel) -> dict:
+    return {
         "PK": "EVENTS",
         "SK": f"{custom_event.event_date}#{custom_event.entity_type.value}#{custom_event.id}",
         "id": custom_event.id,
@@ -64,7 +87,3 @@ def store_event(custom_event: EventModel):
         "user_id": custom_event.user_id,
         "details": custom_event.details,
     }
-    response = table.put_item(Item=item)
-    return response
-
-
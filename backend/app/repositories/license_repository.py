@@ -0,0 +1,142 @@
+import logging
+from typing import Optional
+
+from boto3.dynamodb.conditions import Key
+
+from app.repositories.common import (
+    RecordNotFoundError,
+    _get_table_admin_client,
+    compose_license_id,
+    decompose_license_id,
+)
+from app.repositories.enterprise_repository import _compose_enterprise_model
+from app.repositories.models.enterprise_model import EnterpriseModel
+from app.repositories.models.license_model import LicenseModel
+
+logger = logging.getLogger(__name__)
+
+# Licenses live in the item collection of their enterprise: PK = enterprise id, SK = `LICENSE#<id>`.
+# `ENTERPRISE#` sorts before `LICENSE#`: a query on the PK returns the enterprise first.
+LICENSE_SK_PREFIX = "LICENSE#"
+
+
+def store_licenses(licenses: list[LicenseModel]):
+    """Store licenses with BatchWriteItem (25 items per request).
+    The batch writer resends the unprocessed items.
+    """
+    table = _get_table_admin_client()
+    logger.info(f"Storing {len(licenses)} licenses")
+
+    with table.batch_writer() as batch:
+        for license in licenses:
+            batch.put_item(Item=_compose_license_item(license))
+
+
+def delete_licenses(enterprise_id: str, license_ids: list[str]):
+    table = _get_table_admin_client()
+    logger.info(f"Deleting {len(license_ids)} licenses of enterprise {enterprise_id}")
+
+    with table.batch_writer() as batch:
+        for license_id in license_ids:
+            batch.delete_item(Key={"PK": enterprise_id, "SK": compose_license_id(license_id)})
+
+
+def delete_licenses_by_enterprise_id(enterprise_id: str) -> int:
+    """Delete all the licenses of an enterprise. Returns the number of deleted licenses."""
+    table = _get_table_admin_client()
+    query_params = {
+        "KeyConditionExpression": Key("PK").eq(enterprise_id) & Key("SK").begins_with(LICENSE_SK_PREFIX),
+        "ProjectionExpression": "PK, SK",
+    }
+    deleted = 0
+    with table.batch_writer() as batch:
+        while True:
+            response = table.query(**query_params)
+            for item in response["Items"]:
+                batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+            deleted += len(response["Items"])
+            if "LastEvaluatedKey" not in response:
+                return deleted
+            query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def find_licenses_by_enterprise_id(
+    enterprise_id: str,
+    limit: int = 20,
+    exclusive_start_key: Optional[dict] = None,
+):
+    """Query one page of licenses of an enterprise, ordered by license id."""
+    table = _get_table_admin_client()
+    logger.info(f"Get licenses of enterprise {enterprise_id}")
+
+    query_params = {
+        "KeyConditionExpression": Key("PK").eq(enterprise_id) & Key("SK").begins_with(LICENSE_SK_PREFIX),
+        "Limit": limit,
+    }
+    if exclusive_start_key:
+        query_params["ExclusiveStartKey"] = exclusive_start_key
+
+    response = table.query(**query_params)
+    return response
+
+
+def find_enterprise_with_licenses(enterprise_id: str) -> tuple[EnterpriseModel, list[LicenseModel]]:
+    """Load an enterprise and all its licenses with a query on its item collection.
+    A single request unless the collection exceeds 1 MB.
+    """
+    table = _get_table_admin_client()
+    logger.info(f"Get enterprise {enterprise_id} with its licenses")
+
+    query_params = {"KeyConditionExpression": Key("PK").eq(enterprise_id)}
+    enterprise = None
+    licenses = []
+    while True:
+        response = table.query(**query_params)
+        for item in response["Items"]:
+            if item["SK"].startswith(LICENSE_SK_PREFIX):
+                licenses.append(compose_license_model(item))
+            elif enterprise is None:
+                enterprise = _compose_enterprise_model(item)
+        if "LastEvaluatedKey" not in response:
+            break
+        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    if enterprise is None:
+        raise RecordNotFoundError(f"Enterprise with id {enterprise_id} not found")
+    return enterprise, licenses
+
+
+def compose_license_model(item: dict) -> LicenseModel:
+    return LicenseModel(
+        id=decompose_license_id(item["SK"]),
+        enterprise_id=item["PK"],
+        user_email=item["UserEmail"],
+        user_name=item["UserName"],
+        status=item["Status"],
+        license_type=item["LicenseType"],
+        activation_date=item.get("ActivationDate"),
+        last_used=item.get("LastUsed"),
+        features_access=item.get("FeaturesAccess", []),
+        created_date=item["CreatedDate"],
+        updated_date=item.get("UpdatedDate"),
+        created_by=item["CreatedBy"],
+        updated_by=item.get("UpdatedBy"),
+    )
+
+
+def _compose_license_item(license: LicenseModel) -> dict:
+    return {
+        "PK": license.enterprise_id,
+        "SK": compose_license_id(license.id),
+        "UserEmail": license.user_email,
+        "UserName": license.user_name,
+        "Status": license.status.value,
+        "LicenseType": license.license_type.value,
+        "ActivationDate": license.activation_date,
+        "LastUsed": license.last_used,
+        "FeaturesAccess": license.features_access,
+        "CreatedDate": license.created_date,
+        "UpdatedDate": license.updated_date,
+        "CreatedBy": license.created_by,
+        "UpdatedBy": license.updated_by,
+    }
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from app.routes.schemas.license_schema import (
+    LicenseStatusEnum,
+    LicenseTypeEnum,
+)
+
+
+class LicenseModel(BaseModel):
+    id: str = Field(..., description="License id")
+    enterprise_id: str = Field(..., description="Id of the enterprise this license belongs to")
+    user_email: str = Field(..., description="Email of the user assigned to this license")
+    user_name: str = Field(..., description="Full name of the user")
+    status: LicenseStatusEnum = Field(default=LicenseStatusEnum.ACTIVE, description="License status")
+    license_type: LicenseTypeEnum = Field(default=LicenseTypeEnum.BASIC, description="Type of license")
+    activation_date: Optional[str] = Field(None, description="Activation date (YYYY-MM-DD)")
+    last_used: Optional[str] = Field(None, description="Last time the license was used (ISO 8601)")
+    features_access: list[str] = Field(default_factory=list, description="Features this license has access to")
+    created_date: str = Field(..., description="Creation date")
+    updated_date: Optional[str] = Field(None, description="Last update date")
+    created_by: str = Field(..., description="Cognito User id who created this license")
+    updated_by: Optional[str] = Field(None, description="Last Cognito User id who updated this license")
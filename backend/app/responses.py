@@ -0,0 +1,23 @@
+"""JSON responses serialized with orjson.
+
+Routes returning an `ORJSONResponse` skip the validation and serialization of FastAPI against
+`response_model` (still used for the OpenAPI schema). Use it for trusted outputs only: plain
+dicts with the camelCase keys of the output schema, built from our own DynamoDB items.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any):
+    # DynamoDB numbers
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
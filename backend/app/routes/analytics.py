@@ -0,0 +1,67 @@
+from typing import Optional
+from fastapi import APIRouter, Request, Depends, Query
+import logging
+
+from app.dependencies import check_admin
+from app.routes.schemas.analytics_schema import (
+    GroupByEnum,
+    RevenueAnalyticsOutput,
+    LicenseUtilizationOutput,
+    ContractAnalyticsOutput,
+)
+from app.services.analytics_service import (
+    fetch_revenue_analytics,
+    fetch_license_analytics,
+    fetch_contract_analytics,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+
+router = APIRouter(tags=["analytics"])
+
+
+@router.get("/analytics/revenue", response_model=RevenueAnalyticsOutput)
+def get_revenue_analytics(
+    request: Request,
+    group_by: GroupByEnum = Query(GroupByEnum.SUBSCRIPTION_TIER, alias="groupBy", description="Grouping attribute"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """Get the monthly recurring revenue (MRR) grouped by tier, industry, status or size."""
+    logger.info("GET /analytics/revenue")
+
+    groups = fetch_revenue_analytics(group_by.value)
+    return RevenueAnalyticsOutput(
+        group_by=group_by,
+        total_monthly_revenue=sum(group["monthly_revenue"] for group in groups),
+        groups=groups,
+    )
+
+
+@router.get("/analytics/licenses", response_model=list[LicenseUtilizationOutput])
+def get_license_analytics(
+    request: Request,
+    group_by: Optional[GroupByEnum] = Query(None, alias="groupBy", description="Grouping attribute"),
+    percentiles: list[float] = Query([50, 75, 90, 95, 99], description="Percentiles between 0 and 100"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """Get the license utilization (`usedLicenses / maxLicenses`) percentiles.
+    - Without `groupBy`, a single `all` group is returned.
+    """
+    logger.info("GET /analytics/licenses")
+
+    return fetch_license_analytics(percentiles, group_by=group_by.value if group_by else None)
+
+
+@router.get("/analytics/contracts", response_model=ContractAnalyticsOutput)
+def get_contract_analytics(
+    request: Request,
+    months: int = Query(12, ge=1, le=60, description="Number of upcoming months"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """Get the histogram of contract end dates by month, with the MRR at stake."""
+    logger.info("GET /analytics/contracts")
+
+    return fetch_contract_analytics(months)
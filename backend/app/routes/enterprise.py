@@ -1,23 +1,46 @@
-from typing import Literal
+from typing import Literal, Optional
 from fastapi import APIRouter, Request, Depends, HTTPException, Query, BackgroundTasks
 import logging
 
+from app.concurrency import run_blocking
 from app.dependencies import check_creating_license_enterprise_allowed, check_admin
 from app.user import User
 from app.routes.schemas.entreprise_schema import (
+    IndustryEnum,
+    CompanySizeEnum,
+    EnterpriseStatusEnum,
+    SubscriptionTierEnum,
     EnterpriseInput, 
     EnterpriseOutput, 
     EnterpriseModifyInput,
     EnterpriseModifyOutput,
     EnterpriseMetaOutput,
+    EnterpriseBatchGetInput,
+    EnterpriseListOutput,
+    EnterpriseSearchOutput,
+    EnterpriseStatsOutput,
+    EnterpriseLicensesInput,
+    EnterpriseLicensesOutput,
 )
 from app.services.enterprise_service import (
      create_new_enterprise,
      modify_enterprise,
      fetch_all_enterprises,
+     fetch_enterprises_page,
+     fetch_expiring_enterprises,
      fetch_enterprise,
+     fetch_enterprises_by_ids,
+     fetch_enterprise_stats,
      remove_enterprise_by_id,
+     allocate_licenses,
+     release_licenses,
 )
+from app.services.enterprise_search_service import search_enterprises
+from app.routes.schemas.license_schema import EnterpriseFullOutput, LicenseOutput
+from app.services.license_service import fetch_enterprise_with_licenses
+from app.logging_config import log_payload
+from app.responses import ORJSONResponse
+from app.singleflight import SingleFlight
 
 
 logger = logging.getLogger(__name__)
@@ -26,9 +49,13 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["enterprise"])#, prefix="/enterprise")
 
+# Polled by every admin dashboard: identical concurrent reads share one DynamoDB call
+coalesced_fetch_all_enterprises = SingleFlight(fetch_all_enterprises)
+coalesced_fetch_enterprise = SingleFlight(fetch_enterprise)
+
 
 @router.post("/enterprise", response_model=EnterpriseOutput)
-def create_enterprise(
+async def create_enterprise(
     request: Request,
     enterprise_input: EnterpriseInput,
     # background_tasks: BackgroundTasks,
@@ -44,18 +71,18 @@ def create_enterprise(
     
     # Run only if check_creating_entreprise_allowed() and check_admin() are True
     # 1. Creation in DB 
-    enterprise = create_new_enterprise(
+    enterprise = await run_blocking(
+        create_new_enterprise,
         user_id=current_user.id,
         enterprise_input=enterprise_input,
     )
-    # 2. Background task (async)
-    #background_tasks.add_task(sync_cognito_group, enterprise.id)
+    # 2. The Cognito group is created asynchronously by the sync worker (cognito_sync_service)
     return enterprise
 
 
 
 @router.patch("/enterprise/{enterprise_id}", response_model=EnterpriseModifyOutput)
-def patch_enterprise(
+async def patch_enterprise(
     request: Request,
     enterprise_id: str,
     modify_input: EnterpriseModifyInput,
@@ -64,15 +91,15 @@ def patch_enterprise(
     """Modify Enterprise info"""
     logger.info(f"PATCH /enterprise/{enterprise_id}")
 
-    enterprise = modify_enterprise(request.state.current_user.id, enterprise_id, modify_input)
-    logger.info(f"modify_enterprise: {enterprise}")
+    enterprise = await run_blocking(modify_enterprise, request.state.current_user.id, enterprise_id, modify_input)
+    log_payload(logger, "modify_enterprise: %s", enterprise)
 
     return enterprise
 
 
 
 @router.get("/enterprise", response_model=list[EnterpriseMetaOutput])
-def get_all_enterprises(
+async def get_all_enterprises(
     request: Request,
     limit: int | None = None,
     check_admin_permissions=Depends(check_admin),
@@ -82,31 +109,210 @@ def get_all_enterprises(
     """
     logger.info(" GET /enterprise")
 
-    enterprises = []
-    enterprises = fetch_all_enterprises(limit=limit)
+    # Trusted output, built from the items: not validated again against the response model
+    output = await coalesced_fetch_all_enterprises(limit=limit)
+    log_payload(logger, "get_all_enterprises - GET /enterprise output: %s", output)
+    return ORJSONResponse(output)
+
+
+@router.get("/enterprise/list", response_model=EnterpriseListOutput)
+async def list_enterprises(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Enterprises per page"),
+    next_token: Optional[str] = Query(None, alias="nextToken", description="Token of the page to fetch"),
+    industry: Optional[IndustryEnum] = Query(None, description="Filter by industry"),
+    size: Optional[CompanySizeEnum] = Query(None, description="Filter by size"),
+    status: Optional[EnterpriseStatusEnum] = Query(None, description="Filter by status"),
+    subscription_tier: Optional[SubscriptionTierEnum] = Query(None, alias="subscriptionTier", description="Filter by subscription tier"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """List enterprises with pagination and filters. The order is ascending by `contract_end_date`.
+    - Each filter is resolved by an indexed query, `nextToken` fetches the following page.
+    """
+    logger.info("GET /enterprise/list")
+
+    enterprises, next_token = await run_blocking(
+        fetch_enterprises_page,
+        limit=limit,
+        next_token=next_token,
+        status=status,
+        industry=industry,
+        size=size,
+        subscription_tier=subscription_tier,
+    )
+
+    output = {"items": enterprises, "nextToken": next_token}
+    logger.info(f"list_enterprises - GET /enterprise/list output: {len(enterprises)} enterprises")
+    return ORJSONResponse(output)
+
+
+@router.get("/enterprise/expiring", response_model=EnterpriseListOutput)
+async def list_expiring_enterprises(
+    request: Request,
+    within: Optional[str] = Query(None, description="Contracts ending from today within this window, like 30d or 6w"),
+    between: Optional[str] = Query(None, description="Contracts ending between two dates, like 2026-01-01,2026-01-31"),
+    limit: int = Query(20, ge=1, le=100, description="Enterprises per page"),
+    next_token: Optional[str] = Query(None, alias="nextToken", description="Token of the page to fetch"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """List enterprises whose contract ends in a date range, ascending by `contract_end_date`.
+    - Specify either `within` or `between` (inclusive), `nextToken` fetches the following page.
+    """
+    logger.info("GET /enterprise/expiring")
+
+    enterprises, next_token = await run_blocking(
+        fetch_expiring_enterprises,
+        within=within,
+        between=between,
+        limit=limit,
+        next_token=next_token,
+    )
+
+    output = {"items": enterprises, "nextToken": next_token}
+    logger.info(f"list_expiring_enterprises - GET /enterprise/expiring output: {len(enterprises)} enterprises")
+    return ORJSONResponse(output)
+
+
+@router.get("/enterprise/stats", response_model=EnterpriseStatsOutput)
+async def get_enterprises_statistics(
+    request: Request,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Get the global statistics of the enterprises.
+    - Counts by status, subscription tier, industry and size, total MRR and license utilization.
+    """
+    logger.info("GET /enterprise/stats")
+
+    return await run_blocking(fetch_enterprise_stats)
+
+
+# Sync: CPU-bound lookup in the in-memory index, run in the threadpool
+@router.get("/enterprise/search", response_model=list[EnterpriseSearchOutput])
+def search_enterprises_by_name(
+    request: Request,
+    q: str = Query(..., min_length=2, description="Search by name or id"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of matches"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """Search enterprises by name or id, best matches first.
+    - Prefix matches on the name, its words and the id rank first, then fuzzy matches.
+    """
+    logger.info("GET /enterprise/search")
+
+    return [
+        EnterpriseSearchOutput(id=enterprise_id, name=name, score=score)
+        for enterprise_id, name, score in search_enterprises(q, limit=limit)
+    ]
+
+
+@router.post("/enterprise:batchGet", response_model=list[EnterpriseOutput])
+async def batch_get_enterprises(
+    request: Request,
+    batch_get_input: EnterpriseBatchGetInput,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Get several enterprises by ids in a single call.
+    - The order of the requested `ids` is preserved, unknown ids are skipped.
+    """
+    logger.info("POST /enterprise:batchGet")
+
+    enterprises = await run_blocking(fetch_enterprises_by_ids, batch_get_input.ids)
 
     output = [
-        EnterpriseMetaOutput(
+        EnterpriseOutput(
             id=enterprise.id,
             name=enterprise.name,
             industry=enterprise.industry,
-            #size=enterprise.size,
+            size=enterprise.size,
+            contact_email=enterprise.contact_email,
+            address=enterprise.address,
             website=enterprise.website,
             status=enterprise.status,
             subscription_tier=enterprise.subscription_tier,
             max_licenses=enterprise.max_licenses,
             used_licenses=enterprise.used_licenses,
+            contract_start_date=enterprise.contract_start_date,
             contract_end_date=enterprise.contract_end_date,
             monthly_revenue=enterprise.monthly_revenue,
+            created_date=enterprise.created_date,
+            updated_date=enterprise.updated_date,
         )
         for enterprise in enterprises
     ]
-    logger.info(f"get_all_enterprises - GET /enterprise output: {output}")
+    logger.info(f"batch_get_enterprises - POST /enterprise:batchGet output: {len(output)} enterprises")
+    return output
+
+
+@router.post("/enterprise/{enterprise_id}/licenses:allocate", response_model=EnterpriseLicensesOutput)
+async def allocate_enterprise_licenses(
+    request: Request,
+    enterprise_id: str,
+    licenses_input: EnterpriseLicensesInput,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Allocate licenses of an enterprise.
+    - Atomic: concurrent allocations never exceed the max licenses (409 if not enough are available).
+    """
+    logger.info(f"POST /enterprise/{enterprise_id}/licenses:allocate")
+
+    return await run_blocking(allocate_licenses, request.state.current_user.id, enterprise_id, licenses_input.count)
+
+
+@router.post("/enterprise/{enterprise_id}/licenses:release", response_model=EnterpriseLicensesOutput)
+async def release_enterprise_licenses(
+    request: Request,
+    enterprise_id: str,
+    licenses_input: EnterpriseLicensesInput,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Release licenses of an enterprise.
+    - Atomic: used licenses never go below 0 (409 if more are released than used).
+    """
+    logger.info(f"POST /enterprise/{enterprise_id}/licenses:release")
+
+    return await run_blocking(release_licenses, request.state.current_user.id, enterprise_id, licenses_input.count)
+
+
+@router.get("/enterprise/{enterprise_id}/full", response_model=EnterpriseFullOutput)
+async def get_enterprise_with_licenses(
+    request: Request,
+    enterprise_id: str,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Get an enterprise and all its licenses.
+    - Single query on the item collection of the enterprise.
+    """
+    logger.info(f"GET /enterprise/{enterprise_id}/full")
+
+    enterprise, licenses = await run_blocking(fetch_enterprise_with_licenses, enterprise_id)
+
+    output = EnterpriseFullOutput(
+        enterprise=EnterpriseOutput(
+            id=enterprise.id,
+            name=enterprise.name,
+            industry=enterprise.industry,
+            size=enterprise.size,
+            contact_email=enterprise.contact_email,
+            address=enterprise.address,
+            website=enterprise.website,
+            status=enterprise.status,
+            subscription_tier=enterprise.subscription_tier,
+            max_licenses=enterprise.max_licenses,
+            used_licenses=enterprise.used_licenses,
+            contract_start_date=enterprise.contract_start_date,
+            contract_end_date=enterprise.contract_end_date,
+            monthly_revenue=enterprise.monthly_revenue,
+            created_date=enterprise.created_date,
+            updated_date=enterprise.updated_date,
+        ),
+        licenses=[LicenseOutput(**license.model_dump()) for license in licenses],
+    )
+    logger.info(f"get_enterprise_with_licenses - output: {len(output.licenses)} licenses")
     return output
 
 
 @router.get("/enterprise/{enterprise_id}", response_model=EnterpriseOutput)
-def get_enterprise_by_id(
+async def get_enterprise_by_id(
     request: Request,
     enterprise_id: str,
     check_admin_permissions=Depends(check_admin),
@@ -114,33 +320,14 @@ def get_enterprise_by_id(
     """Get enterprise by id."""
     logger.info("GET /enterprise/enterprise_id")
 
-    enterprise = fetch_enterprise(enterprise_id)
-
-    output = EnterpriseOutput(
-        id=enterprise.id,
-        name=enterprise.name,
-        industry=enterprise.industry,
-        size=enterprise.size,
-        contact_email=enterprise.contact_email,
-        address=enterprise.address,
-        website=enterprise.website,
-        status=enterprise.status,
-        subscription_tier=enterprise.subscription_tier,
-        max_licenses=enterprise.max_licenses,
-        used_licenses=enterprise.used_licenses,
-        contract_start_date=enterprise.contract_start_date,
-        contract_end_date=enterprise.contract_end_date,
-        monthly_revenue=enterprise.monthly_revenue,
-        created_date=enterprise.created_date,
-        updated_date=enterprise.updated_date,
-    )
-    
-    logger.info(f"get_enterprise_by_id - GET /enterprise output: {output}")
-    return output
+    output = await coalesced_fetch_enterprise(enterprise_id)
+
+    log_payload(logger, "get_enterprise_by_id - GET /enterprise output: %s", output)
+    return ORJSONResponse(output)
 
 
 @router.delete("/enterprise/{enterprise_id}")
-def delete_enterprise(
+async def delete_enterprise(
     request: Request,
     enterprise_id: str,
     check_creating_enterprise_allowed=Depends(check_creating_license_enterprise_allowed), 
@@ -151,54 +338,8 @@ def delete_enterprise(
 
     current_user: User = request.state.current_user
 
-    enterprise = remove_enterprise_by_id(current_user.id, enterprise_id)
-    logger.info(f"delete_enterprise: {enterprise}")
-
-
-# @router.get("/", response_model=EnterpriseListOutput)
-# def list_enterprises(
-#     request: Request,
-#     page: int = Query(1, ge=1, description="Numéro de page"),
-#     per_page: int = Query(20, ge=1, le=100, description="Éléments par page"),
-#     search: Optional[str] = Query(None, min_length=2, description="Recherche par nom"),
-#     industry: Optional[IndustryEnum] = Query(None, description="Filtrer par secteur"),
-#     size: Optional[CompanySizeEnum] = Query(None, description="Filtrer par taille"),
-#     status: Optional[EnterpriseStatusEnum] = Query(None, description="Filtrer par statut"),
-#     subscription_tier: Optional[SubscriptionTierEnum] = Query(None, description="Filtrer par abonnement"),
-#     admin_check=Depends(check_admin_permissions),
-# ):
-#     """
-#     Lister toutes les entreprises avec pagination et filtres avancés.
-#     """
-#     current_user: User = request.state.current_user
-    
-#     return get_enterprises_list(
-#         user_id=current_user.id,
-#         tenant=current_user.tenant,
-#         page=page,
-#         per_page=per_page,
-#         search=search,
-#         industry=industry,
-#         size=size,
-#         status=status,
-#         subscription_tier=subscription_tier
-#     )
-
-
-# @router.get("/stats", response_model=EnterpriseStatsOutput)
-# def get_enterprises_statistics(
-#     request: Request,
-#     admin_check=Depends(check_admin_permissions),
-# ):
-#     """
-#     Obtenir les statistiques globales des entreprises.
-#     """
-#     current_user: User = request.state.current_user
-    
-#     return get_enterprise_stats(
-#         user_id=current_user.id,
-#         tenant=current_user.tenant
-#     )
+    enterprise = await run_blocking(remove_enterprise_by_id, current_user.id, enterprise_id)
+    log_payload(logger, "delete_enterprise: %s", enterprise)
 
 
 # @router.get("/{enterprise_id}", response_model=EnterpriseOutput)
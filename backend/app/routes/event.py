@@ -11,6 +11,8 @@ from app.routes.schemas.event_schema import (
 from app.services.event_service import (
      fetch_all_events,
 )
+from app.logging_config import log_payload
+from app.singleflight import SingleFlight
 
 
 logger = logging.getLogger(__name__)
@@ -19,9 +21,12 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["event"])
 
+# Identical concurrent polls share one query, see `app.singleflight`
+coalesced_fetch_all_events = SingleFlight(fetch_all_events)
+
 
 @router.get("/event", response_model=list[EventMetaOutput])
-def get_all_events(
+async def get_all_events(
     request: Request,
     limit: int | None = None,
     # check_admin_permissions=Depends(check_admin),
@@ -32,7 +37,7 @@ def get_all_events(
     logger.info(" GET /event ###########")
 
     events = []
-    events = fetch_all_events(limit=limit)
+    events = await coalesced_fetch_all_events(limit=limit)
 
     output = [
         EventMetaOutput(
@@ -42,7 +47,7 @@ def get_all_events(
         )
         for event in events
     ]
-    logger.info(f"get_all_events - GET /event output: {output}")
+    log_payload(logger, "get_all_events - GET /event output: %s", output)
     return output
 
 
@@ -0,0 +1,86 @@
+from typing import Optional
+from fastapi import APIRouter, Request, Depends, Query
+from fastapi.responses import StreamingResponse
+import logging
+
+from app.dependencies import check_admin
+from app.routes.schemas.license_schema import (
+    LicenseBatchCreateInput,
+    LicenseListOutput,
+    LicenseOutput,
+    ProvisionUsersInput,
+)
+from app.services.license_service import (
+     create_new_licenses,
+     fetch_licenses_page,
+     provision_enterprise_users,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+
+router = APIRouter(tags=["license"])
+
+
+@router.get("/enterprise/{enterprise_id}/licenses", response_model=LicenseListOutput)
+def list_enterprise_licenses(
+    request: Request,
+    enterprise_id: str,
+    limit: int = Query(20, ge=1, le=100, description="Licenses per page"),
+    next_token: Optional[str] = Query(None, alias="nextToken", description="Token of the page to fetch"),
+    check_admin_permissions=Depends(check_admin),
+):
+    """List the licenses of an enterprise with pagination. The order is ascending by license id."""
+    logger.info(f"GET /enterprise/{enterprise_id}/licenses")
+
+    licenses, next_token = fetch_licenses_page(enterprise_id, limit=limit, next_token=next_token)
+
+    output = LicenseListOutput(
+        items=[LicenseOutput(**license.model_dump()) for license in licenses],
+        next_token=next_token,
+    )
+    logger.info(f"list_enterprise_licenses - output: {len(output.items)} licenses")
+    return output
+
+
+@router.post("/enterprise/{enterprise_id}/licenses:batchCreate", response_model=list[LicenseOutput])
+def batch_create_enterprise_licenses(
+    request: Request,
+    enterprise_id: str,
+    batch_create_input: LicenseBatchCreateInput,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Create several licenses of an enterprise in a single call.
+    - The seats are allocated atomically first: 409 if not enough licenses are available.
+    """
+    logger.info(f"POST /enterprise/{enterprise_id}/licenses:batchCreate")
+
+    licenses = create_new_licenses(
+        request.state.current_user.id, enterprise_id, batch_create_input.licenses
+    )
+    return [LicenseOutput(**license.model_dump()) for license in licenses]
+
+
+@router.post("/enterprise/{enterprise_id}/users:provision")
+def provision_enterprise_users_route(
+    request: Request,
+    enterprise_id: str,
+    provision_input: ProvisionUsersInput,
+    check_admin_permissions=Depends(check_admin),
+):
+    """Create users in Cognito, add them to the group of the enterprise and give them a license.
+    - The seats are allocated atomically first: 409 if not enough licenses are available.
+    - The progress is streamed as NDJSON: one line per user as it completes (`email`, `status`,
+      `licenseId`, `error`), then a summary line (`created`, `existing`, `failed`, `usedLicenses`).
+    """
+    logger.info(f"POST /enterprise/{enterprise_id}/users:provision")
+
+    lines = provision_enterprise_users(
+        request.state.current_user.id, enterprise_id, provision_input.users
+    )
+    return StreamingResponse(
+        (line.model_dump_json(by_alias=True) + "\n" for line in lines),
+        media_type="application/x-ndjson",
+    )
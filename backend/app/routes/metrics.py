@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics of this process (see `app.metrics`). Not authenticated: expose it to
+    the scraper only, not through the public API endpoint.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from pydantic import Field
+from enum import Enum
+from app.routes.schemas.base import BaseSchema
+
+
+class GroupByEnum(str, Enum):
+    STATUS = "status"
+    SUBSCRIPTION_TIER = "subscription_tier"
+    INDUSTRY = "industry"
+    SIZE = "size"
+
+
+class RevenueGroupOutput(BaseSchema):
+    key: str = Field(..., description="Value of the grouping attribute (`none` if not set)")
+    enterprises: int = Field(..., description="Number of enterprises")
+    monthly_revenue: float = Field(..., description="Sum of the monthly revenues")
+    average_monthly_revenue: float = Field(..., description="Average monthly revenue")
+
+
+class RevenueAnalyticsOutput(BaseSchema):
+    group_by: GroupByEnum = Field(..., description="Grouping attribute")
+    total_monthly_revenue: float = Field(..., description="Sum of the monthly revenues")
+    groups: list[RevenueGroupOutput] = Field(..., description="Groups with at least one enterprise")
+
+
+class LicenseUtilizationOutput(BaseSchema):
+    key: str = Field(..., description="Value of the grouping attribute, `all` without grouping")
+    enterprises: int = Field(..., description="Number of enterprises with licenses")
+    used_licenses: int = Field(..., description="Sum of the used licenses")
+    max_licenses: int = Field(..., description="Sum of the maximum numbers of licenses")
+    mean: float = Field(..., description="Mean utilization (used / max)")
+    percentiles: dict[str, float] = Field(..., description="Utilization percentiles, e.g. `p90`")
+
+
+class ContractBucketOutput(BaseSchema):
+    enterprises: int = Field(..., description="Number of enterprises")
+    monthly_revenue: float = Field(..., description="Sum of the monthly revenues")
+
+
+class ContractMonthOutput(ContractBucketOutput):
+    month: str = Field(..., description="Month of contract end (YYYY-MM)")
+
+
+class ContractAnalyticsOutput(BaseSchema):
+    ended: ContractBucketOutput = Field(..., description="Contracts already ended")
+    months: list[ContractMonthOutput] = Field(..., description="Contracts ending in each of the next months")
+    later: ContractBucketOutput = Field(..., description="Contracts ending after the last month")
+    no_end_date: ContractBucketOutput = Field(..., description="Contracts without end date")
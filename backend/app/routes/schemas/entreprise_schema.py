@@ -132,6 +132,22 @@ class EnterpriseModifyOutput(BaseSchema):
 
     
 
+class EnterpriseBatchGetInput(BaseSchema):
+    ids: list[str] = Field(..., min_length=1, max_length=1000, description="Company ids")
+
+
+class EnterpriseLicensesInput(BaseSchema):
+    count: int = Field(1, ge=1, le=10000, description="Number of licenses to allocate or release")
+
+
+class EnterpriseLicensesOutput(BaseSchema):
+    id: str = Field(..., description="Company id")
+    max_licenses: int = Field(..., description="Maximum number of licenses allowed")
+    used_licenses: int = Field(..., description="Currently used licenses")
+    available_licenses: int = Field(..., description="Licenses left to allocate")
+    updated_date: str = Field(..., description="Last update date")
+
+
 class EnterpriseMetaOutput(BaseSchema):
     id: str = Field(..., description="Company id")
     name: str = Field(..., description="Company name")
@@ -152,9 +168,24 @@ class EnterpriseMetaOutput(BaseSchema):
     # updated_date: str = Field(..., description="Last update date (YYYY-MM-DD)")
 
 
+class EnterpriseListOutput(BaseSchema):
+    items: list[EnterpriseMetaOutput] = Field(..., description="Enterprises of the page")
+    next_token: Optional[str] = Field(None, description="Token of the next page, null on the last page")
 
 
-
-
-
-
+class EnterpriseSearchOutput(BaseSchema):
+    id: str = Field(..., description="Company id")
+    name: str = Field(..., description="Company name")
+    score: float = Field(..., description="Relevance score, higher is better")
+
+
+class EnterpriseStatsOutput(BaseSchema):
+    total_enterprises: int = Field(..., description="Number of enterprises")
+    by_status: dict[str, int] = Field(..., description="Number of enterprises by status")
+    by_subscription_tier: dict[str, int] = Field(..., description="Number of enterprises by subscription tier")
+    by_industry: dict[str, int] = Field(..., description="Number of enterprises by industry (`none` if not set)")
+    by_size: dict[str, int] = Field(..., description="Number of enterprises by size (`none` if not set)")
+    total_monthly_revenue: int = Field(..., description="Sum of the monthly revenues")
+    total_max_licenses: int = Field(..., description="Sum of the maximum numbers of licenses")
+    total_used_licenses: int = Field(..., description="Sum of the used licenses")
+    license_utilization: float = Field(..., description="Used licenses / max licenses, between 0 and 1")
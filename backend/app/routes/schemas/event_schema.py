@@ -9,6 +9,7 @@ class EventNameEnum(str, Enum):
     MODIFY = "MODIFY"
     INSERT = "INSERT"
     REMOVE = "REMOVE"
+    REMINDER = "REMINDER"
 
 class EventTypeEnum(str, Enum):
     ENTERPRISE_CREATED = "ENTERPRISE_CREATED"
@@ -17,6 +18,7 @@ class EventTypeEnum(str, Enum):
     LICENSE_CREATED = "LICENSE_CREATED"
     LICENSE_DELETED = "LICENSE_DELETED"
     LICENSE_UPDATED = "ENTERPRISE_UPDATED"
+    CONTRACT_RENEWAL_REMINDER = "CONTRACT_RENEWAL_REMINDER"
 
 class EntityTypeEnum(str, Enum):
     ENTERPRISE = "ENTERPRISE"
@@ -0,0 +1,93 @@
+from pydantic import Field, EmailStr, field_validator
+from typing import Optional
+from enum import Enum
+
+from app.routes.schemas.base import BaseSchema
+from app.routes.schemas.entreprise_schema import EnterpriseOutput
+
+
+class LicenseStatusEnum(str, Enum):
+    ACTIVE = "active"
+    INACTIVE = "inactive"
+    SUSPENDED = "suspended"
+
+class LicenseTypeEnum(str, Enum):
+    BASIC = "basic"
+    PROFESSIONAL = "professional"
+    ADMIN = "admin"
+
+class ProvisionStatusEnum(str, Enum):
+    CREATED = "created"
+    EXISTING = "existing"
+    FAILED = "failed"
+
+
+class LicenseInput(BaseSchema):
+    user_email: EmailStr = Field(..., description="Email of the user assigned to this license")
+    user_name: str = Field(..., min_length=1, description="Full name of the user")
+    status: LicenseStatusEnum = Field(default=LicenseStatusEnum.ACTIVE, description="License status")
+    license_type: LicenseTypeEnum = Field(default=LicenseTypeEnum.BASIC, description="Type of license")
+    activation_date: Optional[str] = Field(None, description="Activation date (YYYY-MM-DD)")
+    features_access: list[str] = Field(default_factory=list, description="Features this license has access to")
+
+
+class LicenseBatchCreateInput(BaseSchema):
+    licenses: list[LicenseInput] = Field(..., min_length=1, max_length=100, description="Licenses to create")
+
+
+class ProvisionUserInput(BaseSchema):
+    email: EmailStr = Field(..., description="Email of the user, also its Cognito username")
+    name: str = Field(..., min_length=1, description="Full name of the user")
+    license_type: LicenseTypeEnum = Field(default=LicenseTypeEnum.BASIC, description="Type of license")
+    features_access: list[str] = Field(default_factory=list, description="Features this license has access to")
+
+
+class ProvisionUsersInput(BaseSchema):
+    users: list[ProvisionUserInput] = Field(..., min_length=1, max_length=500, description="Users to provision")
+
+    @field_validator("users")
+    def validate_unique_emails(cls, v):
+        emails = [user.email.lower() for user in v]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Users must have distinct emails")
+        return v
+
+
+class ProvisionUserOutput(BaseSchema):
+    """One line of the provisioning stream per user, in completion order."""
+    email: str = Field(..., description="Email of the user")
+    status: ProvisionStatusEnum = Field(..., description="created, existing (added to the group), or failed")
+    license_id: Optional[str] = Field(None, description="Id of the license of the user, null if failed")
+    error: Optional[str] = Field(None, description="Reason of the failure")
+
+
+class ProvisionSummaryOutput(BaseSchema):
+    """Last line of the provisioning stream."""
+    created: int = Field(..., description="Number of users created")
+    existing: int = Field(..., description="Number of existing users added to the group")
+    failed: int = Field(..., description="Number of users not provisioned: their seats are released")
+    used_licenses: int = Field(..., description="Used licenses of the enterprise after the provisioning")
+
+
+class LicenseOutput(BaseSchema):
+    id: str = Field(..., description="License id")
+    enterprise_id: str = Field(..., description="Id of the enterprise this license belongs to")
+    user_email: str = Field(..., description="Email of the user assigned to this license")
+    user_name: str = Field(..., description="Full name of the user")
+    status: LicenseStatusEnum = Field(..., description="License status")
+    license_type: LicenseTypeEnum = Field(..., description="Type of license")
+    activation_date: Optional[str] = Field(None, description="Activation date (YYYY-MM-DD)")
+    last_used: Optional[str] = Field(None, description="Last time the license was used (ISO 8601)")
+    features_access: list[str] = Field(..., description="Features this license has access to")
+    created_date: str = Field(..., description="Creation date")
+    updated_date: Optional[str] = Field(None, description="Last update date")
+
+
+class LicenseListOutput(BaseSchema):
+    items: list[LicenseOutput] = Field(..., description="Licenses of the page")
+    next_token: Optional[str] = Field(None, description="Token of the next page, null on the last page")
+
+
+class EnterpriseFullOutput(BaseSchema):
+    enterprise: EnterpriseOutput = Field(..., description="Enterprise")
+    licenses: list[LicenseOutput] = Field(..., description="All the licenses of the enterprise")
@@ -0,0 +1,286 @@
+import heapq
+import logging
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+# A fuzzy match must reach this Dice coefficient between the query and a word (or the whole name)
+MIN_FUZZY_SCORE = 0.5
+# Upper bound of prefix entries scanned, and of documents scored by a fuzzy query
+MAX_PREFIX_CANDIDATES = 256
+MAX_FUZZY_CANDIDATES = 512
+# Rebuild the index once removed documents exceed this ratio of the slots
+COMPACTION_RATIO = 0.25
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents: "Société Générale" -> "societe generale"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip()
+
+
+def ngrams(normalized: str) -> set[str]:
+    padded = f" {normalized} "
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class _IndexState:
+    """Storage of the index. Documents live in slots; removed slots are set to None.
+    Readers only see appends and tombstones, rebuilds swap a whole new state.
+    """
+
+    def __init__(self):
+        self.ids: list[Optional[str]] = []
+        self.names: list[Optional[str]] = []
+        self.normalized: list[Optional[str]] = []
+        self.slot_by_id: dict[str, int] = {}
+        # Sorted (normalized name, slot) and (normalized id, slot) pairs
+        self.name_terms: list[tuple[str, int]] = []
+        self.id_terms: list[tuple[str, int]] = []
+        # Words of the names -> slots (ascending), and the sorted words
+        self.word_slots: dict[str, array] = {}
+        self.words: list[str] = []
+        # n-gram -> words of the vocabulary containing it. Fuzzy matching works on
+        # the vocabulary, which is much smaller than the documents.
+        self.word_ngrams: dict[str, set[str]] = {}
+        self.removed = 0
+
+    @classmethod
+    def from_documents(cls, documents) -> "_IndexState":
+        state = cls()
+        for enterprise_id, name in documents:
+            state.add(enterprise_id, name, sort=False)
+        state.name_terms.sort()
+        state.id_terms.sort()
+        state.words.sort()
+        return state
+
+    def add(self, enterprise_id: str, name: str, sort: bool = True):
+        slot = len(self.ids)
+        normalized = normalize(name)
+        self.ids.append(enterprise_id)
+        self.names.append(name)
+        self.normalized.append(normalized)
+        self.slot_by_id[enterprise_id] = slot
+
+        for terms, term in ((self.name_terms, normalized), (self.id_terms, normalize(enterprise_id))):
+            if sort:
+                insort(terms, (term, slot))
+            else:
+                terms.append((term, slot))
+        for word in set(normalized.split()):
+            slots = self.word_slots.get(word)
+            if slots is not None:
+                slots.append(slot)
+                continue
+            self.word_slots[word] = array("I", [slot])
+            if sort:
+                insort(self.words, word)
+            else:
+                self.words.append(word)
+            for gram in ngrams(word):
+                self.word_ngrams.setdefault(gram, set()).add(word)
+
+    def remove(self, slot: int):
+        del self.slot_by_id[self.ids[slot]]
+        self.ids[slot] = None
+        self.names[slot] = None
+        self.normalized[slot] = None
+        self.removed += 1
+
+    def live_slots(self, word: str, limit: int):
+        """First `limit` live slots of a word: the lowest slots win ties in the ranking."""
+        found = 0
+        for slot in self.word_slots.get(word, ()):
+            if self.normalized[slot] is not None:
+                yield slot
+                found += 1
+                if found >= limit:
+                    return
+
+    def documents(self):
+        return (
+            (enterprise_id, name)
+            for enterprise_id, name in zip(self.ids, self.names)
+            if enterprise_id is not None
+        )
+
+
+class EnterpriseSearchIndex:
+    """In-memory search index over enterprise names and ids.
+    - Prefix matches (on the full name, each word of the name and the id) use sorted lists + bisect.
+    - Fuzzy matches (typos) use a trigram index over the vocabulary, scored with the Dice coefficient.
+    Writes are serialized by a lock, searches are lock-free.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = _IndexState()
+
+    def __len__(self) -> int:
+        return len(self._state.slot_by_id)
+
+    def build(self, documents):
+        """Replace the whole index with `(id, name)` documents."""
+        state = _IndexState.from_documents(documents)
+        with self._lock:
+            self._state = state
+
+    def upsert(self, enterprise_id: str, name: str):
+        with self._lock:
+            state = self._state
+            slot = state.slot_by_id.get(enterprise_id)
+            if slot is not None:
+                if state.names[slot] == name:
+                    return
+                state.remove(slot)
+            state.add(enterprise_id, name)
+            self._compact_if_needed()
+
+    def remove(self, enterprise_id: str):
+        with self._lock:
+            slot = self._state.slot_by_id.get(enterprise_id)
+            if slot is None:
+                return
+            self._state.remove(slot)
+            self._compact_if_needed()
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, str, float]]:
+        """Return the `limit` best `(id, name, score)` matches, best first.
+        Scores: exact name 3, exact id or word 2.5, name prefix ]2, 3[, word or id prefix ]1, 2[,
+        fuzzy [0.5, 1].
+        """
+        q = normalize(query)
+        if not q:
+            return []
+
+        state = self._state
+        scores: dict[int, float] = {}
+        _score_prefix_matches(state, q, scores, limit)
+        if len(scores) < limit:
+            _score_fuzzy_matches(state, q, scores, limit)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda slot_score: (slot_score[1], -slot_score[0]))
+        return [(state.ids[slot], state.names[slot], round(score, 4)) for slot, score in best]
+
+    def stats(self) -> dict:
+        state = self._state
+        return {
+            "documents": len(state.slot_by_id),
+            "tombstones": state.removed,
+            "words": len(state.words),
+            "ngrams": len(state.word_ngrams),
+            "memory_bytes": self.memory_usage(),
+        }
+
+    def memory_usage(self) -> int:
+        """Approximate memory footprint in bytes (containers and the objects they own)."""
+        state = self._state
+        size = sum(
+            sys.getsizeof(container)
+            for container in (
+                state.ids, state.names, state.normalized, state.slot_by_id,
+                state.name_terms, state.id_terms, state.word_slots, state.words, state.word_ngrams,
+            )
+        )
+        for strings in (state.ids, state.names, state.normalized, state.words):
+            size += sum(sys.getsizeof(s) for s in strings if s is not None)
+        size += sum(sys.getsizeof(pair) for pair in state.name_terms)
+        size += sum(sys.getsizeof(pair) + sys.getsizeof(pair[0]) for pair in state.id_terms)
+        size += sum(sys.getsizeof(slots) for slots in state.word_slots.values())
+        size += sum(sys.getsizeof(gram) + sys.getsizeof(words) for gram, words in state.word_ngrams.items())
+        return size
+
+    def _compact_if_needed(self):
+        state = self._state
+        if state.removed > COMPACTION_RATIO * len(state.ids):
+            self._state = _IndexState.from_documents(state.documents())
+
+
+def _score_prefix_matches(state: _IndexState, q: str, scores: dict[int, float], limit: int):
+    # Full names and ids: exact match, then prefixes (shorter first)
+    for terms, exact_score, prefix_score in (
+        (state.name_terms, 3.0, 2.0),
+        (state.id_terms, 2.5, 1.0),
+    ):
+        i = bisect_left(terms, (q,))
+        end = min(len(terms), i + MAX_PREFIX_CANDIDATES)
+        while i < end and terms[i][0].startswith(q):
+            term, slot = terms[i]
+            i += 1
+            if state.normalized[slot] is None:
+                continue
+            score = exact_score if term == q else prefix_score + len(q) / len(term)
+            if score > scores.get(slot, 0.0):
+                scores[slot] = score
+
+    # Words: all the documents of a word share its score, keep the first `limit`
+    words = state.words
+    i = bisect_left(words, q)
+    end = min(len(words), i + MAX_PREFIX_CANDIDATES)
+    while i < end and words[i].startswith(q):
+        word = words[i]
+        i += 1
+        score = 2.5 if word == q else 1.0 + len(q) / len(word)
+        for slot in state.live_slots(word, limit):
+            if score > scores.get(slot, 0.0):
+                scores[slot] = score
+
+
+def _score_fuzzy_matches(state: _IndexState, q: str, scores: dict[int, float], limit: int):
+    query_words = q.split()
+    similar_words = [_similar_words(state, word) for word in query_words]
+
+    if len(query_words) == 1:
+        for word, dice in similar_words[0]:
+            for slot in state.live_slots(word, limit):
+                if slot not in scores:
+                    scores[slot] = dice
+        return
+
+    # Several words: candidates contain a word similar to one of the query words,
+    # they are scored on the whole name
+    candidates: set[int] = set()
+    for word, _ in sorted(
+        (pair for pairs in similar_words for pair in pairs), key=lambda pair: -pair[1]
+    ):
+        candidates.update(state.live_slots(word, MAX_FUZZY_CANDIDATES))
+        if len(candidates) >= MAX_FUZZY_CANDIDATES:
+            break
+    query_grams = ngrams(q)
+    for slot in candidates:
+        if slot in scores:
+            continue
+        dice = _dice(query_grams, ngrams(state.normalized[slot]))
+        if dice >= MIN_FUZZY_SCORE:
+            scores[slot] = dice
+
+
+def _similar_words(state: _IndexState, word: str) -> list[tuple[str, float]]:
+    """Words of the vocabulary with a Dice coefficient >= MIN_FUZZY_SCORE, best first."""
+    word_grams = ngrams(word)
+    shared: dict[str, int] = {}
+    for gram in word_grams:
+        for candidate in state.word_ngrams.get(gram, ()):
+            shared[candidate] = shared.get(candidate, 0) + 1
+
+    similar = []
+    for candidate, count in shared.items():
+        # The candidate has at least `count` n-grams: cheap upper bound first
+        if 2 * count / (len(word_grams) + count) < MIN_FUZZY_SCORE:
+            continue
+        dice = 2 * count / (len(word_grams) + len(ngrams(candidate)))
+        if dice >= MIN_FUZZY_SCORE:
+            similar.append((candidate, dice))
+    similar.sort(key=lambda pair: -pair[1])
+    return similar
+
+
+def _dice(a: set[str], b: set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
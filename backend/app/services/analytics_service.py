@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+import time
+from datetime import date
+
+from app.analytics import (
+    EnterpriseColumns,
+    contract_expiry_histogram,
+    license_utilization,
+    revenue_by,
+)
+from app.repositories.common import decompose_enterprise_id
+from app.repositories.enterprise_repository import iter_all_enterprises
+
+logger = logging.getLogger(__name__)
+
+# Other instances also write enterprises: reload the columns from the table when older than this
+ANALYTICS_MAX_AGE_SECONDS = int(os.environ.get("ANALYTICS_MAX_AGE_SECONDS", "300"))
+
+_ATTRIBUTES = {
+    "Status": "status",
+    "SubscriptionTier": "subscription_tier",
+    "Industry": "industry",
+    "Size": "size",
+    "MonthlyRevenue": "monthly_revenue",
+    "MaxLicenses": "max_licenses",
+    "UsedLicenses": "used_licenses",
+    "ContractEndDate": "contract_end_date",
+}
+
+_columns = EnterpriseColumns()
+_loaded_at: float | None = None
+_load_lock = threading.Lock()
+
+
+def load_analytics():
+    """(Re)load the enterprise columns from the table."""
+    global _columns, _loaded_at
+    with _load_lock:
+        started_at = time.monotonic()
+        _columns = EnterpriseColumns.from_items(
+            {
+                "id": decompose_enterprise_id(item["SK"]),
+                **{field: item.get(attribute) for attribute, field in _ATTRIBUTES.items()},
+            }
+            for item in iter_all_enterprises(attributes=["SK", *_ATTRIBUTES])
+        )
+        _loaded_at = time.monotonic()
+        logger.info(
+            f"Analytics loaded in {_loaded_at - started_at:.3f}s: {len(_columns)} enterprises"
+        )
+
+
+def warm_up_analytics():
+    """Load the analytics columns at startup, without failing the startup."""
+    try:
+        load_analytics()
+    except Exception as e:
+        logger.error(f"Failed to load the analytics at startup: {e}")
+
+
+def _get_columns(names: list[str]) -> dict:
+    if _loaded_at is None:
+        load_analytics()
+    elif time.monotonic() - _loaded_at > ANALYTICS_MAX_AGE_SECONDS and not _load_lock.locked():
+        # Serve the current columns while reloading them
+        threading.Thread(target=warm_up_analytics, daemon=True).start()
+    return _columns.snapshot(names)
+
+
+def fetch_revenue_analytics(group_by: str) -> list[dict]:
+    """MRR and number of enterprises grouped by `group_by`."""
+    return revenue_by(_get_columns([group_by, "monthly_revenue"]), group_by)
+
+
+def fetch_license_analytics(percentiles: list[float], group_by: str | None = None) -> list[dict]:
+    """License utilization percentiles, overall or grouped by `group_by`."""
+    if any(p < 0 or p > 100 for p in percentiles):
+        raise ValueError("Percentiles must be between 0 and 100")
+    names = ["max_licenses", "used_licenses"] + ([group_by] if group_by else [])
+    return license_utilization(_get_columns(names), percentiles, group_by=group_by)
+
+
+def fetch_contract_analytics(months: int) -> dict:
+    """Histogram of the contract end dates by month."""
+    return contract_expiry_histogram(
+        _get_columns(["contract_end_date", "contract_end_month", "monthly_revenue"]), date.today(), months
+    )
+
+
+def track_enterprise(enterprise: dict):
+    """Add or update an enterprise in the analytics columns (write path).
+    `enterprise` uses the field names of the enterprise models (`status`, `max_licenses`, ...).
+    """
+    if _loaded_at is not None:
+        _columns.upsert(enterprise)
+
+
+def untrack_enterprise(enterprise_id: str):
+    """Remove an enterprise from the analytics columns (write path)."""
+    if _loaded_at is not None:
+        _columns.remove(enterprise_id)
@@ -0,0 +1,117 @@
+import logging
+import os
+import random
+import threading
+import time
+
+from app.rate_limit import TokenBucket
+from app.repositories.cognito_repository import (
+    add_user_to_group,
+    create_group,
+    delete_group,
+    iter_group_usernames,
+)
+from app.repositories.cognito_sync_repository import (
+    complete_group_sync,
+    enqueue_group_sync,
+    find_pending_group_syncs,
+    record_group_sync_failure,
+)
+from app.utils import get_current_time
+
+logger = logging.getLogger(__name__)
+
+# Cognito group management APIs have low quotas: requests per second of the worker
+COGNITO_SYNC_RATE = float(os.environ.get("COGNITO_SYNC_RATE", "5"))
+# The worker is woken up by new operations, and polls for retries
+COGNITO_SYNC_POLL_SECONDS = int(os.environ.get("COGNITO_SYNC_POLL_SECONDS", "30"))
+RETRY_BASE_DELAY = 5  # seconds
+RETRY_MAX_DELAY = 900  # seconds
+
+_bucket = TokenBucket(rate=COGNITO_SYNC_RATE, capacity=COGNITO_SYNC_RATE)
+_wake_up = threading.Event()
+
+
+def enqueue_group_create(enterprise_id: str, group_name: str):
+    """Queue the creation of the Cognito group of a new enterprise. Returns without calling Cognito."""
+    enqueue_group_sync(enterprise_id, group_name, "", get_current_time())
+    _wake_up.set()
+
+
+def enqueue_group_rename(enterprise_id: str, old_group_name: str, new_group_name: str):
+    """Queue the rename of a group: new group, users moved to it, old group deleted."""
+    if old_group_name == new_group_name:
+        return
+    enqueue_group_sync(enterprise_id, new_group_name, old_group_name or "", get_current_time())
+    _wake_up.set()
+
+
+def enqueue_group_delete(enterprise_id: str, group_name: str):
+    enqueue_group_sync(enterprise_id, "", group_name or "", get_current_time())
+    _wake_up.set()
+
+
+def apply_group_sync(applied_group_name: str, target_group_name: str):
+    """Move Cognito from the applied group to the target group. Idempotent: safe to retry."""
+    if applied_group_name == target_group_name:
+        return
+    if target_group_name:
+        _bucket.acquire()
+        create_group(target_group_name)
+    if applied_group_name:
+        if target_group_name:
+            # Rename: Cognito groups cannot be renamed
+            for username in iter_group_usernames(applied_group_name):
+                _bucket.acquire()
+                add_user_to_group(username, target_group_name)
+        _bucket.acquire()
+        delete_group(applied_group_name)
+
+
+def sync_cognito_groups() -> dict:
+    """Apply the due operations of the outbox. Failed operations are retried later with backoff."""
+    counters = {"applied": 0, "superseded": 0, "failed": 0}
+    for item in find_pending_group_syncs(int(time.time())):
+        enterprise_id = item["SK"]
+        version = int(item["Version"])
+        target_group_name = item["TargetGroupName"]
+        try:
+            apply_group_sync(item["AppliedGroupName"], target_group_name)
+        except Exception as e:
+            attempts = int(item["Attempts"]) + 1
+            delay = random.uniform(0.5, 1) * min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempts)
+            logger.error(
+                f"Cognito group sync of enterprise {enterprise_id} failed (attempt {attempts}), "
+                f"retry in {delay:.0f}s: {e}"
+            )
+            record_group_sync_failure(enterprise_id, version, int(time.time() + delay), str(e))
+            counters["failed"] += 1
+            continue
+
+        if complete_group_sync(enterprise_id, version, target_group_name):
+            counters["applied"] += 1
+        else:
+            # A newer operation is pending: applied on the next pass
+            counters["superseded"] += 1
+            _wake_up.set()
+    return counters
+
+
+def run_cognito_sync_worker():
+    """Worker loop: apply the outbox when woken up by a new operation, or every poll interval."""
+    logger.info("Cognito group sync worker started")
+    while True:
+        _wake_up.wait(COGNITO_SYNC_POLL_SECONDS)
+        _wake_up.clear()
+        try:
+            counters = sync_cognito_groups()
+            if any(counters.values()):
+                logger.info(f"Cognito group sync: {counters}")
+        except Exception as e:
+            logger.error(f"Cognito group sync failed: {e}")
+
+
+def start_cognito_sync_worker():
+    # Apply what was left pending by a previous instance
+    _wake_up.set()
+    threading.Thread(target=run_cognito_sync_worker, daemon=True).start()
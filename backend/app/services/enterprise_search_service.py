@@ -0,0 +1,76 @@
+import logging
+import os
+import threading
+import time
+
+from app.repositories.common import decompose_enterprise_id
+from app.repositories.enterprise_repository import iter_all_enterprises
+from app.search_index import EnterpriseSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Other instances also write enterprises: rebuild the index from the table when older than this
+SEARCH_INDEX_MAX_AGE_SECONDS = int(os.environ.get("SEARCH_INDEX_MAX_AGE_SECONDS", "300"))
+
+_index = EnterpriseSearchIndex()
+_built_at: float | None = None
+_build_lock = threading.Lock()
+
+
+def load_search_index():
+    """(Re)build the search index from the table."""
+    with _build_lock:
+        _build_search_index()
+
+
+def _build_search_index():
+    """Build the index. Must hold `_build_lock`."""
+    global _built_at
+    started_at = time.monotonic()
+    _index.build(
+        (decompose_enterprise_id(item["SK"]), item["Name"])
+        for item in iter_all_enterprises(attributes=["SK", "Name"])
+    )
+    _built_at = time.monotonic()
+    logger.info(
+        f"Search index built in {_built_at - started_at:.3f}s: {_index.stats()}"
+    )
+
+
+def warm_up_search_index():
+    """Build the search index at startup, without failing the startup."""
+    try:
+        load_search_index()
+    except Exception as e:
+        logger.error(f"Failed to build the search index at startup: {e}")
+
+
+def search_enterprises(query: str, limit: int = 10) -> list[tuple[str, str, float]]:
+    """Search enterprises by name or id. Returns `(id, name, score)` tuples, best first."""
+    if _built_at is None:
+        # Not built yet: wait for the build in progress (startup warm-up or another request)
+        # rather than reading the whole table once per request
+        with _build_lock:
+            if _built_at is None:
+                _build_search_index()
+    elif time.monotonic() - _built_at > SEARCH_INDEX_MAX_AGE_SECONDS and not _build_lock.locked():
+        # Serve the current index while refreshing it
+        threading.Thread(target=warm_up_search_index, daemon=True).start()
+
+    return _index.search(query, limit=limit)
+
+
+def get_search_index_stats() -> dict:
+    return _index.stats()
+
+
+def index_enterprise(enterprise_id: str, name: str):
+    """Add or update an enterprise in the search index (write path)."""
+    if _built_at is not None:
+        _index.upsert(enterprise_id, name)
+
+
+def unindex_enterprise(enterprise_id: str):
+    """Remove an enterprise from the search index (write path)."""
+    if _built_at is not None:
+        _index.remove(enterprise_id)
@@ -1,32 +1,65 @@
 import logging
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+import humps
 
 from app.routes.schemas.entreprise_schema import (
+    IndustryEnum,
+    CompanySizeEnum,
+    EnterpriseStatusEnum,
+    SubscriptionTierEnum,
     EnterpriseInput,
     EnterpriseOutput,
     EnterpriseModifyInput,
     EnterpriseModifyOutput,
     EnterpriseMetaOutput,
+    EnterpriseStatsOutput,
+    EnterpriseLicensesOutput,
 )
 from app.repositories.models.enterprise_model import (
     EnterpriseModel,
-    EnterpriseMeta,
 )
 from app.repositories.enterprise_repository import (
     store_enterprise,
     get_enterprises_by_contract_end_date,
-    find_enterprise_by_id,
+    get_enterprises_by_filters,
+    get_enterprises_by_contract_end_range,
+    find_enterprise_item,
+    find_enterprises_by_ids,
+    find_enterprise_stats,
     update_enterprise,
+    allocate_enterprise_licenses,
+    release_enterprise_licenses,
     is_enterprise_exists,
     delete_enterprise_by_id,
 )
 from app.repositories.common import (
     RecordNotFoundError, 
-    decompose_enterprise_id,
+    compose_cognito_group_name,
+    decode_pagination_token,
+    encode_pagination_token,
+    optional_int,
 )
+from app.repositories.license_repository import delete_licenses_by_enterprise_id
 from app.utils import (
     get_current_time,
 )
 from app.services.event_service import create_new_event
+from app.services.analytics_service import (
+    track_enterprise,
+    untrack_enterprise,
+)
+from app.services.cognito_sync_service import (
+    enqueue_group_create,
+    enqueue_group_delete,
+    enqueue_group_rename,
+)
+from app.services.enterprise_search_service import (
+    index_enterprise,
+    unindex_enterprise,
+)
 from app.repositories.models.event_model import (
     EventNameEnum, EventTypeEnum,EntityTypeEnum
 )
@@ -38,6 +71,7 @@ logger = logging.getLogger(__name__)
 def create_new_enterprise(user_id: str, enterprise_input: EnterpriseInput) -> EnterpriseOutput:
     """Create a new enterprise."""
     current_time = get_current_time()
+    cognito_group_name = compose_cognito_group_name(enterprise_input.name)
     store_enterprise(
         user_id,
         EnterpriseModel(
@@ -58,11 +92,16 @@ def create_new_enterprise(user_id: str, enterprise_input: EnterpriseInput) -> En
             monthly_revenue=enterprise_input.monthly_revenue,
 
             created_date=current_time,
-            cognito_group_name= enterprise_input.name.replace(" ", "").upper(),
+            cognito_group_name=cognito_group_name,
             created_by=user_id
         ),
     )
 
+    index_enterprise(enterprise_input.id, enterprise_input.name)
+    track_enterprise(enterprise_input.model_dump())
+    # Created in Cognito by the sync worker: the response does not wait for Cognito
+    enqueue_group_create(enterprise_input.id, cognito_group_name)
+
     # Enterprise INSERT event    
     create_new_event(
         user_id=user_id,
@@ -101,8 +140,9 @@ def modify_enterprise(user_id: str, enterprise_id: str, modify_input: Enterprise
 
     try: 
         if is_enterprise_exists(enterprise_id):
-            update_enterprise(
+            response = update_enterprise(
                 enterprise_id=enterprise_id,
+                name=modify_input.name,
                 contract_start_date=modify_input.contract_start_date,
                 updated_date=current_time,
                 updated_by=user_id,
@@ -119,6 +159,13 @@ def modify_enterprise(user_id: str, enterprise_id: str, modify_input: Enterprise
                 monthly_revenue=modify_input.monthly_revenue,
                 contract_end_date=modify_input.contract_end_date,
             )
+            track_enterprise({"id": enterprise_id, **modify_input.model_dump()})
+            index_enterprise(enterprise_id, modify_input.name)
+            enqueue_group_rename(
+                enterprise_id,
+                response["Attributes"].get("CognitoGroupName"),
+                compose_cognito_group_name(modify_input.name),
+            )
 
             # Enterprise MODIFY event    
             create_new_event(
@@ -155,8 +202,49 @@ def modify_enterprise(user_id: str, enterprise_id: str, modify_input: Enterprise
 
 
 
-def fetch_all_enterprises(limit: int = 20) -> list[EnterpriseMeta]:
-    """Find all enterprises.
+def allocate_licenses(user_id: str, enterprise_id: str, count: int) -> EnterpriseLicensesOutput:
+    """Allocate `count` licenses of an enterprise, atomically checked against its max licenses."""
+    return _change_used_licenses(user_id, enterprise_id, count)
+
+
+def release_licenses(user_id: str, enterprise_id: str, count: int) -> EnterpriseLicensesOutput:
+    """Release `count` licenses of an enterprise."""
+    return _change_used_licenses(user_id, enterprise_id, -count)
+
+
+def _change_used_licenses(user_id: str, enterprise_id: str, delta: int) -> EnterpriseLicensesOutput:
+    current_time = get_current_time()
+    update = allocate_enterprise_licenses if delta > 0 else release_enterprise_licenses
+    enterprise = update(
+        enterprise_id=enterprise_id,
+        count=abs(delta),
+        updated_date=current_time,
+        updated_by=user_id,
+    )
+    track_enterprise(enterprise.model_dump())
+
+    # Enterprise MODIFY event
+    create_new_event(
+        user_id=user_id,
+        event_date=current_time,
+        event_name=EventNameEnum.MODIFY,
+        event_type=EventTypeEnum.ENTERPRISE_UPDATED,
+        entity_id=enterprise_id,
+        entity_type=EntityTypeEnum.ENTERPRISE,
+        metadata={"used_licenses_delta": delta},
+    )
+
+    return EnterpriseLicensesOutput(
+        id=enterprise.id,
+        max_licenses=enterprise.max_licenses,
+        used_licenses=enterprise.used_licenses,
+        available_licenses=enterprise.max_licenses - enterprise.used_licenses,
+        updated_date=enterprise.updated_date,
+    )
+
+
+def fetch_all_enterprises(limit: int = 20) -> list[dict]:
+    """Find all enterprises, as `EnterpriseMetaOutput` dicts.
     The order is asceding by `contract_end_date`.
     """
     if limit and (limit < 0 or limit > 100):
@@ -164,35 +252,178 @@ def fetch_all_enterprises(limit: int = 20) -> list[EnterpriseMeta]:
 
     response = get_enterprises_by_contract_end_date(limit = limit)
 
-    enterprises = []
-    for item in response["Items"]:
-        enterprises.append(
-            EnterpriseMeta(
-                id=decompose_enterprise_id(item["SK"]),
-                name=item["Name"],
-                industry=item["Industry"],
-                website=item["Website"],
-                status=item["Status"],
-                subscription_tier=item["SubscriptionTier"],
-                max_licenses=item["MaxLicenses"],
-                used_licenses=item["UsedLicenses"],
-                contract_end_date=item["ContractEndDate"],
-                monthly_revenue=item["MonthlyRevenue"],
-            )
+    return [_compose_enterprise_meta_output(item) for item in response["Items"]]
+
+
+def fetch_enterprises_page(
+    limit: int = 20,
+    next_token: Optional[str] = None,
+    status: Optional[EnterpriseStatusEnum] = None,
+    industry: Optional[IndustryEnum] = None,
+    size: Optional[CompanySizeEnum] = None,
+    subscription_tier: Optional[SubscriptionTierEnum] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """Find one page of enterprises matching the filters, as `EnterpriseMetaOutput` dicts.
+    The order is ascending by `contract_end_date`.
+    Returns the enterprises and the token of the next page (None on the last page).
+    """
+    if limit < 1 or limit > 100:
+        raise ValueError("Limit must be between 1 and 100")
+
+    response = get_enterprises_by_filters(
+        limit=limit,
+        exclusive_start_key=decode_pagination_token(next_token),
+        status=status,
+        industry=industry,
+        size=size,
+        subscription_tier=subscription_tier,
+    )
+    enterprises = [_compose_enterprise_meta_output(item) for item in response["Items"]]
+    return enterprises, encode_pagination_token(response.get("LastEvaluatedKey"))
+
+
+# `within` windows: `30d` (days) or `6w` (weeks)
+WITHIN_PATTERN = re.compile(r"^(\d+)([dw])$")
+MAX_EXPIRING_RANGE_DAYS = 3660
+
+
+def parse_contract_end_range(
+    within: Optional[str] = None,
+    between: Optional[str] = None,
+    today: Optional[date] = None,
+) -> tuple[date, date]:
+    """Resolve `within=30d` (from today) or `between=2026-01-01,2026-01-31` to an inclusive date range."""
+    if (within is None) == (between is None):
+        raise ValueError("Exactly one of within and between must be specified")
+
+    if within is not None:
+        match = WITHIN_PATTERN.match(within)
+        if not match:
+            raise ValueError("within must be a number of days or weeks, like 30d or 6w")
+        days = int(match.group(1)) * (7 if match.group(2) == "w" else 1)
+        if days > MAX_EXPIRING_RANGE_DAYS:
+            raise ValueError(f"within cannot exceed {MAX_EXPIRING_RANGE_DAYS} days")
+        start = today or date.today()
+        return start, start + timedelta(days=days)
+
+    try:
+        start, end = (date.fromisoformat(value.strip()) for value in between.split(","))
+    except ValueError:
+        raise ValueError("between must be two dates, like 2026-01-01,2026-01-31")
+    if end < start:
+        raise ValueError("between end date must not be before the start date")
+    if (end - start).days > MAX_EXPIRING_RANGE_DAYS:
+        raise ValueError(f"between cannot exceed {MAX_EXPIRING_RANGE_DAYS} days")
+    return start, end
+
+
+def fetch_expiring_enterprises(
+    within: Optional[str] = None,
+    between: Optional[str] = None,
+    limit: int = 20,
+    next_token: Optional[str] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """Find one page of enterprises whose contract ends in the range, ascending by `contract_end_date`,
+    as `EnterpriseMetaOutput` dicts.
+    Returns the enterprises and the token of the next page (None on the last page).
+    """
+    if limit < 1 or limit > 100:
+        raise ValueError("Limit must be between 1 and 100")
+    start, end = parse_contract_end_range(within=within, between=between)
+
+    response = get_enterprises_by_contract_end_range(
+        start.isoformat(),
+        end.isoformat(),
+        limit=limit,
+        exclusive_start_key=decode_pagination_token(next_token),
+    )
+    enterprises = [_compose_enterprise_meta_output(item) for item in response["Items"]]
+    return enterprises, encode_pagination_token(response.get("LastEvaluatedKey"))
+
+
+# The outputs of the reads are built from the items directly, with the camelCase keys of the
+# output schemas: the items were validated when written, they are not validated again.
+def _output_fields(schema) -> list[tuple[str, str, bool]]:
+    """Output key (the alias), item attribute and whether the value is an integer, for each field
+    of an output schema. The attributes are the PascalCase field names, the id is the `PK`.
+    """
+    return [
+        (
+            field.alias or name,
+            "PK" if name == "id" else humps.pascalize(name),
+            field.annotation in (int, Optional[int]),
         )
-    return enterprises
+        for name, field in schema.model_fields.items()
+    ]
+
+
+_ENTERPRISE_META_OUTPUT_FIELDS = _output_fields(EnterpriseMetaOutput)
+_ENTERPRISE_OUTPUT_FIELDS = _output_fields(EnterpriseOutput)
+
 
+def _compose_output(item: dict, fields: list[tuple[str, str, bool]]) -> dict:
+    # DynamoDB numbers are Decimals
+    return {
+        key: optional_int(item.get(attribute)) if is_int else item.get(attribute)
+        for key, attribute, is_int in fields
+    }
 
 
-def fetch_enterprise(enterprise_id: str) -> EnterpriseModel:
-    """Fetch enterprise by id."""
+def _compose_enterprise_meta_output(item: dict) -> dict:
+    """`EnterpriseMetaOutput` of an enterprise item, serialized by alias."""
+    return _compose_output(item, _ENTERPRISE_META_OUTPUT_FIELDS)
+
+
+def _compose_enterprise_output(item: dict) -> dict:
+    """`EnterpriseOutput` of an enterprise item, serialized by alias."""
+    return _compose_output(item, _ENTERPRISE_OUTPUT_FIELDS)
+
+
+def fetch_enterprise(enterprise_id: str) -> dict:
+    """Fetch enterprise by id, as an `EnterpriseOutput` dict."""
     try:
-        return find_enterprise_by_id(enterprise_id)
+        return _compose_enterprise_output(find_enterprise_item(enterprise_id))
     except RecordNotFoundError:
         raise RecordNotFoundError(
             f"Enterprise with ID {enterprise_id} not found in database items."
         )
-    
+
+
+def fetch_enterprises_by_ids(enterprise_ids: list[str]) -> list[EnterpriseModel]:
+    """Fetch several enterprises by ids.
+    The order of `enterprise_ids` is preserved. Unknown ids are skipped.
+    """
+    return find_enterprises_by_ids(enterprise_ids)
+
+
+def fetch_enterprise_stats() -> EnterpriseStatsOutput:
+    """Fetch the enterprise statistics.
+    Counters are maintained incrementally by the DynamoDB stream processor: a single read.
+    """
+    counters = find_enterprise_stats()
+
+    def group(prefix: str) -> dict[str, int]:
+        return {
+            name.split("#", 1)[1]: int(value)
+            for name, value in counters.items()
+            if name.startswith(f"{prefix}#") and value
+        }
+
+    total_max_licenses = int(counters.get("TotalMaxLicenses", 0))
+    total_used_licenses = int(counters.get("TotalUsedLicenses", 0))
+    return EnterpriseStatsOutput(
+        total_enterprises=int(counters.get("EnterpriseCount", 0)),
+        by_status=group("Status"),
+        by_subscription_tier=group("Tier"),
+        by_industry=group("Industry"),
+        by_size=group("Size"),
+        total_monthly_revenue=int(counters.get("TotalMonthlyRevenue", 0)),
+        total_max_licenses=total_max_licenses,
+        total_used_licenses=total_used_licenses,
+        license_utilization=(
+            total_used_licenses / total_max_licenses if total_max_licenses else 0.0
+        ),
+    )
 
 
 def remove_enterprise_by_id(user_id: str, enterprise_id: str) -> EnterpriseMetaOutput:
@@ -206,6 +437,11 @@ def remove_enterprise_by_id(user_id: str, enterprise_id: str) -> EnterpriseMetaO
     if is_enterprise_exists(enterprise_id):
         try:
             response = delete_enterprise_by_id(enterprise_id)
+            # The licenses are in the item collection of the enterprise
+            delete_licenses_by_enterprise_id(enterprise_id)
+            unindex_enterprise(enterprise_id)
+            untrack_enterprise(enterprise_id)
+            enqueue_group_delete(enterprise_id, response["Attributes"].get("CognitoGroupName"))
             
             # Enterprise MODIFY event    
             create_new_event(
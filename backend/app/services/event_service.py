@@ -1,16 +1,26 @@
 import logging
 from typing import Optional
 from uuid import uuid4
+
+from pydantic import TypeAdapter
+
 from app.repositories.event_repository import (
     store_event,
+    store_events,
     get_events_by_date,
 )
 from app.repositories.models.event_model import (
     EventModel, EventNameEnum, EventTypeEnum, EntityTypeEnum, EventMeta
 )
+from app.logging_config import log_payload
+from app.timing import span
 
 logger = logging.getLogger(__name__)
 
+_EVENT_METAS = TypeAdapter(list[EventMeta])
+# The attributes read by `fetch_all_events`: `details` is not part of the listed events
+_EVENT_META_ATTRIBUTES = ["id", "event_date", "event_type", "user_id"]
+
 
 def create_new_event(
         user_id: str,
@@ -24,24 +34,59 @@ def create_new_event(
     """Create a new event."""
     # Storing event. Internal function - no schema needed.
     try: 
-        store_event(
-            EventModel(
-                id=str(uuid4()),
-                event_date=event_date,
-                event_name=event_name,
-                event_type=event_type,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                user_id=user_id,
-                details=metadata,
+        with span("event"):
+            store_event(
+                EventModel(
+                    id=str(uuid4()),
+                    event_date=event_date,
+                    event_name=event_name,
+                    event_type=event_type,
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    user_id=user_id,
+                    details=metadata,
+                )
             )
-        )
         return True
     except Exception as e:
         logger.error(f"Failed to create {event_type} event: {e}")
         return False
     
 
+def create_new_events(
+        user_id: str,
+        event_date: str,
+        event_name: EventNameEnum,
+        event_type: EventTypeEnum,
+        entity_type: EntityTypeEnum,
+        entities: list[tuple[str, Optional[dict]]],
+    ) -> bool:
+    """Create one event per `(entity_id, metadata)` of `entities`, written in batches."""
+    if not entities:
+        return True
+    try:
+        with span("event"):
+            store_events(
+                [
+                    EventModel(
+                        id=str(uuid4()),
+                        event_date=event_date,
+                        event_name=event_name,
+                        event_type=event_type,
+                        entity_type=entity_type,
+                        entity_id=entity_id,
+                        user_id=user_id,
+                        details=metadata,
+                    )
+                    for entity_id, metadata in entities
+                ]
+            )
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create {len(entities)} {event_type} events: {e}")
+        return False
+
+
 def fetch_all_events(limit: int = 5) -> list[EventMeta]:
     """Find all events.
     The order is descending by `event_date`.
@@ -49,20 +94,13 @@ def fetch_all_events(limit: int = 5) -> list[EventMeta]:
     if limit and (limit < 0 or limit > 100):
         raise ValueError("Limit must be between 0 and 100")
 
-    response = get_events_by_date(limit = limit)
+    response = get_events_by_date(limit = limit, attributes=_EVENT_META_ATTRIBUTES)
 
-    logger.info(response)
-    events = []
-    for item in response["Items"]:
-        events.append(
-            EventMeta(
-                id=item["id"],
-                event_date=item["event_date"],
-                event_type=item["event_type"],
-                user_id=item["user_id"],
-            )
-        )
-    logger.info(events)
+    log_payload(logger, "fetch_all_events - response: %s", response)
+    # The attribute names of the event items are the field names: the page is decoded in one call
+    # to the compiled validator, faster than `model_construct` for this small model
+    events = _EVENT_METAS.validate_python(response["Items"])
+    log_payload(logger, "fetch_all_events - events: %s", events)
 
     return events
 
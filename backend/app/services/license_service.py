@@ -0,0 +1,304 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional, Union
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+
+from app.rate_limit import TokenBucket
+from app.routes.schemas.license_schema import (
+    LicenseInput,
+    ProvisionStatusEnum,
+    ProvisionSummaryOutput,
+    ProvisionUserInput,
+    ProvisionUserOutput,
+)
+from app.repositories.models.enterprise_model import EnterpriseModel
+from app.repositories.models.license_model import LicenseModel
+from app.repositories.enterprise_repository import (
+    allocate_enterprise_licenses,
+    release_enterprise_licenses,
+)
+from app.repositories.license_repository import (
+    compose_license_model,
+    delete_licenses,
+    find_enterprise_with_licenses,
+    find_licenses_by_enterprise_id,
+    store_licenses,
+)
+from app.repositories.cognito_repository import (
+    add_user_to_group,
+    admin_create_user,
+    create_group,
+)
+from app.repositories.common import (
+    BATCH_RETRY_MAX_ATTEMPTS,
+    compose_cognito_group_name,
+    compute_backoff_delay,
+    decode_pagination_token,
+    encode_pagination_token,
+    is_throttling_error,
+)
+from app.utils import (
+    get_current_time,
+)
+from app.services.event_service import create_new_events
+from app.services.analytics_service import track_enterprise
+from app.repositories.models.event_model import (
+    EventNameEnum, EventTypeEnum, EntityTypeEnum
+)
+
+logger = logging.getLogger(__name__)
+
+PROVISION_MAX_WORKERS = int(os.environ.get("PROVISION_MAX_WORKERS", "8"))
+# Requests per second, below the default Cognito quotas (AdminCreateUser: 50, AdminAddUserToGroup: 25)
+# as they are shared with the rest of the account. Shared by all the provisionings of the process.
+PROVISION_CREATE_USER_RATE = float(os.environ.get("PROVISION_CREATE_USER_RATE", "20"))
+PROVISION_ADD_TO_GROUP_RATE = float(os.environ.get("PROVISION_ADD_TO_GROUP_RATE", "10"))
+
+_create_user_bucket = TokenBucket(rate=PROVISION_CREATE_USER_RATE, capacity=PROVISION_CREATE_USER_RATE)
+_add_to_group_bucket = TokenBucket(rate=PROVISION_ADD_TO_GROUP_RATE, capacity=PROVISION_ADD_TO_GROUP_RATE)
+
+
+def create_new_licenses(
+    user_id: str, enterprise_id: str, licenses_input: list[LicenseInput]
+) -> list[LicenseModel]:
+    """Create licenses of an enterprise in batches.
+    The seats are allocated first, atomically (409 if not enough licenses are available):
+    if the licenses cannot be stored, they are deleted and the seats released.
+    """
+    current_time = get_current_time()
+    enterprise = allocate_enterprise_licenses(
+        enterprise_id=enterprise_id,
+        count=len(licenses_input),
+        updated_date=current_time,
+        updated_by=user_id,
+    )
+
+    licenses = [
+        LicenseModel(
+            id=str(uuid4()),
+            enterprise_id=enterprise_id,
+            user_email=license_input.user_email,
+            user_name=license_input.user_name,
+            status=license_input.status,
+            license_type=license_input.license_type,
+            activation_date=license_input.activation_date or current_time[:10],
+            features_access=license_input.features_access,
+            created_date=current_time,
+            created_by=user_id,
+        )
+        for license_input in licenses_input
+    ]
+    try:
+        store_licenses(licenses)
+    except Exception as e:
+        logger.error(f"Failed to store {len(licenses)} licenses of enterprise {enterprise_id}: {e}")
+        # Part of the batches may have been written
+        delete_licenses(enterprise_id, [license.id for license in licenses])
+        release_enterprise_licenses(
+            enterprise_id=enterprise_id,
+            count=len(licenses),
+            updated_date=get_current_time(),
+            updated_by=user_id,
+        )
+        raise
+    track_enterprise(enterprise.model_dump())
+
+    # License INSERT events
+    create_new_events(
+        user_id=user_id,
+        event_date=current_time,
+        event_name=EventNameEnum.INSERT,
+        event_type=EventTypeEnum.LICENSE_CREATED,
+        entity_type=EntityTypeEnum.LICENSE,
+        entities=[(license.id, {"enterprise_id": enterprise_id}) for license in licenses],
+    )
+
+    return licenses
+
+
+def fetch_licenses_page(
+    enterprise_id: str,
+    limit: int = 20,
+    next_token: Optional[str] = None,
+) -> tuple[list[LicenseModel], Optional[str]]:
+    """Find one page of licenses of an enterprise.
+    Returns the licenses and the token of the next page (None on the last page).
+    """
+    if limit < 1 or limit > 100:
+        raise ValueError("Limit must be between 1 and 100")
+
+    response = find_licenses_by_enterprise_id(
+        enterprise_id,
+        limit=limit,
+        exclusive_start_key=decode_pagination_token(next_token),
+    )
+    licenses = [compose_license_model(item) for item in response["Items"]]
+    return licenses, encode_pagination_token(response.get("LastEvaluatedKey"))
+
+
+def fetch_enterprise_with_licenses(enterprise_id: str) -> tuple[EnterpriseModel, list[LicenseModel]]:
+    """Fetch an enterprise and all its licenses in a single query."""
+    return find_enterprise_with_licenses(enterprise_id)
+
+
+def provision_enterprise_users(
+    user_id: str, enterprise_id: str, users_input: list[ProvisionUserInput]
+) -> Iterator[Union[ProvisionUserOutput, ProvisionSummaryOutput]]:
+    """Create users in Cognito and add them to the group of the enterprise, with one license each.
+    The users already holding a license of the enterprise are reported as existing: no seat, no
+    new license (provisionings can be re-run). The seats of the others are allocated atomically
+    before anything else (404 or 409 are raised here, before the first line is streamed).
+    Returns an iterator of one result per user, in completion order, then a summary: the seats of
+    the failed users are released once all the users are processed.
+    """
+    current_time = get_current_time()
+    enterprise, licenses = find_enterprise_with_licenses(enterprise_id)
+    license_ids = {license.user_email.lower(): license.id for license in licenses}
+    licensed = [
+        ProvisionUserOutput(
+            email=user_input.email,
+            status=ProvisionStatusEnum.EXISTING,
+            license_id=license_ids[user_input.email.lower()],
+        )
+        for user_input in users_input
+        if user_input.email.lower() in license_ids
+    ]
+    users_input = [user_input for user_input in users_input if user_input.email.lower() not in license_ids]
+
+    if users_input:
+        enterprise = allocate_enterprise_licenses(
+            enterprise_id=enterprise_id,
+            count=len(users_input),
+            updated_date=current_time,
+            updated_by=user_id,
+        )
+    group_name = enterprise.cognito_group_name or compose_cognito_group_name(enterprise.name)
+    if users_input:
+        try:
+            # The group sync worker may not have created it yet
+            _call_cognito(_add_to_group_bucket, create_group, group_name)
+        except Exception:
+            release_enterprise_licenses(
+                enterprise_id=enterprise_id,
+                count=len(users_input),
+                updated_date=get_current_time(),
+                updated_by=user_id,
+            )
+            raise
+    return _provision_users(user_id, enterprise, group_name, users_input, licensed, current_time)
+
+
+def _provision_users(
+    user_id: str,
+    enterprise: EnterpriseModel,
+    group_name: str,
+    users_input: list[ProvisionUserInput],
+    licensed: list[ProvisionUserOutput],
+    current_time: str,
+) -> Iterator[Union[ProvisionUserOutput, ProvisionSummaryOutput]]:
+    logger.info(
+        f"Provisioning {len(users_input)} users in group {group_name} of enterprise {enterprise.id}, "
+        f"{len(licensed)} already licensed"
+    )
+    yield from licensed
+    executor = ThreadPoolExecutor(max_workers=PROVISION_MAX_WORKERS)
+    futures = {executor.submit(_provision_user, user_input, group_name): user_input for user_input in users_input}
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Also when the client goes away: the started users are completed and accounted for
+        executor.shutdown(wait=True)
+        results = {futures[future].email: future.result() for future in futures}
+        if users_input:
+            enterprise = _complete_provisioning(user_id, enterprise, users_input, results, current_time)
+
+    counts = {status: 0 for status in ProvisionStatusEnum}
+    for result in [*licensed, *results.values()]:
+        counts[result.status] += 1
+    yield ProvisionSummaryOutput(
+        created=counts[ProvisionStatusEnum.CREATED],
+        existing=counts[ProvisionStatusEnum.EXISTING],
+        failed=counts[ProvisionStatusEnum.FAILED],
+        used_licenses=enterprise.used_licenses,
+    )
+
+
+def _provision_user(user_input: ProvisionUserInput, group_name: str) -> ProvisionUserOutput:
+    try:
+        created = _call_cognito(_create_user_bucket, admin_create_user, user_input.email, user_input.name)
+        _call_cognito(_add_to_group_bucket, add_user_to_group, user_input.email, group_name)
+    except Exception as e:
+        logger.error(f"Failed to provision user {user_input.email} in group {group_name}: {e}")
+        return ProvisionUserOutput(email=user_input.email, status=ProvisionStatusEnum.FAILED, error=str(e))
+    return ProvisionUserOutput(
+        email=user_input.email,
+        status=ProvisionStatusEnum.CREATED if created else ProvisionStatusEnum.EXISTING,
+        license_id=str(uuid4()),
+    )
+
+
+def _call_cognito(bucket: TokenBucket, function, *args):
+    """Call a Cognito API within its rate, retrying throttled calls with backoff."""
+    for attempt in range(BATCH_RETRY_MAX_ATTEMPTS):
+        bucket.acquire()
+        try:
+            return function(*args)
+        except ClientError as err:
+            if not is_throttling_error(err) or attempt == BATCH_RETRY_MAX_ATTEMPTS - 1:
+                raise err
+            time.sleep(compute_backoff_delay(attempt))
+
+
+def _complete_provisioning(
+    user_id: str,
+    enterprise: EnterpriseModel,
+    users_input: list[ProvisionUserInput],
+    results: dict[str, ProvisionUserOutput],
+    current_time: str,
+) -> EnterpriseModel:
+    """Store the licenses of the provisioned users and release the seats of the others."""
+    licenses = [
+        LicenseModel(
+            id=results[user_input.email].license_id,
+            enterprise_id=enterprise.id,
+            user_email=user_input.email,
+            user_name=user_input.name,
+            license_type=user_input.license_type,
+            activation_date=current_time[:10],
+            features_access=user_input.features_access,
+            created_date=current_time,
+            created_by=user_id,
+        )
+        for user_input in users_input
+        if results[user_input.email].status != ProvisionStatusEnum.FAILED
+    ]
+    if licenses:
+        store_licenses(licenses)
+        create_new_events(
+            user_id=user_id,
+            event_date=current_time,
+            event_name=EventNameEnum.INSERT,
+            event_type=EventTypeEnum.LICENSE_CREATED,
+            entity_type=EntityTypeEnum.LICENSE,
+            entities=[
+                (license.id, {"enterprise_id": enterprise.id, "user_email": license.user_email})
+                for license in licenses
+            ],
+        )
+
+    failed = len(users_input) - len(licenses)
+    if failed:
+        enterprise = release_enterprise_licenses(
+            enterprise_id=enterprise.id,
+            count=failed,
+            updated_date=get_current_time(),
+            updated_by=user_id,
+        )
+    track_enterprise(enterprise.model_dump())
+    logger.info(f"Provisioned {len(licenses)} users in enterprise {enterprise.id}, {failed} failed")
+    return enterprise
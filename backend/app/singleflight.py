@@ -0,0 +1,74 @@
+"""Coalescing of identical concurrent reads.
+
+`SingleFlight(func)` wraps a blocking service function for async routes: the concurrent calls
+with the same arguments share one call of `func`, run in the I/O thread pool (`run_blocking`),
+and its result. With a `ttl`, the result is also returned to the calls made within `ttl` seconds
+after it completed: the reads may then miss the writes of the last `ttl` seconds.
+The shared results must not be modified by the callers.
+
+Configuration: SINGLEFLIGHT_TTL_SECONDS (0: coalescing of the calls in flight only).
+"""
+import asyncio
+import os
+import time
+from typing import Callable, Generic, TypeVar
+
+from app.concurrency import run_blocking
+
+SINGLEFLIGHT_TTL_SECONDS = float(os.environ.get("SINGLEFLIGHT_TTL_SECONDS", "0"))
+
+T = TypeVar("T")
+
+_flights: list["SingleFlight"] = []
+
+
+def singleflight_stats() -> dict[str, dict]:
+    """Counters of each `SingleFlight` since the start of the process, by function name."""
+    return {flight.name: dict(flight.stats) for flight in _flights}
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self, func: Callable[..., T], ttl: float = SINGLEFLIGHT_TTL_SECONDS):
+        self.func = func
+        self.name = func.__name__
+        self.ttl = ttl
+        # Arguments -> task of the call in flight
+        self._calls: dict[tuple, asyncio.Task] = {}
+        # Arguments -> (expiry time, result) of the completed calls, with a ttl
+        self._results: dict[tuple, tuple[float, T]] = {}
+        # calls: all the calls, executions: calls of `func`,
+        # shared: calls joining a call in flight, cached: calls answered from a recent result
+        self.stats = {"calls": 0, "executions": 0, "shared": 0, "cached": 0}
+        _flights.append(self)
+
+    async def __call__(self, *args, **kwargs) -> T:
+        key = (args, frozenset(kwargs.items()))
+        self.stats["calls"] += 1
+
+        if self.ttl:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.stats["cached"] += 1
+                return cached[1]
+
+        task = self._calls.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(run_blocking(self.func, *args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done))
+        else:
+            self.stats["shared"] += 1
+        # A cancelled caller (client gone) does not cancel the call of the others
+        return await asyncio.shield(task)
+
+    def _complete(self, key: tuple, task: asyncio.Task):
+        del self._calls[key]
+        # Errors are raised to the callers and never cached. Retrieved here, as the callers
+        # may all have been cancelled.
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.ttl:
+            now = time.monotonic()
+            self._results = {k: v for k, v in self._results.items() if v[0] > now}
+            self._results[key] = (now + self.ttl, task.result())
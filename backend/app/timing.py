@@ -0,0 +1,163 @@
+"""Per-request breakdown of the time spent in each layer, returned in the `Server-Timing` header.
+
+`ServerTimingMiddleware` sets a `TimingRecorder` for each request, and the auth, repository and
+service layers record their spans into it with `span(name)`. Outside a request, `span` does
+nothing. The DynamoDB calls are recorded by the botocore event handlers of `app.metrics`
+(`ddb-get`, `ddb-update`, ...). `run_blocking` copies the context variables to
+its threads, so their spans go to the recorder of the request.
+
+    Server-Timing: auth;dur=41.2, sts;dur=18.0, ddb-get;dur=6.1, ddb-update;dur=7.4, event;dur=5.2,
+                   ddb-put;dur=5.0, ddb;desc="3 calls", total;dur=80.3
+
+A span name seen several times is reported once, with the sum of the durations. Nested spans
+are reported too, so the durations do not add up to `total`.
+Admins sending `X-Timing-Spans: 1` also get the span tree, as JSON in the `X-Timing-Spans`
+response header.
+"""
+import contextvars
+import json
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SPANS_HEADER = "X-Timing-Spans"
+
+DYNAMODB_SPAN_PREFIX = "ddb-"
+
+
+@dataclass
+class Span:
+    name: str
+    started_at: float
+    ended_at: Optional[float] = None
+    children: list["Span"] = field(default_factory=list)
+
+    def to_dict(self, origin: float) -> dict:
+        """Times in ms from `origin`, the start of the request. `dur` is None while in progress."""
+        return {
+            "name": self.name,
+            "start": round((self.started_at - origin) * 1000, 2),
+            "dur": None if self.ended_at is None else round((self.ended_at - self.started_at) * 1000, 2),
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+
+class TimingRecorder:
+    """Spans of one request. Shared by the threads of the request: spans are only appended."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans: list[Span] = []
+
+    def add(self, span: Span, parent: Optional[Span]):
+        (parent.children if parent is not None else self.spans).append(span)
+
+    def walk(self) -> Iterator[Span]:
+        stack = list(reversed(self.spans))
+        while stack:
+            span = stack.pop()
+            yield span
+            stack.extend(reversed(span.children))
+
+    def server_timing(self) -> str:
+        durations: dict[str, float] = {}
+        dynamodb_calls = 0
+        for span in self.walk():
+            if span.ended_at is None:
+                continue
+            durations[span.name] = durations.get(span.name, 0) + span.ended_at - span.started_at
+            if span.name.startswith(DYNAMODB_SPAN_PREFIX):
+                dynamodb_calls += 1
+        metrics = [f"{name};dur={duration * 1000:.1f}" for name, duration in durations.items()]
+        metrics.append(f'ddb;desc="{dynamodb_calls} calls"')
+        metrics.append(f"total;dur={(time.perf_counter() - self.started_at) * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def span_tree(self) -> str:
+        return json.dumps([span.to_dict(self.started_at) for span in self.spans], separators=(",", ":"))
+
+
+_recorder: contextvars.ContextVar[Optional[TimingRecorder]] = contextvars.ContextVar("timing_recorder", default=None)
+# Innermost span in progress: parent of the new spans
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("timing_span", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Record the duration of the block as `name` in the recorder of the request, if any."""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    current = Span(name, time.perf_counter())
+    recorder.add(current, _current_span.get())
+    token = _current_span.set(current)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        current.ended_at = time.perf_counter()
+
+
+# DynamoDB operation -> span name: GetItem -> ddb-get, BatchWriteItem -> ddb-batch-write
+_dynamodb_span_names: dict[str, str] = {}
+
+
+def _dynamodb_span_name(operation: str) -> str:
+    name = _dynamodb_span_names.get(operation)
+    if name is None:
+        words = re.findall("[A-Z][a-z]*", re.sub("Items?$", "", operation))
+        name = _dynamodb_span_names[operation] = DYNAMODB_SPAN_PREFIX + "-".join(words).lower()
+    return name
+
+
+def record_dynamodb_call(operation: str, started_at: float, ended_at: float):
+    """Add the span of a DynamoDB call to the recorder of the request, if any. Called by the
+    botocore handlers of `app.metrics`, which time each call once for both.
+    """
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.add(Span(_dynamodb_span_name(operation), started_at, ended_at), _current_span.get())
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware setting the recorder of the request and adding the `Server-Timing`
+    header to the response. Must be outside `CurrentUserMiddleware`, to record the auth.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = TimingRecorder()
+        token = _recorder.set(recorder)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", recorder.server_timing().encode("latin-1")))
+                if _wants_span_tree(scope):
+                    headers.append((SPANS_HEADER.lower().encode("latin-1"), recorder.span_tree().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _recorder.reset(token)
+
+
+def _wants_span_tree(scope: Scope) -> bool:
+    """Admin only: the tree shows the internals of the request."""
+    requested = any(key == b"x-timing-spans" and value == b"1" for key, value in scope["headers"])
+    # Set by `CurrentUserMiddleware`
+    current_user = scope.get("state", {}).get("current_user")
+    return requested and current_user is not None and current_user.is_admin()
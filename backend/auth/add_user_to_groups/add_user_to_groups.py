@@ -1,21 +1,26 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 USER_POOL_ID: str = os.environ["USER_POOL_ID"]
 AUTO_JOIN_USER_GROUPS: list[str] = json.loads(
     os.environ.get("AUTO_JOIN_USER_GROUPS", "[]")
 )
+MAX_CONCURRENT_GROUP_ADDS = 8
 
 logger = Logger()
 tracer = Tracer()
+metrics = Metrics(namespace=os.environ.get("POWERTOOLS_METRICS_NAMESPACE", "Auth"))
 
 cognito = boto3.client("cognito-idp")
 
 
+@metrics.log_metrics
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
 def handler(event: dict, context: LambdaContext) -> dict:
@@ -25,31 +30,72 @@ def handler(event: dict, context: LambdaContext) -> dict:
 
 
     trigger_source: str = event["triggerSource"]
+    skipped_calls = 0
     if trigger_source == "PostConfirmation_ConfirmSignUp":
-        add_user_to_groups(USER_POOL_ID, user_name, AUTO_JOIN_USER_GROUPS)
-        add_user_role(USER_POOL_ID, user_name)
+        # A user who just signed up has no group: nothing to look up
+        skipped_calls += add_user_to_groups(USER_POOL_ID, user_name, AUTO_JOIN_USER_GROUPS, existing_groups=set())
+        skipped_calls += add_user_role(USER_POOL_ID, user_name, user_attributes)
 
     elif trigger_source == "PostAuthentication_Authentication":
+        # Runs on every sign-in: only write what changed
         user_status: str = user_attributes["cognito:user_status"]
-        add_user_role(USER_POOL_ID, user_name)
+        skipped_calls += add_user_role(USER_POOL_ID, user_name, user_attributes)
         if user_status == "FORCE_CHANGE_PASSWORD":
-            add_user_to_groups(USER_POOL_ID, user_name, AUTO_JOIN_USER_GROUPS)
+            skipped_calls += add_user_to_groups(USER_POOL_ID, user_name, AUTO_JOIN_USER_GROUPS)
 
+    metrics.add_metric(name="SkippedCognitoCalls", unit=MetricUnit.Count, value=skipped_calls)
     return event
 
 
-def add_user_to_groups(user_pool_id: str, username: str, groups: list[str]):
+def add_user_to_groups(
+    user_pool_id: str, username: str, groups: list[str], existing_groups: set[str] | None = None
+) -> int:
+    """Add the user to the groups it is not a member of yet, concurrently.
+    Returns the number of avoided calls, net of the calls looking up the groups of the user.
+    """
+    if not groups:
+        return 0
+    lookup_calls = 0
+    if existing_groups is None:
+        existing_groups, lookup_calls = list_user_groups(user_pool_id, username)
+    missing_groups = [group for group in groups if group not in existing_groups]
+
     # Ajouter les groupes automatiques (LicensesEnterprisesCreationAllowed)
-    for group in groups:
+    def add_user_to_group(group: str):
         logger.info(f"Adding user '{username}' to group '{group}'")
         cognito.admin_add_user_to_group(
             UserPoolId=user_pool_id,
             Username=username,
             GroupName=group,
         )
-    
 
-def add_user_role(user_pool_id: str, username: str, role: str='admin'):
+    if missing_groups:
+        with ThreadPoolExecutor(max_workers=min(len(missing_groups), MAX_CONCURRENT_GROUP_ADDS)) as executor:
+            # Consume the results: a failed addition fails the trigger, as before
+            list(executor.map(add_user_to_group, missing_groups))
+    return len(groups) - len(missing_groups) - lookup_calls
+
+
+def list_user_groups(user_pool_id: str, username: str) -> tuple[set[str], int]:
+    """Returns the groups of the user and the number of calls made (one per page)."""
+    groups = set()
+    params = {"UserPoolId": user_pool_id, "Username": username}
+    calls = 0
+    while True:
+        response = cognito.admin_list_groups_for_user(**params)
+        calls += 1
+        groups.update(group["GroupName"] for group in response["Groups"])
+        if not response.get("NextToken"):
+            return groups, calls
+        params["NextToken"] = response["NextToken"]
+
+
+def add_user_role(user_pool_id: str, username: str, user_attributes: dict, role: str='admin') -> int:
+    """Set the `custom:role` attribute unless the event shows it is already set.
+    Returns the number of avoided calls.
+    """
+    if user_attributes.get("custom:role") == role:
+        return 1
     logger.info(f"Adding role '{role}' to user '{username}'")
     cognito.admin_update_user_attributes(
         UserPoolId=user_pool_id,
@@ -60,4 +106,5 @@ def add_user_role(user_pool_id: str, username: str, role: str='admin'):
                 'Value': role
             },
         ]
-    )
\ No newline at end of file
+    )
+    return 0
@@ -1,6 +1,9 @@
 import os
 import json
-from typing import Dict
+import time
+from typing import Dict, Optional
+
+import boto3
 
 ALLOWED_SIGN_UP_EMAIL_DOMAINS_STR = os.environ.get("ALLOWED_SIGN_UP_EMAIL_DOMAINS_STR")
 ALLOWED_SIGN_UP_EMAIL_DOMAINS = (
@@ -14,19 +17,180 @@ ALLOWED_SIGN_UP_EMAIL_LIST = (
     if ALLOWED_SIGN_UP_EMAIL_LIST_STR
     else []
 )
+# External source of the allow-list, instead of the lists above: a DynamoDB table or a JSON file
+ALLOW_LIST_TABLE_NAME = os.environ.get("ALLOW_LIST_TABLE_NAME")
+ALLOW_LIST_FILE = os.environ.get("ALLOW_LIST_FILE")
+# Seconds before checking whether the cached allow-list is still current
+ALLOW_LIST_TTL_SECONDS = float(os.environ.get("ALLOW_LIST_TTL_SECONDS", "5"))
 
+# Marks the trie nodes of `*.<domain>` entries (labels are never empty)
+_WILDCARD = ""
 
-def check_email_domain(email: str) -> bool:
-    # Determine whether to allow the email domain
-    # Always disallow if the number of '@' in the email is not exactly one
-    if email.count("@") != 1:
+
+def _normalize_domain(domain: str) -> str:
+    return domain.strip().lower().rstrip(".")
+
+
+class AllowList:
+    """Allow-lists compiled once: hashed sets for the emails and the exact domains,
+    and a trie of reversed labels for the wildcard domains (`*.corp.example.com` allows any
+    subdomain of `corp.example.com`, not `corp.example.com` itself).
+    Matching is case-insensitive and costs O(number of labels of the domain).
+    """
+
+    def __init__(self, domains: list[str], emails: list[str]):
+        self.emails = frozenset(email.strip().lower() for email in emails)
+        exact_domains = set()
+        self.wildcard_trie: dict = {}
+        for domain in map(_normalize_domain, domains):
+            if domain.startswith("*."):
+                node = self.wildcard_trie
+                for label in reversed(domain[2:].split(".")):
+                    node = node.setdefault(label, {})
+                node[_WILDCARD] = True
+            elif domain:
+                exact_domains.add(domain)
+        self.domains = frozenset(exact_domains)
+
+    def is_allowed(self, email: str) -> bool:
+        # Always disallow if the number of '@' in the email is not exactly one
+        if email.count("@") != 1:
+            return False
+        email = email.strip().lower()
+        domain = _normalize_domain(email.split("@")[1])
+        return email in self.emails or domain in self.domains or self._matches_wildcard(domain)
+
+    def _matches_wildcard(self, domain: str) -> bool:
+        node = self.wildcard_trie
+        for label in reversed(domain.split(".")):
+            # A wildcard entry matches if at least one label is left
+            if _WILDCARD in node:
+                return True
+            node = node.get(label)
+            if node is None:
+                return False
         return False
 
+
+class DynamoDBAllowListSource:
+    """Allow-list stored as an item collection of a DynamoDB table:
+    - PK = `ALLOW_LIST`, SK = `VERSION`: `Version` (number), incremented by each change,
+    - PK = `ALLOW_LIST`, SK = `DOMAIN#<domain>` for each domain (`*.` prefix for the wildcards),
+    - PK = `ALLOW_LIST`, SK = `EMAIL#<email>` for each email.
+    Writers change the entries and increment `Version` in the same transaction.
+    """
+
+    PK = "ALLOW_LIST"
+
+    def __init__(self, table_name: str):
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def version(self):
+        """A single small read: the version item."""
+        response = self.table.get_item(
+            Key={"PK": self.PK, "SK": "VERSION"}, ProjectionExpression="Version", ConsistentRead=True
+        )
+        return response.get("Item", {}).get("Version", 0)
+
+    def load(self) -> tuple:
+        """Returns the version, the domains and the emails, read by a single query of the collection."""
+        version, domains, emails = 0, [], []
+        query_params = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": self.PK},
+            "ProjectionExpression": "SK, Version",
+            "ConsistentRead": True,
+        }
+        while True:
+            response = self.table.query(**query_params)
+            for item in response["Items"]:
+                kind, _, value = item["SK"].partition("#")
+                if kind == "VERSION":
+                    version = item.get("Version", 0)
+                elif kind == "DOMAIN":
+                    domains.append(value)
+                elif kind == "EMAIL":
+                    emails.append(value)
+            if "LastEvaluatedKey" not in response:
+                return version, domains, emails
+            query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+class FileAllowListSource:
+    """Local stand-in: a JSON file `{"domains": [...], "emails": [...]}`, versioned by its mtime."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def version(self):
+        return os.stat(self.path).st_mtime_ns
+
+    def load(self) -> tuple:
+        version = self.version()
+        with open(self.path) as f:
+            allow_list = json.load(f)
+        return version, allow_list.get("domains", []), allow_list.get("emails", [])
+
+
+class EnvironmentAllowListSource:
+    """The lists of the environment variables: never change."""
+
+    def version(self):
+        return 0
+
+    def load(self) -> tuple:
+        return 0, ALLOWED_SIGN_UP_EMAIL_DOMAINS, ALLOWED_SIGN_UP_EMAIL_LIST
+
+
+class CachedAllowList:
+    """Compiled allow-list kept across warm invocations.
+    Once the TTL has expired, the version of the source is checked (one small read) and the
+    allow-list is reloaded and compiled only if it changed. If the source cannot be read,
+    the cached allow-list is kept and checked again after the TTL.
+    """
+
+    def __init__(self, source, ttl_seconds: float = ALLOW_LIST_TTL_SECONDS):
+        self.source = source
+        self.ttl_seconds = ttl_seconds
+        self.allow_list: Optional[AllowList] = None
+        self.version = None
+        self.expires_at = 0.0
+
+    def get(self) -> AllowList:
+        now = time.monotonic()
+        if self.allow_list is not None and now < self.expires_at:
+            return self.allow_list
+        try:
+            if self.allow_list is None or self.source.version() != self.version:
+                version, domains, emails = self.source.load()
+                self.allow_list = AllowList(domains, emails)
+                self.version = version
+                print(f"Allow-list version {version} loaded: {len(domains)} domains, {len(emails)} emails")
+        except Exception as e:
+            if self.allow_list is None:
+                raise e
+            print("Failed to refresh the allow-list, keeping the cached one:", e)
+        self.expires_at = now + self.ttl_seconds
+        return self.allow_list
+
+
+def _allow_list_source():
+    if ALLOW_LIST_TABLE_NAME:
+        return DynamoDBAllowListSource(ALLOW_LIST_TABLE_NAME)
+    if ALLOW_LIST_FILE:
+        return FileAllowListSource(ALLOW_LIST_FILE)
+    return EnvironmentAllowListSource()
+
+
+ALLOW_LIST = CachedAllowList(_allow_list_source())
+
+
+def check_email_domain(email: str) -> bool:
     # Allow if the domain part of the email matches any of the allowed domains
+    # (exactly, or as a subdomain of a `*.` entry) or if the email is in the allowed emails
     # Otherwise, disallow
-    # (Always disallow if ALLOWED_SIGN_UP_EMAIL_DOMAINS is empty)
-    domain = email.split("@")[1]
-    return domain in ALLOWED_SIGN_UP_EMAIL_DOMAINS or email in ALLOWED_SIGN_UP_EMAIL_LIST
+    # (Always disallow if both lists are empty)
+    return ALLOW_LIST.get().is_allowed(email)
 
 
 
@@ -0,0 +1,94 @@
+"""Aggregated enterprise statistics maintained from the DynamoDB stream of the admin table.
+
+Each enterprise item contributes to flat counters of the stats item (PK=STATS, SK=ENTERPRISE):
+- `EnterpriseCount`, `TotalMonthlyRevenue`, `TotalMaxLicenses`, `TotalUsedLicenses`
+- `Status#<status>`, `Tier#<subscription tier>`, `Industry#<industry>`, `Size#<size>`
+  (`none` when the attribute is not set)
+A stream record changes the counters by `contribution(NewImage) - contribution(OldImage)`.
+
+Rebuild the counters from the table: python enterprise_stats.py (from the streams directory)
+"""
+import logging
+from collections import Counter
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
+
+from repositories.common import _get_table_admin_client
+from repositories.stats_repository import put_enterprise_stats
+
+logger = logging.getLogger()
+
+_deserializer = TypeDeserializer()
+
+
+def is_enterprise_item(keys: dict) -> bool:
+    sk = keys.get("SK", {})
+    return isinstance(sk, dict) and sk.get("S", "").startswith("ENTERPRISE#")
+
+
+def deserialize_image(image: dict | None) -> dict | None:
+    """Convert a stream image from DynamoDB JSON ({"S": "..."}) to Python values."""
+    if not image:
+        return None
+    return {name: _deserializer.deserialize(value) for name, value in image.items()}
+
+
+def contribution(item: dict | None) -> Counter:
+    """Counters contributed by one enterprise item."""
+    counters = Counter()
+    if not item:
+        return counters
+    counters["EnterpriseCount"] += 1
+    counters["TotalMonthlyRevenue"] += item.get("MonthlyRevenue") or 0
+    counters["TotalMaxLicenses"] += item.get("MaxLicenses") or 0
+    counters["TotalUsedLicenses"] += item.get("UsedLicenses") or 0
+    counters[f"Status#{item.get('Status') or 'none'}"] += 1
+    counters[f"Tier#{item.get('SubscriptionTier') or 'none'}"] += 1
+    counters[f"Industry#{item.get('Industry') or 'none'}"] += 1
+    counters[f"Size#{item.get('Size') or 'none'}"] += 1
+    return counters
+
+
+def diff_images(old_image: dict | None, new_image: dict | None) -> dict:
+    """Counter changes between two images of the same item, without the unchanged counters."""
+    delta = Counter(contribution(new_image))
+    delta.subtract(contribution(old_image))
+    return {name: value for name, value in delta.items() if value != 0}
+
+
+def merge_deltas(deltas) -> dict:
+    total = Counter()
+    for delta in deltas:
+        for name, value in delta.items():
+            total[name] += value
+    return {name: value for name, value in total.items() if value != 0}
+
+
+def rebuild_enterprise_stats() -> dict:
+    """Recompute the counters from all the enterprises and overwrite the stats item.
+    Stream updates applied during the rebuild may be lost: run it when writes are paused.
+    """
+    table = _get_table_admin_client()
+    counters = Counter()
+    query_params = {
+        "IndexName": "GSI1",
+        "KeyConditionExpression": Key("GSI1PK").eq("TYPE#ENTERPRISE"),
+    }
+    while True:
+        response = table.query(**query_params)
+        for item in response["Items"]:
+            counters.update(contribution(item))
+        if "LastEvaluatedKey" not in response:
+            break
+        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    counters = {name: Decimal(value) for name, value in counters.items()}
+    put_enterprise_stats(counters)
+    return counters
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Enterprise stats rebuilt: {rebuild_enterprise_stats()}")
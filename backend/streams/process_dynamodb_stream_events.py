@@ -5,6 +5,8 @@ from typing import Dict, Any, Optional
 
 #from backend.app.repositories.event_repository import store_event
 #from backend.app.repositories.models.event_model import EventModel, EventNameEnum, EventTypeEnum, EntityTypeEnum
+from enterprise_stats import deserialize_image, diff_images, is_enterprise_item, merge_deltas
+from repositories.stats_repository import add_to_enterprise_stats
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -16,6 +18,8 @@ EVENTS_TABLE_NAME = os.environ.get("EVENTS_TABLE_NAME", "")
 def handler(event, context):
     """
     Process DynamoDB Stream events and create records in Events table.
+    Enterprise changes are aggregated into the stats item (see enterprise_stats.py)
+    with a single atomic ADD per batch.
 
     :param event: The event from Trigger.
     :param context: The Lambda execution context.
@@ -24,7 +28,7 @@ def handler(event, context):
     print(f"Processing {len(event['Records'])} DynamoDB stream records")
     print(EVENTS_TABLE_NAME)
     print(ADMIN_TABLE_NAME)
-    processed_count = 0
+    stats_deltas = []
     failed_records = []
     
     for record in event['Records']:
@@ -34,6 +38,14 @@ def handler(event, context):
             # Get entity data (new for INSERT, OLD for REMOVE)
             entity_data = dynamodb_data.get('NewImage') if event_name == 'INSERT' or event_name == 'MODIFY' else dynamodb_data.get('OldImage')
 
+            if is_enterprise_item(dynamodb_data.get('Keys', {})):
+                stats_deltas.append(
+                    diff_images(
+                        deserialize_image(dynamodb_data.get('OldImage')),
+                        deserialize_image(dynamodb_data.get('NewImage')),
+                    )
+                )
+
             # Create event model
             # event_model = EventModel(
             #     id=str(uuid4),
@@ -57,19 +69,32 @@ def handler(event, context):
                 
         except Exception as e:
             print(f"Error processing record {record.get('eventID', 'unknown')}: {str(e)}")
+            # The stream resumes from the first failed record: the following ones
+            # are delivered again and must not be counted in this invocation
             failed_records.append({
-                'itemIdentifier': record.get('eventID', 'unknown')
+                'itemIdentifier': record.get('dynamodb', {}).get('SequenceNumber', 'unknown')
             })
+            break
+
+    try:
+        add_to_enterprise_stats(merge_deltas(stats_deltas))
+    except Exception as e:
+        print(f"Error updating enterprise stats: {str(e)}")
+        # Nothing was counted: retry the whole batch
+        failed_records = [{
+            'itemIdentifier': event['Records'][0].get('dynamodb', {}).get('SequenceNumber', 'unknown')
+        }]
+
+    print(f"Successfully processed {len(stats_deltas)} enterprise records")
+
+    # Return failures for automatic retry
+    if failed_records:
+        return {
+            'batchItemFailures': failed_records
+        }
+
+    return {'batchItemFailures': []}
     
-#     print(f"Successfully processed {processed_count} records")
-    
-#     # Return failures for automatic retry
-#     if failed_records:
-#         return {
-#             'batchItemFailures': failed_records
-#         }
-    
-#     return {'statusCode': 200}
 
 # def create_event_record(record: Dict[str, Any]) -> None:
 #     """
@@ -26,6 +26,11 @@ def decompose_event_id(composed_event_id: str):
     return composed_event_id.split("#")[-1]
 
 
+def _get_table_admin_client():
+    """Get a DynamoDB table client."""
+    return boto3.resource("dynamodb").Table(ADMIN_TABLE_NAME)
+
+
 def _get_table_event_client():
     """Get a DynamoDB table client."""
     return boto3.resource("dynamodb").Table(EVENTS_TABLE_NAME)
@@ -0,0 +1,34 @@
+import logging
+
+from repositories.common import _get_table_admin_client
+
+logger = logging.getLogger()
+
+# Aggregated enterprise statistics item, read by `GET /enterprise/stats`
+STATS_PK = "STATS"
+STATS_SK = "ENTERPRISE"
+
+
+def add_to_enterprise_stats(delta: dict):
+    """Atomically add `delta` (attribute name -> number, may be negative) to the stats item.
+    The item and its counters are created on first use.
+    """
+    if not delta:
+        return None
+    table = _get_table_admin_client()
+
+    names = {f"#c{i}": name for i, name in enumerate(delta)}
+    values = {f":c{i}": value for i, value in enumerate(delta.values())}
+    response = table.update_item(
+        Key={"PK": STATS_PK, "SK": STATS_SK},
+        UpdateExpression="ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(delta))),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+    return response
+
+
+def put_enterprise_stats(counters: dict):
+    """Overwrite the stats item with `counters`."""
+    table = _get_table_admin_client()
+    return table.put_item(Item={"PK": STATS_PK, "SK": STATS_SK, **counters})
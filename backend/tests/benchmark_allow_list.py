@@ -0,0 +1,65 @@
+"""Benchmark: the compiled pre sign-up allow-list vs. the linear scan of the JSON lists.
+
+The module reads its environment at import: the lists are built here and passed to `AllowList`.
+The linear scan cannot match the wildcard entries: its "wildcard hit" is a full scan and a miss.
+
+Usage: python tests/benchmark_allow_list.py [--domains 50000] [--wildcards 5000] [--emails 1000]
+"""
+import argparse
+import sys
+import time
+
+sys.path.insert(0, "auth/check_admin_panel_email_domain")
+
+from check_admin_panel_email_domain import AllowList
+
+
+def generate_allow_list(domains: int, wildcards: int, emails: int) -> tuple[list[str], list[str]]:
+    """`domains` entries in total, of which `wildcards` are `*.` entries."""
+    exact = [f"company{i}.example.com" for i in range(domains - wildcards)]
+    wildcard = [f"*.corp{i}.example.org" for i in range(wildcards)]
+    return exact + wildcard, [f"user{i}@gmail.com" for i in range(emails)]
+
+
+def linear_check(email: str, domains: list[str], emails: list[str]) -> bool:
+    """The check before the allow-list was compiled: list scans, exact domains only."""
+    if email.count("@") != 1:
+        return False
+    return email.split("@")[1] in domains or email in emails
+
+
+def per_call_us(function, email: str, rounds: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        function(email)
+    return (time.perf_counter() - started_at) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--domains", type=int, default=50_000, help="Domains, wildcards included")
+    parser.add_argument("--wildcards", type=int, default=5_000, help="Wildcard (*.) domains")
+    parser.add_argument("--emails", type=int, default=1_000, help="Allowed emails")
+    parser.add_argument("--rounds", type=int, default=10_000, help="Lookups per case (compiled)")
+    args = parser.parse_args()
+
+    domains, emails = generate_allow_list(args.domains, args.wildcards, args.emails)
+    started_at = time.perf_counter()
+    allow_list = AllowList(domains, emails)
+    print(f"compile at cold start: {(time.perf_counter() - started_at) * 1000:.0f} ms")
+
+    cases = {
+        "exact domain hit": "alice@company1.example.com",
+        "wildcard hit": f"alice@eu.corp{args.wildcards - 1}.example.org",
+        "miss": "alice@unknown.example.net",
+        "email hit": f"user{args.emails - 1}@gmail.com",
+    }
+    for name, email in cases.items():
+        compiled = per_call_us(allow_list.is_allowed, email, args.rounds)
+        # The scans are slow: fewer rounds
+        linear = per_call_us(lambda e: linear_check(e, domains, emails), email, max(args.rounds // 100, 10))
+        print(f"{name:<18} compiled {compiled:6.1f} us, linear scan {linear:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark: decode throughput of the enterprise and event items read from DynamoDB.
+
+- enterprise: validated `EnterpriseModel(...)` vs. `model_construct` (`_compose_enterprise_model`)
+- event: one `EventMeta` per item vs. one call to the list adapter (`_EVENT_METAS`)
+
+The items are built in memory with the types DynamoDB returns (Decimals, raw enum values): the
+reads themselves are not measured.
+
+Usage: python tests/benchmark_decode.py [--items 10000] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import create_test_enterprise
+
+from app.repositories.enterprise_repository import _compose_enterprise_model
+from app.repositories.models.enterprise_model import EnterpriseModel
+from app.repositories.models.event_model import EventMeta
+from app.services.event_service import _EVENT_METAS
+
+
+def generate_enterprise_items(count: int) -> list[dict]:
+    items = []
+    for i in range(count):
+        enterprise = create_test_enterprise(f"ent{i:06d}", website=f"https://ent{i:06d}.example.com")
+        items.append(
+            {
+                "PK": enterprise.id,
+                "SK": f"ENTERPRISE#{enterprise.id}",
+                "Name": enterprise.name,
+                "Industry": enterprise.industry.value,
+                "Size": enterprise.size.value,
+                "Status": enterprise.status.value,
+                "ContactEmail": enterprise.contact_email,
+                "ContactPhone": enterprise.contact_phone,
+                "Address": enterprise.address,
+                "Website": enterprise.website,
+                "SubscriptionTier": enterprise.subscription_tier.value,
+                "MaxLicenses": Decimal(enterprise.max_licenses),
+                "UsedLicenses": Decimal(enterprise.used_licenses),
+                "MonthlyRevenue": Decimal(enterprise.monthly_revenue),
+                "ContractStartDate": enterprise.contract_start_date,
+                "ContractEndDate": enterprise.contract_end_date,
+                "CreatedDate": enterprise.created_date,
+                "UpdatedDate": enterprise.updated_date,
+                "CognitoGroupName": enterprise.cognito_group_name,
+                "CreatedBy": enterprise.created_by,
+                "UpdatedBy": enterprise.updated_by,
+            }
+        )
+    return items
+
+
+def generate_event_items(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"evt{i:06d}",
+            "event_date": "2025-01-01T00:00:00+00:00",
+            "event_type": "ENTERPRISE_UPDATED",
+            "user_id": f"user{i % 100}",
+        }
+        for i in range(count)
+    ]
+
+
+def validated_enterprises(items: list[dict]) -> list[EnterpriseModel]:
+    """The decoding before `model_construct`: every field validated."""
+    return [
+        EnterpriseModel(
+            id=item["PK"],
+            name=item["Name"],
+            industry=item["Industry"],
+            size=item["Size"],
+            contact_email=item["ContactEmail"],
+            contact_phone=item["ContactPhone"],
+            address=item["Address"],
+            website=item["Website"],
+            status=item["Status"],
+            subscription_tier=item["SubscriptionTier"],
+            max_licenses=item["MaxLicenses"],
+            used_licenses=item["UsedLicenses"],
+            contract_start_date=item["ContractStartDate"],
+            contract_end_date=item["ContractEndDate"],
+            monthly_revenue=item["MonthlyRevenue"],
+            created_date=item["CreatedDate"],
+            updated_date=item["UpdatedDate"],
+            cognito_group_name=item["CognitoGroupName"],
+            created_by=item["CreatedBy"],
+            updated_by=item["UpdatedBy"],
+        )
+        for item in items
+    ]
+
+
+def constructed_enterprises(items: list[dict]) -> list[EnterpriseModel]:
+    return [_compose_enterprise_model(item) for item in items]
+
+
+def per_item_events(items: list[dict]) -> list[EventMeta]:
+    """The decoding before the list adapter: one validated model per item."""
+    return [
+        EventMeta(
+            id=item["id"],
+            event_date=item["event_date"],
+            event_type=item["event_type"],
+            user_id=item["user_id"],
+        )
+        for item in items
+    ]
+
+
+def adapted_events(items: list[dict]) -> list[EventMeta]:
+    return _EVENT_METAS.validate_python(items)
+
+
+def best_ms(function, items: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function(items)
+        best = min(best, time.perf_counter() - started_at)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000, help="Items decoded per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per decoder, best kept")
+    args = parser.parse_args()
+
+    enterprise_items = generate_enterprise_items(args.items)
+    event_items = generate_event_items(args.items)
+    # Same models on both paths
+    assert validated_enterprises(enterprise_items) == constructed_enterprises(enterprise_items)
+    assert per_item_events(event_items) == adapted_events(event_items)
+
+    cases = {
+        "enterprise  validated": (validated_enterprises, enterprise_items),
+        "enterprise  model_construct": (constructed_enterprises, enterprise_items),
+        "event       per item": (per_item_events, event_items),
+        "event       list adapter": (adapted_events, event_items),
+    }
+    print(f"{args.items} items, best of {args.repeat}")
+    for name, (function, items) in cases.items():
+        ms = best_ms(function, items, args.repeat)
+        print(f"{name:<28} {ms:8.1f} ms  ({args.items / ms:6.0f}k items/s)")
+
+
+if __name__ == "__main__":
+    main()
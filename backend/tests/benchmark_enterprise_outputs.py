@@ -0,0 +1,130 @@
+"""Benchmark: per-item cost of an enterprise page, from the DynamoDB items to the JSON bytes.
+
+- before: `EnterpriseMeta` model, `EnterpriseMetaOutput` model, validation and serialization
+  against `response_model` as FastAPI does it, `JSONResponse`
+- after: `_compose_enterprise_meta_output` dicts, `ORJSONResponse`
+
+The items are built in memory with the types DynamoDB returns (Decimals, raw enum values): the
+reads themselves are not measured.
+
+Usage: python tests/benchmark_enterprise_outputs.py [--items 100] [--rounds 200]
+"""
+import argparse
+import json
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, ".")
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.repositories.common import decompose_enterprise_id
+from app.repositories.models.enterprise_model import EnterpriseMeta
+from app.responses import ORJSONResponse
+from app.routes.schemas.entreprise_schema import EnterpriseListOutput, EnterpriseMetaOutput
+from app.services.enterprise_service import _compose_enterprise_meta_output
+
+# The acceptance criterion of the change: the per-item cost at least halved
+TARGET_RATIO = 0.5
+
+
+def generate_items(count: int) -> list[dict]:
+    return [
+        {
+            "PK": f"ent{i:06d}",
+            "SK": f"ENTERPRISE#ent{i:06d}",
+            "Name": f"Enterprise {i}",
+            "Industry": "technology",
+            "Website": f"https://ent{i:06d}.example.com",
+            "Status": "active",
+            "SubscriptionTier": "basic",
+            "MaxLicenses": Decimal(10),
+            "UsedLicenses": Decimal(i % 10),
+            "ContractEndDate": "2026-01-01",
+            "MonthlyRevenue": Decimal(100),
+        }
+        for i in range(count)
+    ]
+
+
+_response_adapter = TypeAdapter(EnterpriseListOutput)
+
+
+def before(items: list[dict]) -> bytes:
+    """The former path: models in the service and the route, then the response model of FastAPI."""
+    enterprises = [
+        EnterpriseMeta(
+            id=decompose_enterprise_id(item["SK"]),
+            name=item["Name"],
+            industry=item["Industry"],
+            website=item["Website"],
+            status=item["Status"],
+            subscription_tier=item["SubscriptionTier"],
+            max_licenses=item["MaxLicenses"],
+            used_licenses=item["UsedLicenses"],
+            contract_end_date=item["ContractEndDate"],
+            monthly_revenue=item["MonthlyRevenue"],
+        )
+        for item in items
+    ]
+    output = EnterpriseListOutput(
+        items=[
+            EnterpriseMetaOutput(
+                id=enterprise.id,
+                name=enterprise.name,
+                industry=enterprise.industry,
+                website=enterprise.website,
+                status=enterprise.status,
+                subscription_tier=enterprise.subscription_tier,
+                max_licenses=enterprise.max_licenses,
+                used_licenses=enterprise.used_licenses,
+                contract_end_date=enterprise.contract_end_date,
+                monthly_revenue=enterprise.monthly_revenue,
+            )
+            for enterprise in enterprises
+        ],
+        next_token=None,
+    )
+    # FastAPI: dump of the returned model, validation against response_model, serialization
+    content = _response_adapter.validate_python(output.model_dump(by_alias=True))
+    content = _response_adapter.dump_python(content, mode="json", by_alias=True)
+    return JSONResponse(content).body
+
+
+def after(items: list[dict]) -> bytes:
+    output = {"items": [_compose_enterprise_meta_output(item) for item in items], "nextToken": None}
+    return ORJSONResponse(output).body
+
+
+def per_item_us(function, items: list[dict], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started_at = time.perf_counter()
+        for _ in range(rounds):
+            function(items)
+        best = min(best, (time.perf_counter() - started_at) / rounds)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="Items per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Pages per run, best of 3 runs kept")
+    args = parser.parse_args()
+
+    items = generate_items(args.items)
+    # Same output on both paths
+    assert json.loads(before(items)) == json.loads(after(items))
+
+    before_us = per_item_us(before, items, args.rounds)
+    after_us = per_item_us(after, items, args.rounds)
+    ratio = after_us / before_us
+    print(f"before {before_us:6.1f} us/item  (models, response_model validation, json)")
+    print(f"after  {after_us:6.1f} us/item  (dict mapping, orjson)")
+    print(f"after/before: {ratio:.2f} (target <= {TARGET_RATIO}): {'ok' if ratio <= TARGET_RATIO else 'MISSED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: overhead of the Prometheus metrics per request and per DynamoDB call.
+
+- request: a bare ASGI app (the route set in the scope, as by the router) with and without
+  `MetricsMiddleware`. Target: under 5 us per request.
+- DynamoDB call: the botocore `before-call` and `after-call` handlers of a successful call.
+
+Usage: python tests/benchmark_metrics.py [--requests 100000] [--repeat 3]
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from app.metrics import MetricsMiddleware, after_dynamodb_call, before_dynamodb_call
+
+TARGET_US = 5.0
+
+
+class Route:
+    path = "/enterprise/{enterprise_id}"
+
+
+class Operation:
+    name = "GetItem"
+
+
+async def app(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def per_request_us(asgi_app, requests: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app({"type": "http", "method": "GET", "path": "/enterprise/a"}, receive, send)
+    return (time.perf_counter() - started_at) / requests * 1e6
+
+
+async def request_overhead_us(requests: int, repeat: int) -> tuple[float, float]:
+    instrumented = MetricsMiddleware(app)
+    # Warm-up: the children of the histograms are created on the first requests
+    await per_request_us(app, requests // 5)
+    await per_request_us(instrumented, requests // 5)
+    bare = min([await per_request_us(app, requests) for _ in range(repeat)])
+    with_metrics = min([await per_request_us(instrumented, requests) for _ in range(repeat)])
+    return bare, with_metrics
+
+
+def per_dynamodb_call_us(calls: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        context = {}
+        before_dynamodb_call(context)
+        after_dynamodb_call(context, Operation, {})
+    return (time.perf_counter() - started_at) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000, help="Requests (and DynamoDB calls) per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per app, best kept")
+    args = parser.parse_args()
+
+    bare, with_metrics = asyncio.run(request_overhead_us(args.requests, args.repeat))
+    overhead = with_metrics - bare
+    print(
+        f"request: bare {bare:.2f} us, with metrics {with_metrics:.2f} us, "
+        f"overhead {overhead:.2f} us (target < {TARGET_US} us): {'ok' if overhead < TARGET_US else 'MISSED'}"
+    )
+    print(f"DynamoDB call handlers: {per_dynamodb_call_us(args.requests):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: per-request overhead of the middleware stack, on a bare FastAPI app called in process.
+
+- none: no middleware
+- decorator: the former `@app.middleware("http")` pair (BaseHTTPMiddleware, body buffered)
+- asgi: `CurrentUserMiddleware` and `RequestLoggingMiddleware`
+
+Requests without a token (anonymous user): the token verification is not measured.
+Logs are disabled: the stacks are compared, not the log handlers.
+
+Usage: python tests/benchmark_middlewares.py [--requests 2000] [--repeat 3]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.middlewares import ANONYMOUS_USER, CurrentUserMiddleware, RequestLoggingMiddleware
+
+logger = logging.getLogger(__name__)
+
+BODY_SIZES = {"100 B": 100, "1 MB": 2**20}
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/echo")
+    def echo():
+        return {"ok": True}
+
+    return app
+
+
+def decorator_stack() -> FastAPI:
+    app = create_app()
+
+    @app.middleware("http")
+    def add_current_user_to_request(request: Request, call_next):
+        request.state.current_user = ANONYMOUS_USER
+        return call_next(request)
+
+    @app.middleware("http")
+    async def add_log_requests(request: Request, call_next):
+        logger.info(f"Request path: {request.url.path}")
+        body = await request.body()
+        logger.info(f"Request body: {body.decode('utf-8')[:100]}...")
+        return await call_next(request)
+
+    return app
+
+
+def asgi_stack() -> FastAPI:
+    app = create_app()
+    app.add_middleware(CurrentUserMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def per_request_us(app: FastAPI, body: bytes, requests: int, repeat: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        best = float("inf")
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            for _ in range(requests):
+                response = await client.post("/echo", content=body)
+                response.raise_for_status()
+            best = min(best, (time.perf_counter() - started_at) / requests)
+    return best * 1e6
+
+
+async def run(requests: int, repeat: int):
+    stacks = {"none": create_app(), "decorator": decorator_stack(), "asgi": asgi_stack()}
+    print(f"{'':<12}" + "".join(f"{size:>12}" for size in BODY_SIZES))
+    for name, app in stacks.items():
+        timings = [
+            await per_request_us(app, b"x" * size, requests, repeat) for size in BODY_SIZES.values()
+        ]
+        print(f"{name:<12}" + "".join(f"{t:>9.0f} us" for t in timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stack and body size, best kept")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.requests, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: memory, build time and search latency of the enterprise search index.
+
+Usage: python tests/benchmark_search_index.py [--documents 100000] [--rounds 20]
+"""
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from app.search_index import EnterpriseSearchIndex
+
+WORDS = [
+    "alpha", "atlas", "bio", "blue", "capital", "cloud", "consulting", "data",
+    "digital", "energy", "finance", "global", "green", "health", "industries",
+    "labs", "logistics", "media", "medical", "network", "partners", "retail",
+    "sante", "services", "software", "solutions", "systems", "tech", "transport",
+    "ventures",
+]
+
+QUERIES = ["ent04217", "cloud", "green ener", "logstics", "Atlas Labs 9"]
+
+
+def generate_documents(count: int, seed: int = 42) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    return [
+        (f"ent{i:06d}", f"{' '.join(rng.sample(WORDS, 2)).title()} {i}")
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100_000, help="Enterprises indexed")
+    parser.add_argument("--rounds", type=int, default=20, help="Searches per query")
+    args = parser.parse_args()
+
+    documents = generate_documents(args.documents)
+    index = EnterpriseSearchIndex()
+    started_at = time.perf_counter()
+    index.build(documents)
+    build_seconds = time.perf_counter() - started_at
+    stats = index.stats()
+    print(
+        f"{args.documents} enterprises: built in {build_seconds:.2f}s, "
+        f"{stats['memory_bytes'] / 2**20:.1f} MiB, {stats['ngrams']} n-grams"
+    )
+
+    for query in QUERIES:
+        started_at = time.perf_counter()
+        for _ in range(args.rounds):
+            results = index.search(query, limit=10)
+        micros = (time.perf_counter() - started_at) / args.rounds * 1e6
+        print(f"  search({query!r}): {micros:.0f} µs, {len(results)} results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Load test: concurrent dashboard clients, each loading the dashboard in a loop
+(enterprise list, statistics, recent events), reporting throughput and latency percentiles.
+
+- Against a running API: --url http://localhost:8000 --token <id token>
+- In process (default): the app is called through ASGI with moto's DynamoDB, and every DynamoDB
+  call waits --latency-ms in the calling thread, like a network round trip. moto's own CPU cost
+  bounds the throughput in process: use a high latency to see the concurrency limit.
+
+Usage: python tests/load_test_dashboard.py [--clients 500] [--rounds 3] [--latency-ms 20] [--enterprises 20]
+       python tests/load_test_dashboard.py --url URL --token TOKEN [--clients 500] [--rounds 3]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+import boto3
+import httpx
+from moto import mock_aws
+
+DASHBOARD_PATHS = ["/enterprise/list?limit=20", "/enterprise/stats", "/event?limit=5"]
+
+
+async def run_client(client: httpx.AsyncClient, rounds: int, latencies: list[float], errors: list[int]):
+    for _ in range(rounds):
+        for path in DASHBOARD_PATHS:
+            started_at = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+
+async def run_load(client: httpx.AsyncClient, clients: int, rounds: int) -> dict:
+    latencies, errors = [], []
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_client(client, rounds, latencies, errors) for _ in range(clients)))
+    duration = time.perf_counter() - started_at
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "duration_s": round(duration, 2),
+        "requests_per_s": round(len(latencies) / duration, 1),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p95_ms": round(quantiles[94] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+    }
+
+
+async def run_in_process(clients: int, rounds: int, latency_ms: float, enterprises: int) -> dict:
+    from app.dependencies import check_admin, check_rate_limit, get_current_user
+    from app.main import app
+    from app.repositories.enterprise_repository import store_enterprise
+    from app.user import User
+
+    create_test_admin_table()
+    create_test_events_table()
+    # moto scans the whole table on each query: keep it small, the latency stands for DynamoDB
+    for i in range(enterprises):
+        store_enterprise("user1", create_test_enterprise(f"e{i:03}"))
+
+    # Peak number of DynamoDB calls waiting at the same time: bounded by the threads serving them
+    in_flight = {"current": 0, "max": 0}
+    lock = threading.Lock()
+
+    def wait_network(**kwargs):
+        with lock:
+            in_flight["current"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        time.sleep(latency_ms / 1000)
+        with lock:
+            in_flight["current"] -= 1
+
+    # Registered first: runs before moto answers the request
+    boto3.DEFAULT_SESSION.events.register_first("before-send.dynamodb", wait_network)
+
+    async def allow():
+        return None
+
+    async def current_user():
+        return User(id="load-test", name="load-test", groups=["Admin"], role="admin")
+
+    app.dependency_overrides[check_admin] = allow
+    app.dependency_overrides[get_current_user] = current_user
+    # All the clients are the same user: measure the throughput, not the per-user limits
+    app.dependency_overrides[check_rate_limit] = allow
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", limits=limits, timeout=None) as client:
+        report = await run_load(client, clients, rounds)
+    return {**report, "max_dynamodb_calls_in_flight": in_flight["max"]}
+
+
+async def run_remote(url: str, token: str, clients: int, rounds: int) -> dict:
+    limits = httpx.Limits(max_connections=clients)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=60) as client:
+        return await run_load(client, clients, rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500, help="Concurrent dashboard clients")
+    parser.add_argument("--rounds", type=int, default=3, help="Dashboard loads per client")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Simulated DynamoDB latency (in process)")
+    parser.add_argument("--enterprises", type=int, default=20, help="Enterprises stored (in process)")
+    parser.add_argument("--url", help="Base URL of a running API, instead of in process")
+    parser.add_argument("--token", default="", help="Bearer token for --url")
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(run_remote(args.url, args.token, args.clients, args.rounds))
+    else:
+        with mock_aws():
+            boto3.setup_default_session()
+            report = asyncio.run(run_in_process(args.clients, args.rounds, args.latency_ms, args.enterprises))
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
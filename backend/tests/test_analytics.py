@@ -0,0 +1,78 @@
+import sys
+import unittest
+from datetime import date
+
+sys.path.insert(0, ".")
+
+import numpy as np
+
+# Sets the test environment before the app modules read it (table names are read at import)
+import tests.test_repositories.utils.enterprise_factory  # noqa: F401
+from tests.benchmark_analytics import generate_columns, naive_aggregates
+
+from app.analytics import (
+    CATEGORIES,
+    EnterpriseColumns,
+    contract_expiry_histogram,
+    license_utilization,
+    revenue_by,
+)
+
+TODAY = date(2026, 1, 15)
+
+
+class TestEnterpriseColumns(unittest.TestCase):
+    def test_upsert_remove_and_aggregates(self):
+        columns = EnterpriseColumns(capacity=2)
+        columns.upsert({"id": "a", "status": "active", "subscription_tier": "basic", "monthly_revenue": 100,
+                        "max_licenses": 10, "used_licenses": 5, "contract_end_date": "2026-01-10"})
+        columns.upsert({"id": "b", "status": "trial", "subscription_tier": "private", "monthly_revenue": 300,
+                        "max_licenses": 4, "used_licenses": 4, "contract_end_date": "2026-03-01"})
+        columns.upsert({"id": "c", "status": "active", "subscription_tier": "private", "industry": "finance",
+                        "monthly_revenue": 50, "max_licenses": 0, "used_licenses": 0})
+        # Update in place, then remove a row in the middle
+        columns.upsert({"id": "b", "status": "active", "subscription_tier": "private", "monthly_revenue": 200,
+                        "max_licenses": 4, "used_licenses": 2, "contract_end_date": "2026-03-01"})
+        columns.remove("a")
+        self.assertEqual(len(columns), 2)
+
+        snapshot = columns.snapshot(["subscription_tier", "monthly_revenue", "max_licenses",
+                                     "used_licenses", "contract_end_date", "contract_end_month"])
+        self.assertEqual(
+            revenue_by(snapshot, "subscription_tier"),
+            [{"key": "private", "enterprises": 2, "monthly_revenue": 250.0, "average_monthly_revenue": 125.0}],
+        )
+        [overall] = license_utilization(snapshot, [50])
+        self.assertEqual((overall["enterprises"], overall["percentiles"]), (1, {"p50": 0.5}))
+
+        histogram = contract_expiry_histogram(snapshot, TODAY, 3)
+        self.assertEqual([m["enterprises"] for m in histogram["months"]], [0, 0, 1])
+        self.assertEqual(histogram["months"][2]["month"], "2026-03")
+        self.assertEqual(histogram["no_end_date"]["enterprises"], 1)
+
+    def test_matches_naive_loops(self):
+        columns = generate_columns(10_000)
+        snapshot = columns.snapshot(list(CATEGORIES) + ["monthly_revenue", "max_licenses", "used_licenses"])
+        rows = [
+            {
+                "subscription_tier": CATEGORIES["subscription_tier"][snapshot["subscription_tier"][i]],
+                "monthly_revenue": float(snapshot["monthly_revenue"][i]),
+                "max_licenses": int(snapshot["max_licenses"][i]),
+                "used_licenses": int(snapshot["used_licenses"][i]),
+            }
+            for i in range(len(columns))
+        ]
+        revenue, _ = naive_aggregates(rows)
+        for group in revenue_by(snapshot, "subscription_tier"):
+            self.assertAlmostEqual(group["monthly_revenue"], revenue[group["key"]])
+
+        [overall] = license_utilization(snapshot, [50, 90, 99.9])
+        with_licenses = snapshot["max_licenses"] > 0
+        expected = np.percentile(
+            snapshot["used_licenses"][with_licenses] / snapshot["max_licenses"][with_licenses], [50, 90, 99.9]
+        )
+        np.testing.assert_allclose(list(overall["percentiles"].values()), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
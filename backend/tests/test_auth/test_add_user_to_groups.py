@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "auth/add_user_to_groups")
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "true")
+os.environ.setdefault("POWERTOOLS_METRICS_NAMESPACE", "Auth")
+os.environ["USER_POOL_ID"] = "placeholder"
+os.environ["AUTO_JOIN_USER_GROUPS"] = json.dumps(["LicensesEnterprisesCreationAllowed", "Readers"])
+
+import boto3
+from moto import mock_aws
+
+import add_user_to_groups as trigger
+
+
+class LambdaContext:
+    function_name = "add_user_to_groups"
+    memory_limit_in_mb = 128
+    invoked_function_arn = "arn:aws:lambda:eu-west-3:123456789012:function:add_user_to_groups"
+    aws_request_id = "request-id"
+
+
+def _event(trigger_source: str, **attributes) -> dict:
+    return {
+        "userName": "alice",
+        "triggerSource": trigger_source,
+        "request": {"userAttributes": {"email": "alice@example.com", **attributes}},
+    }
+
+
+@mock_aws
+class TestAddUserToGroups(unittest.TestCase):
+    def setUp(self):
+        self.cognito = boto3.client("cognito-idp")
+        self.user_pool_id = self.cognito.create_user_pool(
+            PoolName="test", Schema=[{"Name": "role", "AttributeDataType": "String", "Mutable": True}]
+        )["UserPool"]["Id"]
+        for group in ("LicensesEnterprisesCreationAllowed", "Readers"):
+            self.cognito.create_group(UserPoolId=self.user_pool_id, GroupName=group)
+        self.cognito.admin_create_user(UserPoolId=self.user_pool_id, Username="alice")
+
+        # The module client was created at import, before moto. A client of its own: only the calls
+        # of the trigger are recorded
+        trigger_cognito = boto3.client("cognito-idp")
+        self.calls = []
+        trigger_cognito.meta.events.register("before-call.cognito-idp", self._record_call)
+        for name, value in (("cognito", trigger_cognito), ("USER_POOL_ID", self.user_pool_id)):
+            patcher = mock.patch.object(trigger, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _record_call(self, model, **kwargs):
+        self.calls.append(model.name)
+
+    def _groups(self) -> list[str]:
+        groups = self.cognito.admin_list_groups_for_user(UserPoolId=self.user_pool_id, Username="alice")["Groups"]
+        return sorted(group["GroupName"] for group in groups)
+
+    def _handle(self, event: dict) -> float:
+        """Run the handler, return the emitted SkippedCognitoCalls."""
+        with mock.patch.object(trigger.metrics, "add_metric", wraps=trigger.metrics.add_metric) as add_metric:
+            self.calls.clear()
+            self.assertEqual(trigger.handler(event, LambdaContext()), event)
+        [call] = [c for c in add_metric.call_args_list if c.kwargs["name"] == "SkippedCognitoCalls"]
+        return call.kwargs["value"]
+
+    def test_sign_up_adds_the_groups_and_the_role(self):
+        skipped = self._handle(_event("PostConfirmation_ConfirmSignUp"))
+        self.assertEqual(self._groups(), ["LicensesEnterprisesCreationAllowed", "Readers"])
+        self.assertEqual(sorted(self.calls), ["AdminAddUserToGroup", "AdminAddUserToGroup", "AdminUpdateUserAttributes"])
+        self.assertEqual(skipped, 0)
+
+    def test_unchanged_role_is_not_written(self):
+        skipped = self._handle(
+            _event("PostAuthentication_Authentication", **{"cognito:user_status": "CONFIRMED", "custom:role": "admin"})
+        )
+        self.assertEqual(self.calls, [])
+        self.assertEqual(skipped, 1)
+
+    def test_member_groups_are_skipped(self):
+        self.cognito.admin_add_user_to_group(
+            UserPoolId=self.user_pool_id, Username="alice", GroupName="LicensesEnterprisesCreationAllowed"
+        )
+        skipped = self._handle(
+            _event(
+                "PostAuthentication_Authentication",
+                **{"cognito:user_status": "FORCE_CHANGE_PASSWORD", "custom:role": "admin"},
+            )
+        )
+        self.assertEqual(self._groups(), ["LicensesEnterprisesCreationAllowed", "Readers"])
+        self.assertEqual(sorted(self.calls), ["AdminAddUserToGroup", "AdminListGroupsForUser"])
+        # Role write and one group addition avoided, one lookup made
+        self.assertEqual(skipped, 1)
+
+    def test_lookup_is_not_counted_as_saved(self):
+        self.assertEqual(trigger.add_user_to_groups(self.user_pool_id, "alice", ["Readers"]), -1)
+        self.assertEqual(trigger.add_user_to_groups(self.user_pool_id, "alice", ["Readers"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "auth/check_admin_panel_email_domain")
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+
+import boto3
+from moto import mock_aws
+
+import check_admin_panel_email_domain as trigger
+from check_admin_panel_email_domain import (
+    AllowList,
+    CachedAllowList,
+    DynamoDBAllowListSource,
+    FileAllowListSource,
+)
+
+
+class TestAllowList(unittest.TestCase):
+    def setUp(self):
+        self.allow_list = AllowList(
+            domains=["example.com", "*.corp.example.com", "Upper.Example.ORG."],
+            emails=["Guest@Gmail.com"],
+        )
+
+    def test_exact_domain(self):
+        self.assertTrue(self.allow_list.is_allowed("alice@example.com"))
+        self.assertFalse(self.allow_list.is_allowed("alice@sub.example.com"))
+        self.assertFalse(self.allow_list.is_allowed("alice@example.net"))
+
+    def test_wildcard_subdomain(self):
+        self.assertTrue(self.allow_list.is_allowed("alice@eu.corp.example.com"))
+        self.assertTrue(self.allow_list.is_allowed("alice@a.b.corp.example.com"))
+        # The apex is not a subdomain
+        self.assertFalse(self.allow_list.is_allowed("alice@corp.example.com"))
+        self.assertFalse(self.allow_list.is_allowed("alice@othercorp.example.com"))
+
+    def test_case_and_trailing_dot_normalization(self):
+        self.assertTrue(self.allow_list.is_allowed("Alice@EXAMPLE.com."))
+        self.assertTrue(self.allow_list.is_allowed("alice@upper.example.org"))
+        self.assertTrue(self.allow_list.is_allowed("alice@EU.Corp.Example.Com"))
+        self.assertTrue(self.allow_list.is_allowed("guest@gmail.com"))
+        self.assertFalse(self.allow_list.is_allowed("other@gmail.com"))
+
+    def test_two_at_signs(self):
+        self.assertFalse(self.allow_list.is_allowed("alice@evil.com@example.com"))
+        self.assertFalse(self.allow_list.is_allowed("alice@example.com@"))
+        self.assertFalse(self.allow_list.is_allowed("example.com"))
+
+    def test_empty_lists(self):
+        allow_list = AllowList(domains=[], emails=[])
+        self.assertFalse(allow_list.is_allowed("alice@example.com"))
+        self.assertFalse(allow_list.is_allowed("guest@gmail.com"))
+
+
+class FakeSource:
+    """Source counting its reads; `fail` makes them raise."""
+
+    def __init__(self):
+        self.current_version = 1
+        self.domains = ["example.com"]
+        self.fail = False
+        self.version_calls = 0
+        self.load_calls = 0
+
+    def version(self):
+        self.version_calls += 1
+        if self.fail:
+            raise ConnectionError("source unavailable")
+        return self.current_version
+
+    def load(self):
+        self.load_calls += 1
+        if self.fail:
+            raise ConnectionError("source unavailable")
+        return self.current_version, list(self.domains), []
+
+
+class TestCachedAllowList(unittest.TestCase):
+    def setUp(self):
+        self.source = FakeSource()
+        self.cached = CachedAllowList(self.source, ttl_seconds=10)
+        self.now = 1000.0
+        patcher = mock.patch.object(trigger.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_read_within_the_ttl(self):
+        self.assertTrue(self.cached.get().is_allowed("a@example.com"))
+        self.now += 9
+        self.cached.get()
+        self.assertEqual((self.source.version_calls, self.source.load_calls), (0, 1))
+
+    def test_version_only_check_after_the_ttl(self):
+        first = self.cached.get()
+        self.now += 11
+        self.assertIs(self.cached.get(), first)
+        self.assertEqual((self.source.version_calls, self.source.load_calls), (1, 1))
+
+    def test_reload_when_the_version_changes(self):
+        self.cached.get()
+        self.source.current_version = 2
+        self.source.domains = ["example.org"]
+        # Not before the TTL
+        self.assertTrue(self.cached.get().is_allowed("a@example.com"))
+        self.now += 11
+        allow_list = self.cached.get()
+        self.assertTrue(allow_list.is_allowed("a@example.org"))
+        self.assertFalse(allow_list.is_allowed("a@example.com"))
+        self.assertEqual((self.cached.version, self.source.load_calls), (2, 2))
+
+    def test_keeps_the_stale_list_when_the_source_fails(self):
+        first = self.cached.get()
+        self.source.fail = True
+        self.now += 11
+        self.assertIs(self.cached.get(), first)
+        # Checked again after the TTL only
+        self.cached.get()
+        self.assertEqual(self.source.version_calls, 1)
+        self.source.fail = False
+        self.source.current_version = 2
+        self.now += 11
+        self.assertIsNot(self.cached.get(), first)
+
+    def test_cold_start_without_source_raises(self):
+        self.source.fail = True
+        with self.assertRaises(ConnectionError):
+            self.cached.get()
+
+
+@mock_aws
+class TestDynamoDBAllowListSource(unittest.TestCase):
+    def setUp(self):
+        dynamodb = boto3.resource("dynamodb")
+        self.table = dynamodb.create_table(
+            TableName="allow-list",
+            KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        with self.table.batch_writer() as batch:
+            batch.put_item(Item={"PK": "ALLOW_LIST", "SK": "VERSION", "Version": 3})
+            for i in range(5):
+                batch.put_item(Item={"PK": "ALLOW_LIST", "SK": f"DOMAIN#company{i}.example.com"})
+            batch.put_item(Item={"PK": "ALLOW_LIST", "SK": "DOMAIN#*.corp.example.com"})
+            batch.put_item(Item={"PK": "ALLOW_LIST", "SK": "EMAIL#guest@gmail.com"})
+            batch.put_item(Item={"PK": "OTHER", "SK": "DOMAIN#other.example.com"})
+        self.source = DynamoDBAllowListSource("allow-list")
+
+    def test_version(self):
+        self.assertEqual(self.source.version(), 3)
+        self.table.delete_item(Key={"PK": "ALLOW_LIST", "SK": "VERSION"})
+        self.assertEqual(self.source.version(), 0)
+
+    def test_load_all_pages(self):
+        query = self.source.table.query
+        pages = []
+
+        def query_by_pages_of_2(**kwargs):
+            response = query(**kwargs, Limit=2)
+            pages.append(response)
+            return response
+
+        with mock.patch.object(self.source.table, "query", query_by_pages_of_2):
+            version, domains, emails = self.source.load()
+        self.assertGreater(len(pages), 3)
+        self.assertEqual(version, 3)
+        self.assertEqual(
+            sorted(domains), ["*.corp.example.com", *(f"company{i}.example.com" for i in range(5))]
+        )
+        self.assertEqual(emails, ["guest@gmail.com"])
+
+
+class TestFileAllowListSource(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "allow_list.json")
+        self._write({"domains": ["example.com"], "emails": ["guest@gmail.com"]}, mtime_ns=1_000_000_000)
+        self.source = FileAllowListSource(self.path)
+
+    def _write(self, allow_list: dict, mtime_ns: int):
+        with open(self.path, "w") as f:
+            json.dump(allow_list, f)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_load(self):
+        self.assertEqual(self.source.load(), (1_000_000_000, ["example.com"], ["guest@gmail.com"]))
+
+    def test_reloaded_on_mtime_bump(self):
+        cached = CachedAllowList(self.source, ttl_seconds=0)
+        self.assertTrue(cached.get().is_allowed("a@example.com"))
+        self._write({"domains": ["example.org"]}, mtime_ns=2_000_000_000)
+        self.assertEqual(self.source.version(), 2_000_000_000)
+        allow_list = cached.get()
+        self.assertTrue(allow_list.is_allowed("a@example.org"))
+        self.assertFalse(allow_list.is_allowed("guest@gmail.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
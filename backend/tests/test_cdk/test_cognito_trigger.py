@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, "../cdk/custom-resources/cognito-trigger")
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ["USER_POOL_ID"] = "eu-west-3_pool"
+
+# Provided by CloudFormation to the inline custom resources only
+sys.modules.setdefault("cfnresponse", mock.MagicMock(SUCCESS="SUCCESS", FAILED="FAILED"))
+
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+import index as custom_resource
+
+USER_POOL_ID = "eu-west-3_pool"
+PRE_SIGN_UP = "arn:aws:lambda:eu-west-3:123456789012:function:pre-sign-up"
+POST_CONFIRMATION = "arn:aws:lambda:eu-west-3:123456789012:function:post-confirmation"
+
+
+def _user_pool(lambda_config: dict) -> dict:
+    return {
+        "UserPool": {
+            "Id": USER_POOL_ID,
+            "LambdaConfig": lambda_config,
+            "AutoVerifiedAttributes": ["email"],
+            "MfaConfiguration": "OFF",
+        }
+    }
+
+
+class TestApplyLambdaConfig(unittest.TestCase):
+    def setUp(self):
+        self.stubber = Stubber(custom_resource.cognito)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+        patcher = mock.patch.object(custom_resource.time, "sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged_config_is_not_written(self):
+        self.stubber.add_response("describe_user_pool", _user_pool({"PreSignUp": PRE_SIGN_UP}))
+        updated = custom_resource.apply_lambda_config(
+            USER_POOL_ID, lambda lambda_config: {**lambda_config, "PreSignUp": PRE_SIGN_UP}
+        )
+        self.assertFalse(updated)
+        # No update_user_pool response is queued: a call would fail the stubber
+        self.stubber.assert_no_pending_responses()
+
+    def test_changed_config_is_merged_and_written(self):
+        self.stubber.add_response("describe_user_pool", _user_pool({"PreSignUp": PRE_SIGN_UP}))
+        self.stubber.add_response(
+            "update_user_pool",
+            {},
+            {
+                "UserPoolId": USER_POOL_ID,
+                "AutoVerifiedAttributes": ["email"],
+                "MfaConfiguration": "OFF",
+                "LambdaConfig": {"PreSignUp": PRE_SIGN_UP, "PostConfirmation": POST_CONFIRMATION},
+            },
+        )
+        updated = custom_resource.apply_lambda_config(
+            USER_POOL_ID, lambda lambda_config: {**lambda_config, "PostConfirmation": POST_CONFIRMATION}
+        )
+        self.assertTrue(updated)
+        self.stubber.assert_no_pending_responses()
+
+    def test_throttled_calls_are_retried_with_backoff(self):
+        self.stubber.add_client_error("describe_user_pool", "TooManyRequestsException")
+        self.stubber.add_client_error("describe_user_pool", "TooManyRequestsException")
+        self.stubber.add_response("describe_user_pool", _user_pool({"PreSignUp": PRE_SIGN_UP}))
+        with mock.patch.object(custom_resource.random, "uniform", side_effect=lambda low, high: high):
+            updated = custom_resource.apply_lambda_config(USER_POOL_ID, lambda lambda_config: lambda_config)
+        self.assertFalse(updated)
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [0.5, 1.0])
+
+    def test_throttling_is_raised_after_max_attempts(self):
+        for _ in range(custom_resource.MAX_ATTEMPTS):
+            self.stubber.add_client_error("describe_user_pool", "TooManyRequestsException")
+        with mock.patch.object(custom_resource.random, "uniform", side_effect=lambda low, high: high):
+            with self.assertRaises(ClientError) as raised:
+                custom_resource.apply_lambda_config(USER_POOL_ID, lambda lambda_config: lambda_config)
+        self.assertEqual(raised.exception.response["Error"]["Code"], "TooManyRequestsException")
+        # Capped at BACKOFF_MAX_SECONDS, no sleep after the last attempt
+        self.assertEqual(
+            [call.args[0] for call in self.sleep.call_args_list], [0.5, 1.0, 2.0, 4.0, 8.0, 10, 10]
+        )
+        self.stubber.assert_no_pending_responses()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import gzip
+import sys
+import unittest
+import zlib
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+import brotli
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import (
+    CompressionMiddleware,
+    StreamCompressor,
+    compression_level,
+    compression_stats,
+    select_encoding,
+)
+
+BODY = '{"name": "Enterprise"}\n' * 200
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/large")
+def large():
+    return PlainTextResponse(BODY, media_type="application/json")
+
+
+@app.get("/small")
+def small():
+    return PlainTextResponse("{}", media_type="application/json")
+
+
+@app.get("/image")
+def image():
+    return PlainTextResponse(BODY, media_type="image/png")
+
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse((line + "\n" for line in BODY.splitlines()), media_type="application/x-ndjson")
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def _get(self, path: str, accept_encoding: str):
+        # Raw body: the client would decode it
+        with self.client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            return response, b"".join(response.iter_raw())
+
+    def test_select_encoding(self):
+        self.assertEqual(select_encoding("gzip, deflate, br, zstd"), "zstd")
+        self.assertEqual(select_encoding("gzip, br;q=0.9"), "gzip")
+        self.assertEqual(select_encoding("zstd;q=0, *"), "br")
+        self.assertIsNone(select_encoding("identity"))
+        self.assertIsNone(select_encoding(None))
+
+    def test_level_by_size(self):
+        self.assertEqual(compression_level("gzip", 2_000), 6)
+        self.assertEqual(compression_level("gzip", 10_000_000), 1)
+        self.assertEqual(compression_level("gzip", None), 1)
+
+    def test_negotiated_encodings(self):
+        decoders = {"gzip": gzip.decompress, "br": brotli.decompress, "zstd": zstandard.ZstdDecompressor().decompress}
+        for encoding, decode in decoders.items():
+            with self.subTest(encoding=encoding):
+                response, body = self._get("/large", encoding)
+                self.assertEqual(response.headers["content-encoding"], encoding)
+                self.assertEqual(response.headers["vary"], "Accept-Encoding")
+                self.assertEqual(int(response.headers["content-length"]), len(body))
+                self.assertEqual(decode(body).decode(), BODY)
+
+    def test_not_compressed(self):
+        for path, accept_encoding in [("/small", "gzip"), ("/image", "gzip"), ("/large", "identity")]:
+            with self.subTest(path=path, accept_encoding=accept_encoding):
+                response, body = self._get(path, accept_encoding)
+                self.assertNotIn("content-encoding", response.headers)
+                self.assertEqual(int(response.headers["content-length"]), len(body))
+
+    def test_streamed_body(self):
+        response, body = self._get("/stream", "gzip")
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertNotIn("content-length", response.headers)
+        self.assertEqual(gzip.decompress(body).decode(), BODY)
+
+    def test_stream_compressor_flushes_each_chunk(self):
+        decompressors = {
+            "gzip": zlib.decompressobj(16 + zlib.MAX_WBITS).decompress,
+            "br": brotli.Decompressor().process,
+            "zstd": zstandard.ZstdDecompressor().decompressobj().decompress,
+        }
+        for encoding, decompress in decompressors.items():
+            with self.subTest(encoding=encoding):
+                compressor = StreamCompressor(encoding, compression_level(encoding, None))
+                # Each line can be decoded as soon as its chunk is received
+                for line in (b'{"id": 1}\n', b'{"id": 2}\n'):
+                    self.assertEqual(decompress(compressor.compress(line)), line)
+                self.assertEqual(decompress(compressor.finish()), b"")
+
+    def test_stats(self):
+        before = compression_stats()["gzip"]
+        self._get("/large", "gzip")
+        after = compression_stats()["gzip"]
+        self.assertEqual(after["responses"], before["responses"] + 1)
+        self.assertEqual(after["bytes_in"], before["bytes_in"] + len(BODY))
+        self.assertGreater(after["ratio"], 10)
+
+    def test_optional_encodings_are_not_negotiated_when_missing(self):
+        self.assertIn("br", compression.AVAILABLE_ENCODINGS)
+        with mock.patch.object(compression, "AVAILABLE_ENCODINGS", ["gzip"]):
+            self.assertEqual(select_encoding("br, zstd, gzip;q=0.5"), "gzip")
+            self.assertIsNone(select_encoding("br, zstd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
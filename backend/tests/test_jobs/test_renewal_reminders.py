@@ -0,0 +1,89 @@
+import sys
+import unittest
+from datetime import date
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+from moto import mock_aws
+
+from app.jobs.renewal_reminders import send_renewal_reminders
+from app.repositories.enterprise_repository import mark_renewal_reminder_sent, store_enterprise
+from app.repositories.event_repository import get_events_by_date
+from app.services.enterprise_service import parse_contract_end_range
+
+
+class TestParseContractEndRange(unittest.TestCase):
+    def test_within(self):
+        today = date(2026, 1, 15)
+        self.assertEqual(parse_contract_end_range(within="30d", today=today), (today, date(2026, 2, 14)))
+        self.assertEqual(parse_contract_end_range(within="2w", today=today), (today, date(2026, 1, 29)))
+
+    def test_between(self):
+        self.assertEqual(
+            parse_contract_end_range(between="2026-02-01, 2026-02-28"),
+            (date(2026, 2, 1), date(2026, 2, 28)),
+        )
+
+    def test_invalid(self):
+        for kwargs in (
+            {},
+            {"within": "30d", "between": "2026-02-01,2026-02-28"},
+            {"within": "1 month"},
+            {"within": "99999d"},
+            {"between": "2026-02-01"},
+            {"between": "2026-02-28,2026-02-01"},
+        ):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                parse_contract_end_range(**kwargs)
+
+
+@mock_aws
+class TestSendRenewalReminders(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        create_test_events_table()
+        for enterprise_id, contract_end_date in (
+            ("ended", "2026-01-10"),
+            ("soon", "2026-01-20"),
+            ("later", "2026-02-14"),
+            ("far", "2026-06-01"),
+        ):
+            store_enterprise("user1", create_test_enterprise(enterprise_id, contract_end_date=contract_end_date))
+        store_enterprise("user1", create_test_enterprise("trial", contract_end_date="2026-01-25", status="trial"))
+        store_enterprise("user1", create_test_enterprise("suspended", contract_end_date="2026-01-25", status="suspended"))
+
+    def test_emits_one_reminder_per_enterprise_of_the_range(self):
+        sent = send_renewal_reminders(within="30d", today=date(2026, 1, 15))
+        self.assertEqual(sent, 3)
+
+        events = get_events_by_date(limit=10)["Items"]
+        self.assertEqual(
+            sorted((event["entity_id"], event["details"]["days_left"]) for event in events),
+            [("later", 30), ("soon", 5), ("trial", 10)],
+        )
+        self.assertTrue(all(event["event_type"] == "CONTRACT_RENEWAL_REMINDER" for event in events))
+
+    def test_reminds_each_contract_end_date_once(self):
+        self.assertEqual(send_renewal_reminders(within="30d", today=date(2026, 1, 15)), 3)
+        self.assertEqual(send_renewal_reminders(within="30d", today=date(2026, 1, 16)), 0)
+
+        # Renewed, then ending again within the window: reminded for the new date
+        store_enterprise("user1", create_test_enterprise("soon", contract_end_date="2026-02-10"))
+        self.assertEqual(send_renewal_reminders(within="30d", today=date(2026, 1, 16)), 1)
+        self.assertEqual(len(get_events_by_date(limit=10)["Items"]), 4)
+
+    def test_mark_renewal_reminder_sent(self):
+        self.assertTrue(mark_renewal_reminder_sent("soon", "2026-01-20"))
+        self.assertFalse(mark_renewal_reminder_sent("soon", "2026-01-20"))
+        self.assertTrue(mark_renewal_reminder_sent("soon", "2027-01-20"))
+        self.assertFalse(mark_renewal_reminder_sent("missing", "2026-01-20"))
+
+
+if __name__ == "__main__":
+    unittest.main()
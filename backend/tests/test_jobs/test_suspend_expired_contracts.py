@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from app.jobs import suspend_expired_contracts as job
+from app.repositories.enterprise_repository import (
+    find_enterprise_by_id,
+    get_enterprises_by_filters,
+    store_enterprise,
+    transition_enterprise_status,
+)
+from app.repositories.event_repository import get_events_by_date
+
+BEFORE = date(2026, 1, 15)
+
+
+@mock_aws
+class TestSuspendExpiredContracts(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        create_test_events_table()
+        # 60 expired active, 10 expired trial, 20 active ending later
+        for i in range(60):
+            store_enterprise("user1", create_test_enterprise(f"exp{i:02d}", contract_end_date=f"2025-{i % 12 + 1:02d}-10"))
+        for i in range(10):
+            store_enterprise("user1", create_test_enterprise(f"trial{i}", contract_end_date="2025-06-01", status="trial"))
+        for i in range(20):
+            store_enterprise("user1", create_test_enterprise(f"later{i:02d}", contract_end_date="2026-01-15"))
+        self.checkpoint_path = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+
+    def _status_ids(self, status):
+        return {item["PK"] for item in get_enterprises_by_filters(limit=200, status=status)["Items"]}
+
+    def test_suspends_expired_active_enterprises(self):
+        report = job.suspend_expired_contracts(
+            before=BEFORE, checkpoint_path=self.checkpoint_path, max_workers=4, page_size=25
+        )
+
+        self.assertEqual((report["read"], report["suspended"], report["failed"]), (60, 60, 0))
+        self.assertEqual(self._status_ids("suspended"), {f"exp{i:02d}" for i in range(60)})
+        self.assertEqual(len(self._status_ids("active")), 20)
+        self.assertEqual(len(self._status_ids("trial")), 10)
+        self.assertEqual(find_enterprise_by_id("exp00").status, "suspended")
+        self.assertEqual(len(get_events_by_date(limit=100)["Items"]), 60)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_resumes_from_checkpoint(self):
+        query = job.get_enterprises_by_contract_end_range
+        calls = []
+
+        def interrupted_query(*args, **kwargs):
+            calls.append(kwargs["exclusive_start_key"])
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return query(*args, **kwargs)
+
+        with mock.patch.object(job, "get_enterprises_by_contract_end_range", interrupted_query):
+            with self.assertRaises(KeyboardInterrupt):
+                job.suspend_expired_contracts(before=BEFORE, checkpoint_path=self.checkpoint_path, page_size=20)
+        self.assertTrue(os.path.exists(self.checkpoint_path))
+        self.assertEqual(len(self._status_ids("suspended")), 40)
+
+        report = job.suspend_expired_contracts(before=BEFORE, checkpoint_path=self.checkpoint_path, page_size=20)
+        self.assertEqual((report["read"], report["suspended"]), (60, 60))
+        self.assertEqual(len(self._status_ids("suspended")), 60)
+        self.assertEqual(len(get_events_by_date(limit=100)["Items"]), 60)
+
+    def test_retries_throttled_updates(self):
+        transition = job.transition_enterprise_status
+        throttled = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "UpdateItem")
+        attempts = []
+
+        def throttled_transition(*args, **kwargs):
+            attempts.append(args[0])
+            if attempts.count(args[0]) < 3:
+                raise throttled
+            return transition(*args, **kwargs)
+
+        with mock.patch.object(job, "transition_enterprise_status", throttled_transition), \
+                mock.patch.object(job, "compute_backoff_delay", return_value=0):
+            report = job.suspend_expired_contracts(before=BEFORE, checkpoint_path=None)
+        self.assertEqual((report["suspended"], report["failed"]), (60, 0))
+        self.assertEqual(len(attempts), 180)
+
+
+@mock_aws
+class TestTransitionEnterpriseStatus(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        store_enterprise("user1", create_test_enterprise("a", status="trial"))
+
+    def test_only_from_expected_status(self):
+        self.assertFalse(transition_enterprise_status("a", "active", "suspended", "2026-01-01", "user1"))
+        self.assertFalse(transition_enterprise_status("unknown", "trial", "active", "2026-01-01", "user1"))
+        self.assertTrue(transition_enterprise_status("a", "trial", "active", "2026-01-01", "user1"))
+        self.assertEqual(find_enterprise_by_id("a").status, "active")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import unittest
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import create_test_admin_table
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+from prometheus_client import REGISTRY
+
+from app import timing
+from app.metrics import MetricsMiddleware
+from app.repositories.common import RecordNotFoundError
+from app.repositories.enterprise_repository import find_enterprise_by_id
+from app.routes.metrics import router as metrics_router
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.include_router(metrics_router)
+
+
+@app.get("/enterprise/{enterprise_id}")
+def get_enterprise_by_id(enterprise_id: str):
+    return {"id": enterprise_id}
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_labelled_by_route_template(self):
+        labels = {"method": "GET", "route": "/enterprise/{enterprise_id}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+        self.client.get("/enterprise/1")
+        self.client.get("/enterprise/2")
+        self.assertEqual(sample("http_request_duration_seconds_count", **labels), before + 2)
+
+    def test_unmatched_route(self):
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = sample("http_request_duration_seconds_count", **labels)
+        self.client.get("/unknown/1")
+        self.client.get("/unknown/2")
+        self.assertEqual(sample("http_request_duration_seconds_count", **labels), before + 2)
+
+    def test_exposition(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/plain", response.headers["content-type"])
+        self.assertIn("http_requests_in_flight", response.text)
+        self.assertIn("singleflight_calls_total", response.text)
+        self.assertIn("compression_responses_total", response.text)
+
+
+@mock_aws
+class TestDynamoDBMetrics(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+
+    def test_operation_duration(self):
+        calls_before = sample("dynamodb_operation_duration_seconds_count", operation="GetItem")
+        with self.assertRaises(RecordNotFoundError):
+            find_enterprise_by_id("missing")
+        self.assertEqual(sample("dynamodb_operation_duration_seconds_count", operation="GetItem"), calls_before + 1)
+
+    def test_one_timing_for_the_histogram_and_the_span(self):
+        duration_before = sample("dynamodb_operation_duration_seconds_sum", operation="GetItem")
+        recorder = timing.TimingRecorder()
+        token = timing._recorder.set(recorder)
+        try:
+            with self.assertRaises(RecordNotFoundError):
+                find_enterprise_by_id("missing")
+        finally:
+            timing._recorder.reset(token)
+        [span] = recorder.spans
+        self.assertEqual(span.name, "ddb-get")
+        self.assertAlmostEqual(
+            span.ended_at - span.started_at,
+            sample("dynamodb_operation_duration_seconds_sum", operation="GetItem") - duration_before,
+            places=9,
+        )
+
+    def test_errors(self):
+        errors_before = sample("dynamodb_operation_errors_total", operation="GetItem", code="ValidationException")
+        with self.assertRaises(Exception):
+            find_enterprise_by_id("")
+        self.assertEqual(
+            sample("dynamodb_operation_errors_total", operation="GetItem", code="ValidationException"),
+            errors_before + 1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
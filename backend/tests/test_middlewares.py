@@ -0,0 +1,95 @@
+import asyncio
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from jose import JWTError
+
+from app import middlewares
+from app.middlewares import ANONYMOUS_USER, CurrentUserMiddleware, RequestLoggingMiddleware
+from app.user import User
+
+USER = User(id="user1", name="alice", groups=["Admin"], role="admin")
+
+app = FastAPI()
+app.add_middleware(CurrentUserMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
+
+
+@app.get("/me")
+def me(request: Request):
+    return request.state.current_user.model_dump()
+
+
+class TestCurrentUserMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_user_of_the_token(self):
+        with mock.patch.object(middlewares, "authenticate", return_value=USER) as authenticate:
+            response = self.client.get("/me", headers={"Authorization": "Bearer token1"})
+        self.assertEqual(response.json(), USER.model_dump())
+        [(token,), _] = authenticate.call_args
+        self.assertEqual((token.scheme, token.credentials), ("Bearer", "token1"))
+
+    def test_anonymous_user(self):
+        with mock.patch.object(middlewares, "authenticate") as authenticate:
+            response = self.client.get("/me")
+        self.assertEqual(response.json(), ANONYMOUS_USER.model_dump())
+        authenticate.assert_not_called()
+
+    def test_invalid_token(self):
+        for error in (JWTError("Signature has expired"), IndexError("no matching key"), KeyError("kid")):
+            with self.subTest(error=type(error).__name__):
+                with mock.patch.object(middlewares, "authenticate", side_effect=error):
+                    response = self.client.get("/me", headers={"Authorization": "Bearer expired"})
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(response.json(), {"detail": "Could not validate credentials"})
+                self.assertEqual(response.headers["content-type"], "application/json")
+
+    def test_http_exception_of_the_authentication(self):
+        error = HTTPException(
+            status_code=403, detail="Could not validate credentials", headers={"WWW-Authenticate": "Bearer"}
+        )
+        with mock.patch.object(middlewares, "authenticate", side_effect=error):
+            response = self.client.get("/me", headers={"Authorization": "Bearer bad"})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.headers["www-authenticate"], "Bearer")
+
+
+class TestBodyPassThrough(unittest.TestCase):
+    def test_large_body_is_streamed_not_buffered(self):
+        chunk = b"x" * 2**20
+        chunks_sent = 0
+        received = []
+
+        async def receive():
+            nonlocal chunks_sent
+            chunks_sent += 1
+            return {"type": "http.request", "body": chunk, "more_body": chunks_sent < 4}
+
+        async def endpoint(scope, inner_receive, send):
+            # Each chunk reaches the app before the next one is read from the client
+            while True:
+                message = await inner_receive()
+                received.append((len(message["body"]), chunks_sent))
+                if not message["more_body"]:
+                    break
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        stack = RequestLoggingMiddleware(CurrentUserMiddleware(endpoint))
+        scope = {"type": "http", "method": "POST", "path": "/upload", "headers": []}
+        asyncio.run(stack(scope, receive, send))
+        self.assertEqual(received, [(2**20, 1), (2**20, 2), (2**20, 3), (2**20, 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+import fakeredis
+import redis.exceptions
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app import dependencies, rate_limit
+from app.dependencies import check_rate_limit
+from app.middlewares import CurrentUserMiddleware
+from app.rate_limit import MemoryBucketStore, RedisBucketStore, ThrottleMonitor
+
+app = FastAPI(dependencies=[Depends(check_rate_limit)])
+app.add_middleware(CurrentUserMiddleware)
+
+
+class FailingRedis:
+    """Stand-in for `redis.asyncio.Redis`: the script calls raise `error` while it is set."""
+
+    def __init__(self, error: Exception | None):
+        self.error = error
+        self.calls = 0
+
+    def register_script(self, script: str):
+        async def call(keys, args):
+            self.calls += 1
+            if self.error:
+                raise self.error
+            return "0"
+
+        return call
+
+
+@app.get("/enterprise")
+def get_all_enterprises():
+    return []
+
+
+@app.get("/enterprise/{enterprise_id}")
+def get_enterprise_by_id(enterprise_id: str):
+    return {"id": enterprise_id}
+
+
+class TestBucketStores(unittest.TestCase):
+    def _assert_bucket(self, store):
+        async def run():
+            taken = [await store.take("user1:*", rate=10, capacity=3) for _ in range(4)]
+            other_user = await store.take("user2:*", rate=10, capacity=3)
+            return taken, other_user
+
+        (first, second, third, fourth), other_user = asyncio.run(run())
+        self.assertEqual((first, second, third, other_user), (0, 0, 0, 0))
+        self.assertAlmostEqual(fourth, 0.1, delta=0.02)
+
+    def test_memory(self):
+        self._assert_bucket(MemoryBucketStore())
+
+    def test_memory_drops_least_recently_used(self):
+        store = MemoryBucketStore(max_buckets=2)
+        for key in ("a", "b", "a", "c"):
+            asyncio.run(store.take(key, rate=1, capacity=1))
+        self.assertEqual(list(store._buckets), ["a", "c"])
+
+    def test_redis(self):
+        self._assert_bucket(RedisBucketStore(fakeredis.FakeAsyncRedis()))
+
+    def test_redis_failures_fall_back_to_the_process_buckets(self):
+        for error in (redis.exceptions.ConnectionError("refused"), redis.exceptions.TimeoutError("timeout")):
+            with self.subTest(error=type(error).__name__):
+                client = FailingRedis(error)
+                with self.assertLogs("app.rate_limit", "WARNING") as logs:
+                    self._assert_bucket(RedisBucketStore(client))
+                self.assertEqual((client.calls, len(logs.records)), (5, 1))
+
+    def test_redis_is_used_again_once_back(self):
+        client = FailingRedis(redis.exceptions.ConnectionError("refused"))
+        store = RedisBucketStore(client)
+        with self.assertLogs("app.rate_limit", "INFO") as logs:
+            self.assertEqual(asyncio.run(store.take("user1:*", rate=1, capacity=1)), 0)
+            self.assertGreater(asyncio.run(store.take("user1:*", rate=1, capacity=1)), 0)
+            client.error = None
+            self.assertEqual(asyncio.run(store.take("user1:*", rate=1, capacity=1)), 0)
+        self.assertEqual([record.levelname for record in logs.records], ["WARNING", "INFO"])
+
+
+class TestThrottleMonitor(unittest.TestCase):
+    def test_throttled_ratio_over_the_window(self):
+        monitor = ThrottleMonitor(window=10, min_attempts=20)
+        for i in range(10):
+            monitor.record(throttled=False, now=100)
+        self.assertEqual(monitor.throttled_ratio(now=100), 0.0)  # too few attempts
+
+        for i in range(30):
+            monitor.record(throttled=i % 3 == 0, now=105)
+        self.assertAlmostEqual(monitor.throttled_ratio(now=105), 10 / 40)
+        # The attempts of the second 100 are out of the window
+        self.assertAlmostEqual(monitor.throttled_ratio(now=110), 10 / 30)
+        self.assertEqual(monitor.throttled_ratio(now=115), 0.0)
+
+    def test_admission_cost(self):
+        monitor = ThrottleMonitor()
+        with mock.patch.object(monitor, "throttled_ratio", return_value=0.01):
+            self.assertEqual(monitor.admission_cost(), 1.0)
+        with mock.patch.object(monitor, "throttled_ratio", return_value=0.2):
+            self.assertEqual(monitor.admission_cost(), 4.0)
+        with mock.patch.object(monitor, "throttled_ratio", return_value=1.0):
+            self.assertEqual(monitor.admission_cost(), rate_limit.LOAD_SHEDDING_MAX_COST)
+
+
+class TestCheckRateLimit(unittest.TestCase):
+    def setUp(self):
+        limits = {"*": (0.5, 2), "GET /enterprise/{enterprise_id}": (0.5, 3)}
+        self.monitor = ThrottleMonitor()
+        for patcher in (
+            mock.patch.object(rate_limit, "RATE_LIMITS", limits),
+            mock.patch.object(dependencies, "bucket_store", MemoryBucketStore()),
+            mock.patch.object(dependencies, "dynamodb_throttling", self.monitor),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(app)
+
+    def _statuses(self, path: str, count: int) -> list[int]:
+        return [self.client.get(path).status_code for _ in range(count)]
+
+    def test_limits_by_route(self):
+        self.assertEqual(self._statuses("/enterprise", 3), [200, 200, 429])
+        # The route template is limited, not each enterprise
+        self.assertEqual(self._statuses("/enterprise/a", 2) + self._statuses("/enterprise/b", 2), [200] * 3 + [429])
+
+        response = self.client.get("/enterprise")
+        self.assertEqual(response.json(), {"detail": "Too many requests"})
+        self.assertEqual(response.headers["retry-after"], "2")
+
+    def test_redis_down(self):
+        store = RedisBucketStore(FailingRedis(redis.exceptions.ConnectionError("refused")))
+        with mock.patch.object(dependencies, "bucket_store", store), self.assertLogs("app.rate_limit", "WARNING"):
+            self.assertEqual(self._statuses("/enterprise", 3), [200, 200, 429])
+
+    def test_load_shedding(self):
+        for _ in range(20):
+            self.monitor.record(throttled=True)
+        # One request costs the whole burst
+        self.assertEqual(self._statuses("/enterprise/a", 2), [200, 429])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+import sys
+import unittest
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+)
+
+from moto import mock_aws
+
+from app.repositories.common import (
+    RecordNotFoundError,
+    ResourceConflictError,
+    _get_table_admin_client,
+    compose_enterprise_id,
+    decode_pagination_token,
+    encode_pagination_token,
+)
+from app.repositories.enterprise_repository import (
+    allocate_enterprise_licenses,
+    find_enterprise_by_id,
+    find_enterprises_by_ids,
+    get_enterprises_by_contract_end_range,
+    get_enterprises_by_filters,
+    iter_enterprises_by_contract_end_range,
+    release_enterprise_licenses,
+    store_enterprise,
+    update_enterprise,
+)
+from app.repositories.models.enterprise_model import EnterpriseModel
+
+
+@mock_aws
+class TestFindEnterpriseById(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+
+    def test_trusted_read_matches_validated_model(self):
+        stored = create_test_enterprise("a", website="https://a.example.com", used_licenses=3, monthly_revenue=None)
+        store_enterprise("user1", stored)
+
+        enterprise = find_enterprise_by_id("a")
+        self.assertEqual(enterprise, stored)
+        self.assertEqual(type(enterprise.max_licenses), int)
+        self.assertEqual(EnterpriseModel.model_validate(enterprise.model_dump()), enterprise)
+
+    def test_unknown_enterprise(self):
+        with self.assertRaises(RecordNotFoundError):
+            find_enterprise_by_id("unknown")
+
+
+@mock_aws
+class TestFindEnterprisesByIds(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+
+    def test_preserves_input_order_across_chunks(self):
+        ids = [f"ent{i:03d}" for i in range(250)]
+        for enterprise_id in ids:
+            store_enterprise("user1", create_test_enterprise(enterprise_id))
+
+        requested = list(reversed(ids))
+        enterprises = find_enterprises_by_ids(requested)
+        self.assertEqual([e.id for e in enterprises], requested)
+        self.assertEqual(enterprises[0].name, "Enterprise ent249")
+
+    def test_skips_unknown_and_duplicated_ids(self):
+        store_enterprise("user1", create_test_enterprise("a"))
+        store_enterprise("user1", create_test_enterprise("b"))
+
+        enterprises = find_enterprises_by_ids(["b", "unknown", "a", "b"])
+        self.assertEqual([e.id for e in enterprises], ["b", "a", "b"])
+
+    def test_empty(self):
+        self.assertEqual(find_enterprises_by_ids([]), [])
+
+
+@mock_aws
+class TestGetEnterprisesByFilters(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        store_enterprise("user1", create_test_enterprise("a", contract_end_date="2026-03-01"))
+        store_enterprise("user1", create_test_enterprise("b", contract_end_date="2026-01-01", status="trial"))
+        store_enterprise("user1", create_test_enterprise("c", contract_end_date="2026-02-01", industry="finance"))
+        store_enterprise("user1", create_test_enterprise("d", contract_end_date="2026-04-01", industry=None))
+
+    def _ids(self, response):
+        return [item["PK"] for item in response["Items"]]
+
+    def test_filter_uses_index_sorted_by_contract_end_date(self):
+        response = get_enterprises_by_filters(status="active")
+        self.assertEqual(self._ids(response), ["c", "a", "d"])
+
+        response = get_enterprises_by_filters(industry="technology")
+        self.assertEqual(self._ids(response), ["b", "a"])
+
+    def test_combined_filters(self):
+        response = get_enterprises_by_filters(industry="technology", status="active")
+        self.assertEqual(self._ids(response), ["a"])
+
+    def test_pagination(self):
+        first = get_enterprises_by_filters(limit=2, status="active")
+        self.assertEqual(self._ids(first), ["c", "a"])
+        token = encode_pagination_token(first["LastEvaluatedKey"])
+        second = get_enterprises_by_filters(
+            limit=2, status="active", exclusive_start_key=decode_pagination_token(token)
+        )
+        self.assertEqual(self._ids(second), ["d"])
+
+    def test_combined_filters_fill_the_page(self):
+        store_enterprise("user1", create_test_enterprise("e", contract_end_date="2026-05-01"))
+        store_enterprise("user1", create_test_enterprise("f", contract_end_date="2026-06-01"))
+        # technology: b (trial), a, e, f. The first query page only has `a` matching
+        first = get_enterprises_by_filters(limit=2, industry="technology", status="active")
+        self.assertEqual(self._ids(first), ["a", "e"])
+        self.assertEqual(first["LastEvaluatedKey"]["PK"], "e")
+        second = get_enterprises_by_filters(
+            limit=2, industry="technology", status="active", exclusive_start_key=first["LastEvaluatedKey"]
+        )
+        self.assertEqual(self._ids(second), ["f"])
+        self.assertNotIn("LastEvaluatedKey", second)
+
+    def test_update_moves_item_between_indexes(self):
+        update_enterprise(
+            enterprise_id="a",
+            contract_start_date="2025-01-01",
+            updated_date="2025-06-01",
+            updated_by="user1",
+            industry=None,
+            size="small",
+            status="suspended",
+            subscription_tier="basic",
+            max_licenses=10,
+            used_licenses=0,
+            monthly_revenue=100,
+            contract_end_date="2026-03-01",
+        )
+        self.assertEqual(self._ids(get_enterprises_by_filters(status="active")), ["c", "d"])
+        self.assertEqual(self._ids(get_enterprises_by_filters(status="suspended")), ["a"])
+        self.assertEqual(self._ids(get_enterprises_by_filters(industry="technology")), ["b"])
+
+
+@mock_aws
+class TestGetEnterprisesByContractEndRange(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        for enterprise_id, contract_end_date in (
+            ("jan", "2026-01-31"),
+            ("feb1", "2026-02-01"),
+            ("feb2", "2026-02-14"),
+            ("feb3", "2026-02-28"),
+            ("mar", "2026-03-01"),
+        ):
+            store_enterprise("user1", create_test_enterprise(enterprise_id, contract_end_date=contract_end_date))
+
+    def test_range_is_inclusive_and_reads_only_matching_items(self):
+        response = get_enterprises_by_contract_end_range("2026-02-01", "2026-02-28")
+        self.assertEqual([item["PK"] for item in response["Items"]], ["feb1", "feb2", "feb3"])
+        # Key condition, not a filter: nothing outside the range is read
+        self.assertEqual(response["ScannedCount"], 3)
+
+    def test_iterates_page_by_page(self):
+        items = list(
+            iter_enterprises_by_contract_end_range("2026-01-15", "2026-02-20", page_size=1, attributes=["PK"])
+        )
+        self.assertEqual(items, [{"PK": "jan"}, {"PK": "feb1"}, {"PK": "feb2"}])
+
+
+@mock_aws
+class TestEnterpriseLicenses(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        store_enterprise("user1", create_test_enterprise("a", max_licenses=10, used_licenses=4))
+
+    def test_allocate_and_release_within_capacity(self):
+        enterprise = allocate_enterprise_licenses("a", 6, "2026-01-01", "user2")
+        self.assertEqual((enterprise.used_licenses, enterprise.updated_by), (10, "user2"))
+        with self.assertRaises(ResourceConflictError):
+            allocate_enterprise_licenses("a", 1, "2026-01-01", "user2")
+
+        self.assertEqual(release_enterprise_licenses("a", 10, "2026-01-01", "user2").used_licenses, 0)
+        with self.assertRaises(ResourceConflictError):
+            release_enterprise_licenses("a", 1, "2026-01-01", "user2")
+        self.assertEqual(find_enterprise_by_id("a").used_licenses, 0)
+
+    def test_unknown_enterprise(self):
+        with self.assertRaises(RecordNotFoundError):
+            allocate_enterprise_licenses("unknown", 1, "2026-01-01", "user2")
+        with self.assertRaises(RecordNotFoundError):
+            release_enterprise_licenses("unknown", 1, "2026-01-01", "user2")
+
+    def test_allocation_burst_never_exceeds_capacity(self):
+        # The guard is a condition of the write itself, evaluated atomically per item by DynamoDB.
+        # (moto does not serialize concurrent writes, so the burst is sequential here.)
+        results = []
+        for _ in range(20):
+            try:
+                allocate_enterprise_licenses("a", 1, "2026-01-01", "user2")
+                results.append(True)
+            except ResourceConflictError:
+                results.append(False)
+        self.assertEqual(results.count(True), 6)
+        self.assertEqual(find_enterprise_by_id("a").used_licenses, 10)
+
+    def test_enterprise_stored_before_available_licenses(self):
+        _get_table_admin_client().update_item(
+            Key={"PK": "a", "SK": compose_enterprise_id("a")},
+            UpdateExpression="REMOVE AvailableLicenses",
+        )
+        self.assertEqual(release_enterprise_licenses("a", 1, "2026-01-01", "user2").used_licenses, 3)
+        self.assertEqual(allocate_enterprise_licenses("a", 7, "2026-01-01", "user2").used_licenses, 10)
+        with self.assertRaises(ResourceConflictError):
+            allocate_enterprise_licenses("a", 1, "2026-01-01", "user2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+from moto import mock_aws
+
+from app.repositories.common import RecordNotFoundError, ResourceConflictError
+from app.repositories.enterprise_repository import (
+    find_enterprise_by_id,
+    get_enterprises_by_filters,
+    store_enterprise,
+)
+from app.repositories.license_repository import (
+    compose_license_model,
+    delete_licenses_by_enterprise_id,
+    find_enterprise_with_licenses,
+    find_licenses_by_enterprise_id,
+)
+from app.routes.schemas.license_schema import LicenseInput
+from app.services import license_service
+
+
+def license_inputs(count: int) -> list[LicenseInput]:
+    return [
+        LicenseInput(user_email=f"user{i}@example.com", user_name=f"User {i}")
+        for i in range(count)
+    ]
+
+
+@mock_aws
+class TestLicenses(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        create_test_events_table()
+        store_enterprise("user1", create_test_enterprise("a", max_licenses=50))
+        store_enterprise("user1", create_test_enterprise("b", max_licenses=50))
+
+    def test_batch_create_and_full_load(self):
+        created = license_service.create_new_licenses("user1", "a", license_inputs(30))
+        license_service.create_new_licenses("user1", "b", license_inputs(2))
+
+        enterprise, licenses = find_enterprise_with_licenses("a")
+        self.assertEqual(enterprise.used_licenses, 30)
+        self.assertEqual(sorted(license.id for license in licenses), sorted(license.id for license in created))
+        self.assertTrue(all(license.enterprise_id == "a" for license in licenses))
+        # License items stay out of the enterprise listings
+        self.assertEqual(len(get_enterprises_by_filters()["Items"]), 2)
+
+        with self.assertRaises(RecordNotFoundError):
+            find_enterprise_with_licenses("unknown")
+
+    def test_pagination(self):
+        license_service.create_new_licenses("user1", "a", license_inputs(5))
+        first = find_licenses_by_enterprise_id("a", limit=3)
+        second = find_licenses_by_enterprise_id("a", limit=3, exclusive_start_key=first["LastEvaluatedKey"])
+        ids = [compose_license_model(item).id for item in first["Items"] + second["Items"]]
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(ids, sorted(ids))
+
+    def test_batch_create_is_bounded_by_max_licenses(self):
+        with self.assertRaises(ResourceConflictError):
+            license_service.create_new_licenses("user1", "a", license_inputs(51))
+        self.assertEqual(find_enterprise_by_id("a").used_licenses, 0)
+
+    def test_failed_batch_releases_the_seats(self):
+        with mock.patch.object(license_service, "store_licenses", side_effect=RuntimeError("throttled")):
+            with self.assertRaises(RuntimeError):
+                license_service.create_new_licenses("user1", "a", license_inputs(3))
+        enterprise, licenses = find_enterprise_with_licenses("a")
+        self.assertEqual((enterprise.used_licenses, licenses), (0, []))
+
+    def test_delete_by_enterprise(self):
+        license_service.create_new_licenses("user1", "a", license_inputs(3))
+        license_service.create_new_licenses("user1", "b", license_inputs(2))
+        self.assertEqual(delete_licenses_by_enterprise_id("a"), 3)
+        self.assertEqual(find_enterprise_with_licenses("a")[1], [])
+        self.assertEqual(len(find_enterprise_with_licenses("b")[1]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
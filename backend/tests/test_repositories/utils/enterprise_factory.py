@@ -0,0 +1,104 @@
+import os
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("ADMIN_TABLE_NAME", "test-admin-table")
+os.environ.setdefault("EVENTS_TABLE_NAME", "test-events-table")
+
+import boto3
+
+from app.repositories.models.enterprise_model import EnterpriseModel
+
+
+def create_test_admin_table():
+    """Create the admin table with its indexes. Must run inside `moto.mock_aws`."""
+    dynamodb = boto3.resource("dynamodb", region_name=os.environ["AWS_DEFAULT_REGION"])
+    return dynamodb.create_table(
+        TableName=os.environ["ADMIN_TABLE_NAME"],
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+            *[
+                {"AttributeName": f"GSI{i}{key}", "AttributeType": "S"}
+                for i in range(2, 6)
+                for key in ("PK", "SK")
+            ],
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            *[
+                {
+                    "IndexName": f"GSI{i}",
+                    "KeySchema": [
+                        {"AttributeName": f"GSI{i}PK", "KeyType": "HASH"},
+                        {"AttributeName": f"GSI{i}SK", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+                for i in range(2, 6)
+            ],
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def create_test_events_table():
+    """Create the events table. Must run inside `moto.mock_aws`."""
+    dynamodb = boto3.resource("dynamodb", region_name=os.environ["AWS_DEFAULT_REGION"])
+    return dynamodb.create_table(
+        TableName=os.environ["EVENTS_TABLE_NAME"],
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def create_test_enterprise(
+    id: str,
+    name: str | None = None,
+    **kwargs,
+) -> EnterpriseModel:
+    fields = dict(
+        id=id,
+        name=name or f"Enterprise {id}",
+        industry="technology",
+        size="small",
+        contact_email=f"contact@{id}.example.com",
+        contact_phone=None,
+        address=None,
+        website=None,
+        status="active",
+        subscription_tier="basic",
+        max_licenses=10,
+        used_licenses=0,
+        contract_start_date="2025-01-01",
+        contract_end_date="2026-01-01",
+        monthly_revenue=100,
+        created_date="2025-01-01T00:00:00+00:00",
+        updated_date=None,
+        cognito_group_name=(name or f"Enterprise {id}").replace(" ", "").upper(),
+        created_by="user1",
+        updated_by=None,
+    )
+    fields.update(kwargs)
+    return EnterpriseModel(**fields)
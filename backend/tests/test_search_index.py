@@ -0,0 +1,96 @@
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+from tests.benchmark_search_index import generate_documents
+
+from app.search_index import EnterpriseSearchIndex
+from app.services import enterprise_search_service
+from app.services.enterprise_search_service import search_enterprises
+
+
+class TestEnterpriseSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = EnterpriseSearchIndex()
+        self.index.build(
+            [
+                ("techcorp", "TechCorp"),
+                ("healthinc", "Health Inc"),
+                ("sg", "Société Générale"),
+                ("techno", "Technologies Avancées"),
+            ]
+        )
+
+    def test_exact_and_prefix_ranking(self):
+        results = self.index.search("techcorp")
+        self.assertEqual(results[0][0], "techcorp")
+        self.assertEqual(results[0][2], 3.0)
+
+        ids = [r[0] for r in self.index.search("tech")]
+        self.assertEqual(ids[:2], ["techcorp", "techno"])
+
+    def test_word_prefix_and_accents(self):
+        self.assertEqual(self.index.search("generale")[0][0], "sg")
+        self.assertEqual(self.index.search("inc")[0][0], "healthinc")
+
+    def test_fuzzy(self):
+        self.assertEqual(self.index.search("helth inc")[0][0], "healthinc")
+        self.assertEqual(self.index.search("zzzz"), [])
+
+    def test_upsert_and_remove(self):
+        self.index.upsert("healthinc", "Wellness Inc")
+        self.assertEqual(self.index.search("wellness")[0][0], "healthinc")
+        self.assertEqual(self.index.search("healthinc")[0][1], "Wellness Inc")
+        self.assertEqual(self.index.search("health"), [("healthinc", "Wellness Inc", 1.6667)])
+
+        self.index.remove("techcorp")
+        self.assertNotIn("techcorp", [r[0] for r in self.index.search("tech")])
+        self.assertEqual(len(self.index), 3)
+
+    def test_compaction_keeps_documents(self):
+        for i in range(100):
+            self.index.upsert(f"tmp{i}", f"Temporary {i}")
+        for i in range(100):
+            self.index.remove(f"tmp{i}")
+        self.assertEqual(len(self.index), 4)
+        self.assertLess(self.index.stats()["tombstones"], 100)
+        self.assertEqual(self.index.search("techcorp")[0][0], "techcorp")
+
+
+class TestSearchEnterprises(unittest.TestCase):
+    def test_concurrent_cold_searches_share_one_build(self):
+        reads = []
+
+        def iter_all_enterprises(attributes=None):
+            reads.append(attributes)
+            time.sleep(0.05)
+            yield {"SK": "ENTERPRISE#techcorp", "Name": "TechCorp"}
+
+        with mock.patch.object(enterprise_search_service, "iter_all_enterprises", iter_all_enterprises), \
+                mock.patch.object(enterprise_search_service, "_index", EnterpriseSearchIndex()), \
+                mock.patch.object(enterprise_search_service, "_built_at", None):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: search_enterprises("techcorp"), range(8)))
+
+        self.assertEqual(len(reads), 1)
+        self.assertTrue(all(result[0][0] == "techcorp" for result in results))
+
+
+class TestEnterpriseSearchIndex100k(unittest.TestCase):
+    """Memory budget only: the timings are in tests/benchmark_search_index.py."""
+
+    def test_memory(self):
+        index = EnterpriseSearchIndex()
+        index.build(generate_documents(100_000))
+        stats = index.stats()
+        self.assertEqual(stats["documents"], 100_000)
+        self.assertLess(stats["memory_bytes"], 96 * 2**20)
+        self.assertTrue(index.search("green ener", limit=10))
+
+
+if __name__ == "__main__":
+    unittest.main()
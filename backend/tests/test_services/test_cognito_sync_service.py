@@ -0,0 +1,138 @@
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+import boto3
+from moto import mock_aws
+
+from app.rate_limit import TokenBucket
+from app.repositories import cognito_repository
+from app.repositories.cognito_sync_repository import find_pending_group_syncs
+from app.repositories.enterprise_repository import find_enterprise_by_id, store_enterprise
+from app.routes.schemas.entreprise_schema import EnterpriseModifyInput
+from app.services import cognito_sync_service
+from app.services.cognito_sync_service import (
+    enqueue_group_create,
+    enqueue_group_delete,
+    enqueue_group_rename,
+    sync_cognito_groups,
+)
+from app.services.enterprise_service import modify_enterprise
+
+
+@mock_aws
+class TestCognitoGroupSync(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        create_test_events_table()
+        self.cognito = boto3.client("cognito-idp")
+        user_pool_id = self.cognito.create_user_pool(PoolName="test")["UserPool"]["Id"]
+        patcher = mock.patch.object(cognito_repository, "USER_POOL_ID", user_pool_id)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user_pool_id = user_pool_id
+
+    def _groups(self) -> list[str]:
+        return sorted(g["GroupName"] for g in self.cognito.list_groups(UserPoolId=self.user_pool_id)["Groups"])
+
+    def _members(self, group_name: str) -> list[str]:
+        users = self.cognito.list_users_in_group(UserPoolId=self.user_pool_id, GroupName=group_name)["Users"]
+        return sorted(u["Username"] for u in users)
+
+    def test_create(self):
+        enqueue_group_create("a", "ACME")
+        self.assertEqual(self._groups(), [])
+        self.assertEqual(sync_cognito_groups()["applied"], 1)
+        self.assertEqual(self._groups(), ["ACME"])
+        self.assertEqual(find_pending_group_syncs(int(time.time())), [])
+
+    def test_redundant_operations_are_coalesced(self):
+        enqueue_group_create("a", "ACME")
+        enqueue_group_rename("a", "ACME", "ACMECORP")
+        enqueue_group_rename("a", "ACMECORP", "ACMEINC")
+        enqueue_group_create("b", "GLOBEX")
+        enqueue_group_delete("b", "GLOBEX")
+
+        with mock.patch.object(cognito_sync_service, "create_group", wraps=cognito_sync_service.create_group) as create:
+            sync_cognito_groups()
+        create.assert_called_once_with("ACMEINC")
+        self.assertEqual(self._groups(), ["ACMEINC"])
+
+    def test_rename_moves_the_users(self):
+        enqueue_group_create("a", "ACME")
+        sync_cognito_groups()
+        for username in ("u1", "u2"):
+            self.cognito.admin_create_user(UserPoolId=self.user_pool_id, Username=username)
+            self.cognito.admin_add_user_to_group(UserPoolId=self.user_pool_id, Username=username, GroupName="ACME")
+
+        enqueue_group_rename("a", "ACME", "ACMECORP")
+        sync_cognito_groups()
+        self.assertEqual(self._groups(), ["ACMECORP"])
+        self.assertEqual(self._members("ACMECORP"), ["u1", "u2"])
+
+        enqueue_group_delete("a", "ACMECORP")
+        sync_cognito_groups()
+        self.assertEqual(self._groups(), [])
+
+    def test_failed_operation_is_retried_later(self):
+        enqueue_group_create("a", "ACME")
+        with mock.patch.object(cognito_sync_service, "create_group", side_effect=RuntimeError("TooManyRequests")):
+            self.assertEqual(sync_cognito_groups()["failed"], 1)
+        # Not due yet
+        self.assertEqual(sync_cognito_groups(), {"applied": 0, "superseded": 0, "failed": 0})
+
+        with mock.patch.object(cognito_sync_service.time, "time", return_value=time.time() + 3600):
+            self.assertEqual(sync_cognito_groups()["applied"], 1)
+        self.assertEqual(self._groups(), ["ACME"])
+
+    def test_operation_enqueued_while_applying(self):
+        enqueue_group_create("a", "ACME")
+        apply_group_sync = cognito_sync_service.apply_group_sync
+
+        def apply_then_rename(applied, target):
+            apply_group_sync(applied, target)
+            enqueue_group_rename("a", "ACME", "ACMECORP")
+
+        with mock.patch.object(cognito_sync_service, "apply_group_sync", apply_then_rename):
+            self.assertEqual(sync_cognito_groups()["superseded"], 1)
+        self.assertEqual(self._groups(), ["ACME"])
+
+        sync_cognito_groups()
+        self.assertEqual(self._groups(), ["ACMECORP"])
+
+    def test_modify_enterprise_name_renames_the_group(self):
+        store_enterprise("user1", create_test_enterprise("a", name="Acme"))
+        enterprise = find_enterprise_by_id("a")
+        modify_input = EnterpriseModifyInput(**{**enterprise.model_dump(), "name": "Acme Corp"})
+
+        modify_enterprise("user1", "a", modify_input)
+        enterprise = find_enterprise_by_id("a")
+        self.assertEqual((enterprise.name, enterprise.cognito_group_name), ("Acme Corp", "ACMECORP"))
+        [pending] = find_pending_group_syncs(int(time.time()))
+        self.assertEqual((pending["AppliedGroupName"], pending["TargetGroupName"]), ("ACME", "ACMECORP"))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_rate(self):
+        bucket = TokenBucket(rate=200, capacity=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        started_at = time.monotonic()
+        for _ in range(10):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
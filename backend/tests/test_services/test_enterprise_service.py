@@ -0,0 +1,75 @@
+import sys
+import unittest
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+)
+
+import orjson
+from moto import mock_aws
+
+from app.repositories.enterprise_repository import store_enterprise
+from app.responses import ORJSONResponse
+from app.routes.schemas.entreprise_schema import EnterpriseMetaOutput, EnterpriseOutput
+from app.services.enterprise_service import (
+    fetch_all_enterprises,
+    fetch_enterprise,
+    fetch_enterprises_page,
+)
+
+
+@mock_aws
+class TestEnterpriseOutputs(unittest.TestCase):
+    """The outputs built from the items match the serialization of the output schemas."""
+
+    def setUp(self):
+        create_test_admin_table()
+        store_enterprise("user1", create_test_enterprise("a", website="https://a.example.com", used_licenses=3))
+        store_enterprise("user1", create_test_enterprise("b", industry=None, monthly_revenue=None))
+
+    def _assert_serialized_as(self, output: dict, schema):
+        expected = schema.model_validate(output).model_dump(mode="json", by_alias=True)
+        self.assertEqual(orjson.loads(ORJSONResponse(output).body), expected)
+
+    def test_meta_outputs(self):
+        outputs = fetch_all_enterprises(limit=10)
+        self.assertEqual([output["id"] for output in outputs], ["a", "b"])
+        for output in outputs:
+            self._assert_serialized_as(output, EnterpriseMetaOutput)
+
+        page, next_token = fetch_enterprises_page(limit=10)
+        self.assertEqual((page, next_token), (outputs, None))
+
+    def test_enterprise_output(self):
+        output = fetch_enterprise("a")
+        self.assertEqual((output["usedLicenses"], output["contactEmail"]), (3, "contact@a.example.com"))
+        self._assert_serialized_as(output, EnterpriseOutput)
+
+    def test_outputs_follow_the_schemas(self):
+        """Every field of the schemas, from a fully populated enterprise."""
+        enterprise = create_test_enterprise(
+            "full",
+            contact_phone="+33 1 23 45 67 89",
+            address="1 rue de la Paix, Paris",
+            website="https://full.example.com",
+            used_licenses=4,
+            monthly_revenue=2500,
+            updated_date="2025-02-01T00:00:00+00:00",
+            updated_by="user2",
+        )
+        store_enterprise("user1", enterprise)
+        for output, schema in (
+            (fetch_enterprise("full"), EnterpriseOutput),
+            (next(output for output in fetch_all_enterprises(limit=10) if output["id"] == "full"), EnterpriseMetaOutput),
+        ):
+            with self.subTest(schema=schema.__name__):
+                expected = schema.model_validate(enterprise.model_dump()).model_dump(by_alias=True)
+                self.assertEqual(output, expected)
+                self.assertNotIn(None, output.values())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import unittest
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import create_test_events_table
+
+from moto import mock_aws
+
+from app.repositories.event_repository import get_events_by_date
+from app.repositories.models.event_model import EntityTypeEnum, EventMeta, EventNameEnum, EventTypeEnum
+from app.services.event_service import create_new_event, fetch_all_events
+
+
+@mock_aws
+class TestFetchAllEvents(unittest.TestCase):
+    def setUp(self):
+        create_test_events_table()
+        for day, event_type in enumerate(
+            [EventTypeEnum.ENTERPRISE_CREATED, EventTypeEnum.ENTERPRISE_UPDATED, EventTypeEnum.ENTERPRISE_DELETED],
+            start=1,
+        ):
+            create_new_event(
+                user_id=f"user{day}",
+                event_date=f"2025-01-0{day}T00:00:00+00:00",
+                event_name=EventNameEnum.MODIFY,
+                event_type=event_type,
+                entity_id=f"ent{day}",
+                entity_type=EntityTypeEnum.ENTERPRISE,
+                metadata={"day": day},
+            )
+
+    def test_same_events_as_one_model_per_item(self):
+        events = fetch_all_events(limit=10)
+
+        # The decoding before the list adapter: one validated model per item
+        expected = [
+            EventMeta(
+                id=item["id"],
+                event_date=item["event_date"],
+                event_type=item["event_type"],
+                user_id=item["user_id"],
+            )
+            for item in get_events_by_date(limit=10)["Items"]
+        ]
+        self.assertEqual(events, expected)
+        self.assertEqual([event.user_id for event in events], ["user3", "user2", "user1"])
+        self.assertEqual(events[0].event_type, EventTypeEnum.ENTERPRISE_DELETED)
+        self.assertIsNone(events[0].details)
+
+    def test_limit(self):
+        self.assertEqual(len(fetch_all_events(limit=2)), 2)
+        with self.assertRaises(ValueError):
+            fetch_all_events(limit=101)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from app.repositories import cognito_repository
+from app.repositories.common import ResourceConflictError
+from app.repositories.enterprise_repository import find_enterprise_by_id, store_enterprise
+from app.repositories.license_repository import find_enterprise_with_licenses
+from app.routes.schemas.license_schema import (
+    ProvisionStatusEnum,
+    ProvisionSummaryOutput,
+    ProvisionUserInput,
+)
+from app.services import license_service
+from app.services.license_service import provision_enterprise_users
+
+
+def _users(*emails: str) -> list[ProvisionUserInput]:
+    return [ProvisionUserInput(email=email, name=email.split("@")[0]) for email in emails]
+
+
+@mock_aws
+class TestProvisionEnterpriseUsers(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        create_test_events_table()
+        self.cognito = boto3.client("cognito-idp")
+        user_pool_id = self.cognito.create_user_pool(PoolName="test")["UserPool"]["Id"]
+        patcher = mock.patch.object(cognito_repository, "USER_POOL_ID", user_pool_id)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user_pool_id = user_pool_id
+        store_enterprise("user1", create_test_enterprise("a", name="Acme", max_licenses=5))
+
+    def _members(self, group_name: str) -> list[str]:
+        users = self.cognito.list_users_in_group(UserPoolId=self.user_pool_id, GroupName=group_name)["Users"]
+        return sorted(u["Username"] for u in users)
+
+    def test_provision(self):
+        self.cognito.admin_create_user(UserPoolId=self.user_pool_id, Username="bob@acme.com")
+
+        *results, summary = provision_enterprise_users("user1", "a", _users("alice@acme.com", "bob@acme.com"))
+        statuses = {result.email: result.status for result in results}
+        self.assertEqual(
+            statuses,
+            {"alice@acme.com": ProvisionStatusEnum.CREATED, "bob@acme.com": ProvisionStatusEnum.EXISTING},
+        )
+        self.assertEqual(summary, ProvisionSummaryOutput(created=1, existing=1, failed=0, used_licenses=2))
+        self.assertEqual(self._members("ACME"), ["alice@acme.com", "bob@acme.com"])
+
+        enterprise, licenses = find_enterprise_with_licenses("a")
+        self.assertEqual(enterprise.used_licenses, 2)
+        self.assertEqual(
+            sorted((license.id, license.user_email) for license in licenses),
+            sorted((result.license_id, result.email) for result in results),
+        )
+
+    def test_rerun_does_not_license_users_twice(self):
+        *first, _ = provision_enterprise_users("user1", "a", _users("alice@acme.com"))
+        *results, summary = provision_enterprise_users("user1", "a", _users("Alice@acme.com", "bob@acme.com"))
+
+        statuses = {result.email.lower(): result.status for result in results}
+        self.assertEqual(
+            statuses,
+            {"alice@acme.com": ProvisionStatusEnum.EXISTING, "bob@acme.com": ProvisionStatusEnum.CREATED},
+        )
+        [alice] = [result for result in results if result.email.lower() == "alice@acme.com"]
+        self.assertEqual(alice.license_id, first[0].license_id)
+        self.assertEqual(summary, ProvisionSummaryOutput(created=1, existing=1, failed=0, used_licenses=2))
+
+        enterprise, licenses = find_enterprise_with_licenses("a")
+        self.assertEqual(enterprise.used_licenses, 2)
+        self.assertEqual(sorted(license.user_email for license in licenses), ["alice@acme.com", "bob@acme.com"])
+
+        # Everyone already licensed: no seat allocated
+        *_, summary = provision_enterprise_users("user1", "a", _users("alice@acme.com", "bob@acme.com"))
+        self.assertEqual(summary, ProvisionSummaryOutput(created=0, existing=2, failed=0, used_licenses=2))
+
+    def test_failed_users_release_their_seats(self):
+        admin_create_user = cognito_repository.admin_create_user
+
+        def fail_for_carol(email, name):
+            if email == "carol@acme.com":
+                raise ClientError({"Error": {"Code": "InvalidParameterException"}}, "AdminCreateUser")
+            return admin_create_user(email, name)
+
+        with mock.patch.object(license_service, "admin_create_user", fail_for_carol):
+            *results, summary = provision_enterprise_users("user1", "a", _users("alice@acme.com", "carol@acme.com"))
+
+        [failed] = [result for result in results if result.status == ProvisionStatusEnum.FAILED]
+        self.assertEqual((failed.email, failed.license_id), ("carol@acme.com", None))
+        self.assertIn("InvalidParameterException", failed.error)
+        self.assertEqual(summary, ProvisionSummaryOutput(created=1, existing=0, failed=1, used_licenses=1))
+        self.assertEqual(self._members("ACME"), ["alice@acme.com"])
+        self.assertEqual(len(find_enterprise_with_licenses("a")[1]), 1)
+
+    def test_throttled_calls_are_retried(self):
+        admin_create_user = cognito_repository.admin_create_user
+        calls = []
+
+        def throttle_twice(email, name):
+            calls.append(email)
+            if len(calls) <= 2:
+                raise ClientError({"Error": {"Code": "TooManyRequestsException"}}, "AdminCreateUser")
+            return admin_create_user(email, name)
+
+        with mock.patch.object(license_service, "admin_create_user", throttle_twice), \
+                mock.patch.object(license_service, "compute_backoff_delay", return_value=0):
+            *_, summary = provision_enterprise_users("user1", "a", _users("alice@acme.com"))
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(summary.created, 1)
+
+    def test_not_enough_licenses(self):
+        users = _users(*(f"user{i}@acme.com" for i in range(6)))
+        with self.assertRaises(ResourceConflictError):
+            provision_enterprise_users("user1", "a", users)
+        self.assertEqual(find_enterprise_by_id("a").used_licenses, 0)
+        self.assertEqual(self.cognito.list_users(UserPoolId=self.user_pool_id)["Users"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
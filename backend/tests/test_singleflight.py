@@ -0,0 +1,89 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, ".")
+
+from app.singleflight import SingleFlight, singleflight_stats
+
+
+class SlowRead:
+    """Blocking read counting its calls, held until `release` is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.__name__ = "slow_read"
+
+    def __call__(self, limit: int = 20):
+        self.calls += 1
+        self.release.wait(5)
+        if limit < 0:
+            raise ValueError("Limit must be positive")
+        return [f"item{i}" for i in range(limit)]
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.read = SlowRead()
+
+    def _gather(self, flight: SingleFlight, *limits: int):
+        async def run():
+            tasks = [asyncio.ensure_future(flight(limit=limit)) for limit in limits]
+            await asyncio.sleep(0.05)
+            self.read.release.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        return asyncio.run(run())
+
+    def test_concurrent_calls_share_one_call(self):
+        flight = SingleFlight(self.read)
+        results = self._gather(flight, 2, 2, 2, 3)
+        self.assertEqual(results, [["item0", "item1"]] * 3 + [["item0", "item1", "item2"]])
+        self.assertEqual(self.read.calls, 2)
+        self.assertEqual(flight.stats, {"calls": 4, "executions": 2, "shared": 2, "cached": 0})
+        self.assertIs(results[0], results[1])
+
+        # Completed: the next call runs again
+        self.assertEqual(self._gather(flight, 2), [["item0", "item1"]])
+        self.assertEqual(self.read.calls, 3)
+
+    def test_errors_are_shared_not_cached(self):
+        flight = SingleFlight(self.read, ttl=10)
+        results = self._gather(flight, -1, -1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self._gather(flight, -1)
+        self.assertEqual(self.read.calls, 2)
+
+    def test_ttl(self):
+        flight = SingleFlight(self.read, ttl=0.2)
+        self._gather(flight, 2)
+        self._gather(flight, 2)
+        self.assertEqual((self.read.calls, flight.stats["cached"]), (1, 1))
+        time.sleep(0.25)
+        self._gather(flight, 2)
+        self.assertEqual(self.read.calls, 2)
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight(self.read)
+
+        async def run():
+            first = asyncio.ensure_future(flight(limit=1))
+            second = asyncio.ensure_future(flight(limit=1))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            self.read.release.set()
+            return await second
+
+        self.assertEqual(asyncio.run(run()), ["item0"])
+        self.assertEqual(self.read.calls, 1)
+
+    def test_stats(self):
+        SingleFlight(self.read)
+        self.assertIn("slow_read", singleflight_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
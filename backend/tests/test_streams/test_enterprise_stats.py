@@ -0,0 +1,102 @@
+import sys
+import unittest
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "streams")
+
+from tests.test_repositories.utils.enterprise_factory import create_test_admin_table
+
+from boto3.dynamodb.types import TypeSerializer
+from moto import mock_aws
+
+from enterprise_stats import diff_images
+from process_dynamodb_stream_events import handler
+from app.services.enterprise_service import fetch_enterprise_stats
+
+_serializer = TypeSerializer()
+
+
+def enterprise_item(enterprise_id: str, **kwargs) -> dict:
+    item = {
+        "PK": enterprise_id,
+        "SK": f"ENTERPRISE#{enterprise_id}",
+        "Status": "active",
+        "SubscriptionTier": "basic",
+        "Industry": "technology",
+        "Size": None,
+        "MaxLicenses": 10,
+        "UsedLicenses": 2,
+        "MonthlyRevenue": 100,
+    }
+    item.update(kwargs)
+    return item
+
+
+def stream_record(sequence_number: int, old: dict | None, new: dict | None) -> dict:
+    keys = old or new
+    dynamodb = {
+        "Keys": {"PK": {"S": keys["PK"]}, "SK": {"S": keys["SK"]}},
+        "SequenceNumber": str(sequence_number),
+    }
+    if old:
+        dynamodb["OldImage"] = {k: _serializer.serialize(v) for k, v in old.items()}
+    if new:
+        dynamodb["NewImage"] = {k: _serializer.serialize(v) for k, v in new.items()}
+    event_name = "MODIFY" if old and new else "INSERT" if new else "REMOVE"
+    return {"eventID": str(sequence_number), "eventName": event_name, "dynamodb": dynamodb}
+
+
+class TestDiffImages(unittest.TestCase):
+    def test_modify_only_changed_counters(self):
+        old = enterprise_item("a")
+        new = enterprise_item("a", Status="suspended", UsedLicenses=5)
+        self.assertEqual(
+            diff_images(old, new),
+            {"Status#active": -1, "Status#suspended": 1, "TotalUsedLicenses": 3},
+        )
+        self.assertEqual(diff_images(old, old), {})
+
+
+@mock_aws
+class TestStreamHandler(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+
+    def test_counters_follow_insert_modify_remove(self):
+        a, b = enterprise_item("a"), enterprise_item("b", SubscriptionTier="private", MonthlyRevenue=400)
+        handler({"Records": [stream_record(1, None, a), stream_record(2, None, b)]}, None)
+
+        a_modified = enterprise_item("a", Status="trial", UsedLicenses=10)
+        result = handler(
+            {
+                "Records": [
+                    stream_record(3, a, a_modified),
+                    stream_record(4, b, None),
+                    # Not an enterprise: ignored
+                    stream_record(5, None, {"PK": "STATS", "SK": "ENTERPRISE"}),
+                ]
+            },
+            None,
+        )
+        self.assertEqual(result, {"batchItemFailures": []})
+
+        stats = fetch_enterprise_stats()
+        self.assertEqual(stats.total_enterprises, 1)
+        self.assertEqual(stats.by_status, {"trial": 1})
+        self.assertEqual(stats.by_subscription_tier, {"basic": 1})
+        self.assertEqual(stats.by_size, {"none": 1})
+        self.assertEqual(stats.total_monthly_revenue, 100)
+        self.assertEqual(stats.license_utilization, 1.0)
+
+    def test_failed_record_stops_the_batch(self):
+        broken = {"eventID": "2", "eventName": "INSERT", "dynamodb": {"SequenceNumber": "2", "Keys": {"SK": {"S": "ENTERPRISE#x"}}, "NewImage": {"Status": {"BAD": 1}}}}
+        records = [stream_record(1, None, enterprise_item("a")), broken, stream_record(3, None, enterprise_item("c"))]
+
+        result = handler({"Records": records}, None)
+        self.assertEqual(result, {"batchItemFailures": [{"itemIdentifier": "2"}]})
+        # Only the records before the failure are counted
+        self.assertEqual(fetch_enterprise_stats().total_enterprises, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import sys
+import unittest
+
+sys.path.insert(0, ".")
+
+from tests.test_repositories.utils.enterprise_factory import (
+    create_test_admin_table,
+    create_test_enterprise,
+    create_test_events_table,
+)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+
+from app.concurrency import run_blocking
+from app.repositories.enterprise_repository import find_enterprise_by_id, store_enterprise
+from app.repositories.models.event_model import EntityTypeEnum, EventNameEnum, EventTypeEnum
+from app.services.event_service import create_new_event
+from app.timing import ServerTimingMiddleware, _dynamodb_span_name, span
+from app.user import User
+
+ADMIN = User(id="admin1", name="admin1", groups=["Admin"], role="admin")
+USER = User(id="user1", name="user1", groups=[], role="user")
+
+
+def set_current_user(app):
+    """Stand-in for `CurrentUserMiddleware`: the user is chosen by the `X-User` header."""
+
+    async def middleware(scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            scope.setdefault("state", {})["current_user"] = ADMIN if headers.get(b"x-user") == b"admin" else USER
+        await app(scope, receive, send)
+
+    return middleware
+
+
+app = FastAPI()
+app.add_middleware(set_current_user)
+app.add_middleware(ServerTimingMiddleware)
+
+
+@app.get("/enterprise/{enterprise_id}")
+async def touch_enterprise(enterprise_id: str):
+    await run_blocking(find_enterprise_by_id, enterprise_id)
+    await run_blocking(
+        create_new_event,
+        user_id="user1",
+        event_date="2025-01-01T00:00:00+00:00",
+        event_name=EventNameEnum.MODIFY,
+        event_type=EventTypeEnum.ENTERPRISE_UPDATED,
+        entity_id=enterprise_id,
+        entity_type=EntityTypeEnum.ENTERPRISE,
+    )
+    return {"id": enterprise_id}
+
+
+def parse_server_timing(header: str) -> dict[str, dict]:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@mock_aws
+class TestServerTiming(unittest.TestCase):
+    def setUp(self):
+        create_test_admin_table()
+        create_test_events_table()
+        store_enterprise("user1", create_test_enterprise("ent1"))
+        self.client = TestClient(app)
+
+    def test_header(self):
+        response = self.client.get("/enterprise/ent1")
+        metrics = parse_server_timing(response.headers["server-timing"])
+        self.assertEqual(list(metrics), ["ddb-get", "event", "ddb-put", "ddb", "total"])
+        self.assertEqual(metrics["ddb"], {"desc": '"2 calls"'})
+        self.assertGreaterEqual(float(metrics["event"]["dur"]), float(metrics["ddb-put"]["dur"]))
+        self.assertNotIn("x-timing-spans", response.headers)
+
+    def test_span_tree_for_admins_only(self):
+        response = self.client.get("/enterprise/ent1", headers={"X-Timing-Spans": "1"})
+        self.assertNotIn("x-timing-spans", response.headers)
+
+        response = self.client.get("/enterprise/ent1", headers={"X-Timing-Spans": "1", "X-User": "admin"})
+        tree = json.loads(response.headers["x-timing-spans"])
+        self.assertEqual([span["name"] for span in tree], ["ddb-get", "event"])
+        self.assertEqual([child["name"] for child in tree[1]["children"]], ["ddb-put"])
+        self.assertLessEqual(tree[0]["start"] + tree[0]["dur"], tree[1]["start"])
+
+    def test_outside_a_request(self):
+        with span("event"):
+            self.assertEqual(find_enterprise_by_id("ent1").id, "ent1")
+
+
+class TestDynamoDBSpanName(unittest.TestCase):
+    def test_span_name(self):
+        self.assertEqual(_dynamodb_span_name("GetItem"), "ddb-get")
+        self.assertEqual(_dynamodb_span_name("UpdateItem"), "ddb-update")
+        self.assertEqual(_dynamodb_span_name("BatchWriteItem"), "ddb-batch-write")
+        self.assertEqual(_dynamodb_span_name("TransactWriteItems"), "ddb-transact-write")
+        self.assertEqual(_dynamodb_span_name("Query"), "ddb-query")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,15 @@
 import os
+import random
+import time
 
 import boto3
 import cfnresponse
 
 USER_POOL_ID = os.environ['USER_POOL_ID']
+# Cognito user pool management APIs have low quotas, shared by all the pools of the account
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10
 
 cognito = boto3.client('cognito-idp')
 
@@ -11,6 +17,7 @@ cognito = boto3.client('cognito-idp')
 def handler(event, context):
     """Custom resource to implement the functionality to add lambda triggers to existing Cognito user pools.
     Because CloudFormation does not provide that functionality.
+    The user pool is only updated when its effective LambdaConfig changes.
     """
     request_type = event['RequestType']
     physical_resource_id = event.get('PhysicalResourceId') or f'{USER_POOL_ID}-triggers'
@@ -20,11 +27,7 @@ def handler(event, context):
 
     try:
         if request_type == 'Create':
-            response = cognito.describe_user_pool(UserPoolId=USER_POOL_ID)
-            attr = response['UserPool']
-            lambda_config = attr.get('LambdaConfig', {})
-
-            update_user_pool_lambda_config(USER_POOL_ID, attr, lambda_config={
+            apply_lambda_config(USER_POOL_ID, lambda lambda_config: {
                 **lambda_config,
                 **triggers,
             })
@@ -32,13 +35,9 @@ def handler(event, context):
             cfnresponse.send(event, context, cfnresponse.SUCCESS, resource_properties, physical_resource_id)
 
         elif request_type == 'Update':
-            response = cognito.describe_user_pool(UserPoolId=USER_POOL_ID)
-            attr = response['UserPool']
-            lambda_config = attr.get('LambdaConfig', {})
-
             old_resource_properties = event['OldResourceProperties']
             old_triggers = old_resource_properties['Triggers']
-            update_user_pool_lambda_config(USER_POOL_ID, attr, lambda_config={
+            apply_lambda_config(USER_POOL_ID, lambda lambda_config: {
                 **{ k: v for k, v in lambda_config.items() if k not in old_triggers.keys() },
                 **triggers,
             })
@@ -47,11 +46,7 @@ def handler(event, context):
             cfnresponse.send(event, context, cfnresponse.SUCCESS, resource_properties, physical_resource_id)
 
         elif request_type == 'Delete':
-            response = cognito.describe_user_pool(UserPoolId=USER_POOL_ID)
-            attr = response['UserPool']
-            lambda_config = attr.get('LambdaConfig', {})
-
-            update_user_pool_lambda_config(USER_POOL_ID, attr, lambda_config={
+            apply_lambda_config(USER_POOL_ID, lambda lambda_config: {
                 k: v for k, v in lambda_config.items() if k not in triggers.keys()
             })
             cfnresponse.send(event, context, cfnresponse.SUCCESS, None, physical_resource_id)
@@ -61,11 +56,34 @@ def handler(event, context):
         cfnresponse.send(event, context, cfnresponse.FAILED, None, physical_resource_id)
 
 
+def apply_lambda_config(user_pool_id, compute_lambda_config):
+    """Compute the LambdaConfig from the current one, and update the user pool only if it differs.
+    Returns True if the user pool was updated.
+    """
+    response = call_with_backoff(cognito.describe_user_pool, UserPoolId=user_pool_id)
+    attr = response['UserPool']
+    current_lambda_config = attr.get('LambdaConfig', {})
+    lambda_config = compute_lambda_config(current_lambda_config)
+
+    if lambda_config == current_lambda_config:
+        print(f'LambdaConfig of user pool {user_pool_id} is unchanged, skipping the update')
+        return False
+    changed = sorted(
+        k for k in current_lambda_config.keys() | lambda_config.keys()
+        if current_lambda_config.get(k) != lambda_config.get(k)
+    )
+    print(f'Updating LambdaConfig of user pool {user_pool_id}: {changed}')
+    update_user_pool_lambda_config(user_pool_id, attr, lambda_config)
+    return True
+
+
 def update_user_pool_lambda_config(user_pool_id, attr, lambda_config):
+    # UpdateUserPool resets the settings that are not passed: the current ones are sent back as is
     if 'TemporaryPasswordValidityDays' in attr.get('Policies', {}).get('PasswordPolicy', {}):
         attr.get('AdminCreateUserConfig', {}).pop('UnusedAccountValidityDays', None)
 
-    cognito.update_user_pool(
+    call_with_backoff(
+        cognito.update_user_pool,
         UserPoolId=user_pool_id,
         **{
             k: v for k, v in attr.items() if k in [
@@ -90,3 +108,16 @@ def update_user_pool_lambda_config(user_pool_id, attr, lambda_config):
         },
         LambdaConfig=lambda_config,
     )
+
+
+def call_with_backoff(operation, **kwargs):
+    """Retry throttled calls with exponential backoff and full jitter."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return operation(**kwargs)
+        except cognito.exceptions.TooManyRequestsException:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            print(f'Throttled, retrying in {delay:.1f}s (attempt {attempt + 1})')
+            time.sleep(delay)